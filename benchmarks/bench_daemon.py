@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Per-call cost of bd over the daemon socket against spawning the CLI.
+
+Both paths run the same benchmarks/fake_bd.py command handlers on the same
+scratch database. The CLI path spawns fake_bd.py for every call, as
+SubprocessBackend does with bd. The daemon path sends each call to
+bd_fake.FakeDaemon, which keeps one database connection open and runs the
+handlers in-process, the way the bd daemon does; the hooks' DaemonBackend
+(BD_HOOKS_DAEMON=on) reuses one socket connection for all of them. Prints one
+JSON object per path with p50/p99 milliseconds for `bd show`, and the
+connections the daemon accepted.
+
+Usage:
+  python3 benchmarks/bench_daemon.py [--calls N]
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "hooks"))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_bd  # noqa: E402
+from bd_backend import DaemonBackend, SubprocessBackend  # noqa: E402
+from bd_fake import FakeDaemon  # noqa: E402
+from hook_trace import percentile  # noqa: E402
+
+
+class InProcessFakeBd:
+    """Runs fake_bd.py's handlers over one open connection (what a daemon saves per call)."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.local = threading.local()  # sqlite3 connections stay on the thread that opened them
+        self.lock = threading.Lock()  # redirect_stdout is process-wide
+
+    def run(self, args: list, cwd=None, timeout=None):
+        if not hasattr(self.local, "conn"):
+            self.local.conn = fake_bd.connect(self.db_path)
+        out, err = io.StringIO(), io.StringIO()
+        with self.lock, contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            code = fake_bd.run(self.local.conn, list(args))
+        return code or 0, out.getvalue(), err.getvalue()
+
+
+def measure(backend, project: str, calls: int) -> list:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        code, stdout, _ = backend.run(["show", "bd-1", "--json"], cwd=project)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert code == 0 and "bd-1" in stdout, stdout
+    return samples
+
+
+def main():
+    calls = 50
+    args = sys.argv[1:]
+    while args:
+        flag, value, args = args[0], args[1], args[2:]
+        if flag == "--calls":
+            calls = int(value)
+
+    with tempfile.TemporaryDirectory() as project:
+        beads_dir = os.path.join(project, ".beads")
+        os.makedirs(beads_dir)
+        db_path = os.path.join(beads_dir, "beads.db")
+        conn = fake_bd.connect(db_path)
+        conn.execute("INSERT INTO issues (id, title) VALUES ('bd-1', 'Issue 1')")
+        conn.commit()
+        conn.close()
+        os.environ["FAKE_BD_DB"] = db_path
+
+        script = os.path.join(project, "bd")
+        with open(script, "w") as f:
+            f.write(f"#!/bin/sh\nexec {sys.executable} {os.path.join(BENCH_DIR, 'fake_bd.py')} \"$@\"\n")
+        os.chmod(script, 0o755)
+        cli = SubprocessBackend(script)
+
+        results = [("cli", measure(cli, project, calls), None)]
+        with FakeDaemon(InProcessFakeBd(db_path), os.path.join(beads_dir, "bd.sock")) as daemon:
+            backend = DaemonBackend(fallback=cli)
+            samples = measure(backend, project, calls)
+            assert backend.cli_calls == 0
+            backend.close()
+            results.append(("daemon", samples, daemon.connections))
+
+        for path, samples, connections in results:
+            row = {
+                "path": path,
+                "calls": calls,
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+            }
+            if connections is not None:
+                row["connections"] = connections
+            print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
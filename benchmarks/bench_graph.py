@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Memory and scan time of whole-graph loads: full export dicts vs IssueRecords.
+
+Generates a synthetic export (default 100k issues, each with a description and
+timestamps like a real `bd export` line), parses it both ways, and reports the
+traced memory the parsed graph holds plus the time for an open-descendants
+scan from the root over a HierarchyIndex. Prints one JSON object per
+representation.
+
+Usage:
+  python3 benchmarks/bench_graph.py [--issues N] [--fanout N]
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks"))
+
+from beads_hierarchy import HierarchyIndex, parse_jsonl  # noqa: E402
+
+
+def export_lines(count: int, fanout: int) -> list:
+    lines = []
+    for i in range(count):
+        deps = [{"issue_id": f"bd-{i:x}", "depends_on_id": f"bd-{(i - 1) // fanout:x}", "type": "parent-child"}] if i else []
+        lines.append(json.dumps({
+            "id": f"bd-{i:x}",
+            "title": f"Issue number {i}",
+            "description": "Acceptance criteria and notes for this issue. " * 4,
+            "status": "closed" if i % 3 else "open",
+            "priority": 2,
+            "issue_type": "task",
+            "labels": ["type:ac" if i % fanout else "type:ticket", "area:hooks"],
+            "created_at": "2026-01-01T00:00:00Z",
+            "updated_at": "2026-01-02T00:00:00Z",
+            "dependencies": deps,
+        }, separators=(",", ":")))
+    return lines
+
+
+def measure(lines: list, compact: bool) -> dict:
+    tracemalloc.start()
+    issues = parse_jsonl(lines, compact=compact)
+    index = HierarchyIndex(issues)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    open_count = len(index.open_descendants("bd-0"))
+    scan_ms = (time.perf_counter() - start) * 1000
+    return {
+        "representation": "IssueRecord" if compact else "dict",
+        "issues": len(issues),
+        "held_mb": round(held / 2**20, 1),
+        "scan_ms": round(scan_ms, 1),
+        "open_descendants": open_count,
+    }
+
+
+def main():
+    count, fanout = 100_000, 10
+    args = sys.argv[1:]
+    while args:
+        flag, value, args = args[0], args[1], args[2:]
+        if flag == "--issues":
+            count = int(value)
+        elif flag == "--fanout":
+            fanout = int(value)
+    lines = export_lines(count, fanout)
+    for compact in (False, True):
+        print(json.dumps(measure(lines, compact)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+End-to-end hook latency over synthetic epic -> ticket -> AC hierarchies.
+
+Builds a Beads database in a scratch project (one epic, `--fanout` children per
+level, `--depth` levels below the epic, a `--blocked` / `--closed` share of
+leaves), puts benchmarks/fake_bd.py on PATH as `bd`, and runs bash_hooks.py as
+Claude Code would for a few representative commands. Each run starts from a
+fresh copy of the database. Prints one JSON object per scenario with the
+median/min wall time, the hook's exit code and the number of bd calls it made.
+With background propagation on (the hook's default, `--async 1`) the time is
+what the agent waits for; the worker's bd calls are not counted, and each run
+waits for the worker to finish before the next database reset.
+
+With --baseline FILE, exits 1 if any scenario's median exceeds the baseline
+median times --tolerance, or its exit code changed. --save-baseline FILE writes
+the current medians for later runs.
+
+--backend fake runs the hook in-process against the in-memory bd_fake.FakeBd
+(no interpreter start, no database), optionally with --latency-ms per bd call
+to model a slow bd; baselines are per backend.
+
+Usage:
+  python3 benchmarks/bench_hierarchy.py [--depth N] [--fanout N] [--blocked R]
+      [--closed R] [--repeat N] [--seed N] [--direct-reads 0|1] [--async 0|1]
+      [--backend subprocess|fake] [--latency-ms MS]
+      [--baseline FILE] [--save-baseline FILE] [--tolerance X]
+"""
+
+import contextlib
+import fcntl
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+HOOKS_DIR = os.path.join(BENCH_DIR, "..", "hooks")
+HOOK = os.path.join(HOOKS_DIR, "bash_hooks.py")
+FAKE_BD = os.path.join(BENCH_DIR, "fake_bd.py")
+
+sys.path.insert(0, BENCH_DIR)
+
+from fake_bd import connect  # noqa: E402
+
+DEFAULTS = {
+    "depth": 2,
+    "fanout": 10,
+    "blocked": 0.1,
+    "closed": 0.2,
+    "repeat": 5,
+    "seed": 1,
+    "direct-reads": "1",
+    "async": "1",
+    "backend": "subprocess",
+    "latency-ms": 0.0,
+    "baseline": None,
+    "save-baseline": None,
+    "tolerance": 1.5,
+}
+
+
+def type_for(level: int) -> str:
+    return ("epic", "ticket")[level] if level < 2 else "ac"
+
+
+def generate_tree(depth: int, fanout: int, blocked: float, closed: float, seed: int) -> dict:
+    """Issue statuses, parents and blockers for one epic, plus the ids used by the scenarios."""
+    rng = random.Random(seed)
+    issues, parents = {"E1": "open"}, {}
+    frontier = ["E1"]
+    for level in range(1, depth + 1):
+        next_frontier = []
+        for parent in frontier:
+            for n in range(fanout):
+                issue_id = f"{parent}.{n}"
+                issues[issue_id], parents[issue_id] = "open", parent
+                next_frontier.append(issue_id)
+        frontier = next_frontier
+    leaves = frontier
+
+    blockers = {}
+    for leaf in leaves:
+        roll = rng.random()
+        if roll < closed:
+            issues[leaf] = "closed"
+        elif roll < closed + blocked:
+            blockers[leaf] = f"X{len(blockers)}"
+    deep = leaves[-1]
+    blockers.setdefault(deep, f"X{len(blockers)}")  # The unblock scenario needs a blocked leaf
+
+    for leaf in blockers:
+        issue_id = leaf
+        while issue_id:
+            issues[issue_id] = "blocked"
+            issue_id = parents.get(issue_id)
+
+    return {
+        "issues": issues,
+        "parents": parents,
+        "blockers": blockers,
+        "ids": {"epic": "E1", "ticket": "E1.0", "deep": deep, "issues": len(issues) + len(blockers)},
+    }
+
+
+def write_db(tree: dict, db_path: str):
+    conn = connect(db_path)
+    with conn:
+        for issue_id, status in tree["issues"].items():
+            conn.execute(
+                "INSERT INTO issues (id, title, status) VALUES (?, ?, ?)", (issue_id, f"Issue {issue_id}", status)
+            )
+            conn.execute("INSERT INTO labels VALUES (?, ?)", (issue_id, f"type:{type_for(issue_id.count('.'))}"))
+            if issue_id in tree["parents"]:
+                conn.execute(
+                    "INSERT INTO dependencies VALUES (?, ?, 'parent-child')", (issue_id, tree["parents"][issue_id])
+                )
+        for leaf, blocker in tree["blockers"].items():
+            conn.execute("INSERT INTO issues (id, title, status) VALUES (?, ?, 'open')", (blocker, blocker))
+            conn.execute("INSERT INTO dependencies VALUES (?, ?, 'blocks')", (leaf, blocker))
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+
+def load_fake(tree: dict, fake):
+    for issue_id, status in tree["issues"].items():
+        fake.add(
+            issue_id,
+            status,
+            type_for(issue_id.count(".")),
+            tree["parents"].get(issue_id),
+            [tree["blockers"][issue_id]] if issue_id in tree["blockers"] else (),
+            f"Issue {issue_id}",
+        )
+    for blocker in tree["blockers"].values():
+        fake.add(blocker)
+
+
+def scenarios(ids: dict) -> list:
+    """(name, event, command, expected exit code)"""
+    return [
+        ("close_epic", "PreToolUse", f'bd close {ids["epic"]} --reason "Done"', 2),
+        ("cascade_close_epic", "PreToolUse", f'bd close {ids["epic"]} --reason "Out of scope - dropped"', 0),
+        ("unblock_deep_ac", "PreToolUse", f'bd update {ids["deep"]} --status open --comment "blocker fixed"', 0),
+        ("delete_ticket", "PreToolUse", f'bd delete {ids["ticket"]} --hard --force --cascade', 0),
+        ("delete_ticket_post", "PostToolUse", f'bd delete {ids["ticket"]} --hard --force --cascade', 0),
+        ("create_ac", "PreToolUse", f'bd create "New AC" -l type:ac --parent {ids["ticket"]}', 0),
+    ]
+
+
+class SubprocessRunner:
+    """Runs bash_hooks.py as its own process, with fake_bd.py on PATH as `bd`."""
+
+    def __init__(self, work: str, tree: dict, direct_reads: str, async_propagation: str):
+        self.project, bin_dir = os.path.join(work, "project"), os.path.join(work, "bin")
+        os.makedirs(os.path.join(self.project, ".beads"))
+        os.makedirs(bin_dir)
+        with open(os.path.join(bin_dir, "bd"), "w") as f:
+            f.write(f"#!/bin/sh\nexec {sys.executable} {FAKE_BD} \"$@\"\n")
+        os.chmod(os.path.join(bin_dir, "bd"), 0o755)
+
+        self.db_path = os.path.join(self.project, ".beads", "beads.db")
+        self.pristine = os.path.join(work, "pristine.db")
+        write_db(tree, self.pristine)
+        self.trace_path = os.path.join(work, "trace.jsonl")
+        self.env = dict(
+            os.environ,
+            PATH=bin_dir + os.pathsep + os.environ.get("PATH", ""),
+            FAKE_BD_DB=self.db_path,
+            BD_HOOKS_SOCKET=os.path.join(work, "no-server.sock"),
+            BD_HOOKS_ROOT_CACHE=os.path.join(work, "roots.json"),
+            BD_HOOKS_DIRECT_READS=direct_reads,
+            BD_HOOKS_ASYNC=async_propagation,
+            BD_HOOKS_TRACE=self.trace_path,
+        )
+
+    def run(self, event: str, command: str):
+        """(elapsed seconds, exit code, bd calls) for one hook run on a fresh database."""
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.unlink(self.db_path + suffix)
+        shutil.copyfile(self.pristine, self.db_path)
+        payload = json.dumps({"hook_event_name": event, "cwd": self.project, "tool_input": {"command": command}})
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, HOOK], input=payload.encode(), capture_output=True, env=self.env, cwd=self.project
+        )
+        elapsed = time.perf_counter() - start
+        self.wait_for_worker()
+        with open(self.trace_path) as f:
+            runs = [json.loads(line) for line in f]
+        hook_runs = [run for run in runs if run.get("event") != "AsyncPropagation"]
+        calls = len(hook_runs[-1].get("bd_calls", [])) if hook_runs else 0
+        return elapsed, result.returncode, calls
+
+    def wait_for_worker(self):
+        """Let a background propagation worker finish before the database is reset."""
+        lock_path = os.path.join(self.project, ".beads", "hooks", "worker.lock")
+        while os.path.exists(lock_path):
+            with open(lock_path, "a") as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    time.sleep(0.01)
+                    continue
+            if not any(
+                os.path.getsize(os.path.join(self.project, ".beads", "hooks", name)) > 0
+                for name in ("queue.jsonl", "queue.processing.jsonl")
+                if os.path.exists(os.path.join(self.project, ".beads", "hooks", name))
+            ):
+                return
+            time.sleep(0.01)
+
+
+class FakeRunner:
+    """Runs the hook in-process through bash_hooks.evaluate() against bd_fake.FakeBd."""
+
+    def __init__(self, tree: dict, latency_ms: float):
+        sys.path.insert(0, HOOKS_DIR)
+        import bash_hooks
+        import bd_backend
+        from bd_fake import FakeBd
+
+        self.evaluate = bash_hooks.evaluate
+        self.fake = FakeBd(latency=latency_ms / 1000)
+        load_fake(tree, self.fake)
+        self.pristine = self.fake.snapshot()
+        bd_backend.set_backend(self.fake)
+
+    def run(self, event: str, command: str):
+        self.fake.restore(self.pristine)
+        payload = json.dumps({"hook_event_name": event, "cwd": None, "tool_input": {"command": command}})
+        start = time.perf_counter()
+        with contextlib.redirect_stderr(io.StringIO()):
+            code = self.evaluate(payload)
+        return time.perf_counter() - start, code, len(self.fake.calls)
+
+
+def parse_options(args: list) -> dict:
+    options = dict(DEFAULTS)
+    while args:
+        flag, value, args = args[0], args[1], args[2:]
+        name = flag.lstrip("-")
+        if name not in options:
+            sys.exit(f"unknown option {flag}")
+        default = DEFAULTS[name]
+        options[name] = type(default)(value) if default is not None else value
+    return options
+
+
+def main():
+    options = parse_options(sys.argv[1:])
+    baseline = {}
+    if options["baseline"]:
+        with open(options["baseline"]) as f:
+            baseline = json.load(f)
+
+    tree = generate_tree(options["depth"], options["fanout"], options["blocked"], options["closed"], options["seed"])
+    ids = tree["ids"]
+    work = tempfile.mkdtemp(prefix="bench_hierarchy_")
+    try:
+        if options["backend"] == "fake":
+            runner = FakeRunner(tree, options["latency-ms"])
+        else:
+            runner = SubprocessRunner(work, tree, options["direct-reads"], options["async"])
+
+        results, failed = {}, False
+        for name, event, command, expected in scenarios(ids):
+            times = []
+            for _ in range(options["repeat"]):
+                elapsed, code, calls = runner.run(event, command)
+                times.append(elapsed * 1000)
+            median = round(statistics.median(times), 3)
+            result = {
+                "scenario": name,
+                "backend": options["backend"],
+                "issues": ids["issues"],
+                "median_ms": median,
+                "min_ms": round(min(times), 3),
+                "exit_code": code,
+                "bd_calls": calls,
+            }
+            ok = code == expected
+            if name in baseline:
+                ok &= median <= baseline[name] * options["tolerance"]
+                result["baseline_ms"] = baseline[name]
+            result["ok"] = ok
+            failed |= not ok
+            results[name] = median
+            print(json.dumps(result))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    if options["save-baseline"]:
+        with open(options["save-baseline"], "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Point-lookup cost of the mmapped issues.jsonl index against parsing the export.
+
+Writes a synthetic export (default 100k issues) to a temporary directory, then
+measures: a full parse (what a lookup costs without the index), building the
+sidecar index, reopening it, extending it after an append, and point lookups
+at random IDs. Prints one JSON object per measurement; lookup rows include
+p50/p99 microseconds.
+
+Usage:
+  python3 benchmarks/bench_jsonl.py [--issues N] [--lookups N] [--seed N]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks"))
+
+from beads_hierarchy import parse_jsonl  # noqa: E402
+from beads_jsonl import JsonlIndex  # noqa: E402
+from hook_trace import percentile  # noqa: E402
+
+
+def write_export(path: str, count: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            issue = {
+                "id": f"bd-{i:x}",
+                "title": f"Issue {i}",
+                "status": "closed" if i % 3 else "open",
+                "priority": 2,
+                "labels": ["type:ac" if i % 10 else "type:ticket"],
+                "dependencies": [{"issue_id": f"bd-{i:x}", "depends_on_id": f"bd-{i // 10:x}", "type": "parent-child"}] if i else [],
+            }
+            f.write(json.dumps(issue, separators=(",", ":")) + "\n")
+
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - start) * 1000, 2)
+
+
+def main():
+    count, lookups, seed = 100_000, 2000, 1
+    args = sys.argv[1:]
+    while args:
+        flag, value, args = args[0], args[1], args[2:]
+        if flag == "--issues":
+            count = int(value)
+        elif flag == "--lookups":
+            lookups = int(value)
+        elif flag == "--seed":
+            seed = int(value)
+
+    with tempfile.TemporaryDirectory() as directory:
+        jsonl, sidecar = os.path.join(directory, "issues.jsonl"), os.path.join(directory, "issues.jsonl.idx")
+        write_export(jsonl, count)
+        size = os.path.getsize(jsonl)
+
+        def parse():
+            with open(jsonl, encoding="utf-8") as f:
+                return parse_jsonl(f)
+
+        _, ms = timed(parse)
+        print(json.dumps({"case": "full_parse", "issues": count, "bytes": size, "ms": ms}))
+        index, ms = timed(lambda: JsonlIndex.open(jsonl, sidecar))
+        print(json.dumps({"case": "build_index", "issues": count, "ms": ms}))
+        index.close()
+        index, ms = timed(lambda: JsonlIndex.open(jsonl, sidecar))
+        print(json.dumps({"case": "open_index", "issues": count, "ms": ms, "rebuilds": index.rebuilds}))
+
+        rng = random.Random(seed)
+        samples = []
+        for issue_id in (f"bd-{rng.randrange(count):x}" for _ in range(lookups)):
+            start = time.perf_counter()
+            issue = index.get(issue_id)
+            samples.append((time.perf_counter() - start) * 1e6)
+            assert issue is not None and issue["id"] == issue_id
+        print(json.dumps({
+            "case": "point_lookup",
+            "issues": count,
+            "lookups": lookups,
+            "p50_us": round(percentile(samples, 50), 1),
+            "p99_us": round(percentile(samples, 99), 1),
+        }))
+
+        with open(jsonl, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "bd-0", "title": "Issue 0", "status": "closed", "labels": []}) + "\n")
+        issue, ms = timed(lambda: index.get("bd-0"))
+        print(json.dumps({"case": "extend_after_append", "issues": count, "ms": ms, "ok": issue["status"] == "closed"}))
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Per-call cost of hook_log next to the system temp check it instruments.
+
+Times check_system_temp.check_command() alone, then check + one log record
+with the level gate closed (the default), open and buffered, and open and
+flushed to disk (one write per call, as a hook process does at exit). Runs on
+a short command and on a ~1 MB one (truncated in the record). The log goes to
+a temporary directory. Prints one JSON object per case with the mean time per
+call in microseconds.
+
+Usage:
+  python3 benchmarks/bench_logging.py [--number N] [--size BYTES]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks"))
+
+import hook_log  # noqa: E402
+from check_system_temp import check_command  # noqa: E402
+
+
+def check_and_log(command: str, flush: bool = False):
+    check_command(command)
+    hook_log.log("debug", "bench", "command received", command=command)
+    if flush:
+        hook_log.flush()
+
+
+def main():
+    number, size = 2000, 1_000_000
+    args = sys.argv[1:]
+    while args:
+        flag, value, args = args[0], args[1], args[2:]
+        if flag == "--number":
+            number = int(value)
+        elif flag == "--size":
+            size = int(value)
+
+    commands = {
+        "short": "ffmpeg -i in.mkv -c copy out.mkv",
+        "1mb": "cat <<'EOF' > notes.txt\n" + "lorem ipsum dolor sit amet " * (size // 27) + "\nEOF",
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        hook_log.LOG_DIR = directory
+        for name, command in commands.items():
+            n = number if name == "short" else max(1, number // 100)
+            runs = [
+                ("check_only", "warning", lambda: check_command(command)),
+                ("log_gated", "warning", lambda: check_and_log(command)),
+                ("log_buffered", "debug", lambda: check_and_log(command)),
+                ("log_flushed", "debug", lambda: check_and_log(command, flush=True)),
+            ]
+            for case, level, fn in runs:
+                hook_log.LEVEL = hook_log.LEVELS[level]
+                per_call = timeit.timeit(fn, number=n) / n
+                hook_log._buffer.clear()
+                print(json.dumps({"command": name, "case": case, "us_per_call": round(per_call * 1e6, 2)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: cost of parsing one bd command line with bd_command.
+
+Prints one JSON object per command with the mean parse time in microseconds
+(uncached, i.e. the lru_cache in parse_bd_command is cleared every call).
+
+Usage:
+  python3 benchmarks/bench_parse.py [--number N]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks"))
+
+from bd_command import parse_bd_command  # noqa: E402
+
+COMMANDS = [
+    "ls -la",
+    "bd ready",
+    "bd close bd-a1b2 --reason Done",
+    'bd close bd-a1b2 --reason "Out of scope - superseded by bd-c3d4"',
+    'bd update bd-a1b2 --status open --comment "bd-c3d4 landed"',
+    'bd create "Validate frame timing" --label "type:ac" --parent bd-a1b2 --description "Frames within 1ms"',
+    "bd delete bd-a1b2 --hard --force --cascade",
+    "bd dep bd-c3d4 --blocks bd-a1b2 && bd update bd-a1b2 --status blocked",
+    'bd create "Half-quoted title --label type:ticket',
+]
+
+
+def bench(command: str, number: int) -> float:
+    def run():
+        parse_bd_command.cache_clear()
+        parse_bd_command(command)
+
+    return timeit.timeit(run, number=number) / number * 1e6
+
+
+def main():
+    number = 20000
+    if sys.argv[1:2] == ["--number"] and len(sys.argv) == 3:
+        number = int(sys.argv[2])
+    for command in COMMANDS:
+        print(json.dumps({"command": command, "parse_us": round(bench(command, number), 2)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Worst-case scan time of the system temp checks on large commands.
+
+Builds ~1 MB commands that defeat each prefilter in turn and times the full
+check (video tool output + Python tempfile usage) on each. Prints one JSON
+object per input with the best-of-N time in milliseconds.
+
+Usage:
+  python3 benchmarks/bench_patterns.py [--size BYTES] [--repeat N]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks"))
+
+from temp_patterns import check_python_temp_usage, check_video_tool_output  # noqa: E402
+
+
+def fill(unit: str, size: int) -> str:
+    return unit * (size // len(unit) + 1)
+
+
+def inputs(size: int) -> dict:
+    return {
+        # Plain heredoc: no tool, no tempfile, no temp paths
+        "plain_heredoc": "cat <<'EOF' > notes.txt\n" + fill("lorem ipsum dolor sit amet ", size) + "\nEOF",
+        # Video tool present and temp paths everywhere, but nothing written there: full word pass
+        "video_temp_words": "ffmpeg -i in.mkv " + fill("/tmp/scratch/readme.txt /var/log ", size) + " out.mkv",
+        # Python tempfile calls with no SafeVision names: full SafeVision scan per call
+        "python_tempfile": 'python3 -c "' + fill("import tempfile; tempfile.mkdtemp(dir=x); ", size) + '"',
+        # Near-misses for every alternation branch
+        "near_misses": fill("tempfile.mkdtemp( x) ffmpe /tm /va clip_ segment_ frame_ .mk ", size),
+    }
+
+
+def check(command: str):
+    check_video_tool_output(command)
+    check_python_temp_usage(command)
+
+
+def main():
+    size, repeat = 1_000_000, 5
+    args = sys.argv[1:]
+    while args:
+        flag, value, args = args[0], args[1], args[2:]
+        if flag == "--size":
+            size = int(value)
+        elif flag == "--repeat":
+            repeat = int(value)
+    for name, command in inputs(size).items():
+        best = min(timeit.repeat(lambda: check(command), number=1, repeat=repeat))
+        print(json.dumps({"input": name, "bytes": len(command), "check_ms": round(best * 1000, 2)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Startup budget check for the bash_hooks.py fast path.
+
+Runs the hook under `python -X importtime` with payloads no rule cares about
+and compares the modules it imports against a bare interpreter. Fails (exit 1)
+if the fast path imports anything beyond the allowed set, if those extra
+imports exceed the time budget, or if the front-end markers no longer cover
+the temp rules. Prints one JSON object per payload.
+
+Usage:
+  python3 benchmarks/bench_startup.py [--budget-ms MS]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+HOOKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks")
+HOOK = os.path.join(HOOKS_DIR, "bash_hooks.py")
+
+# Modules the fast path may import on top of a bare interpreter.
+ALLOWED_EXTRA = set()
+
+PAYLOADS = {
+    "ls": {"hook_event_name": "PreToolUse", "cwd": "/", "tool_input": {"command": "ls -la"}},
+    "echo_bd": {"hook_event_name": "PreToolUse", "cwd": "/", "tool_input": {"command": "echo bd ready"}},
+    "post_git": {
+        "hook_event_name": "PostToolUse",
+        "cwd": "/",
+        "tool_input": {"command": "git status"},
+        "tool_response": {"stdout": "x" * 100_000},
+    },
+}
+
+
+def import_times(args: list, stdin: bytes = b"") -> dict:
+    """Module -> cumulative import time (us) for top-level imports of a python run."""
+    env = dict(os.environ, BD_HOOKS_SOCKET=os.devnull)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args, input=stdin, capture_output=True, env=env
+    )
+    times = {}
+    for line in result.stderr.decode(errors="replace").splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def check_markers() -> list:
+    """Temp-rule triggers that the front end would wrongly skip."""
+    sys.path.insert(0, HOOKS_DIR)
+    import bash_hooks
+    import temp_patterns
+
+    markers = {m.decode() for m in bash_hooks.FRONT_END_MARKERS}
+    missing = [tool for tool in temp_patterns.VIDEO_TOOLS if tool not in markers]
+    if "tempfile" not in markers:
+        missing.append("tempfile")
+    return missing
+
+
+def main():
+    budget_ms = 2.0
+    if sys.argv[1:2] == ["--budget-ms"] and len(sys.argv) == 3:
+        budget_ms = float(sys.argv[2])
+
+    baseline = import_times(["-c", "pass"])
+    failed = False
+    for name, payload in PAYLOADS.items():
+        times = import_times([HOOK], json.dumps(payload).encode())
+        extra = {m: t for m, t in times.items() if m not in baseline}
+        unexpected = sorted(set(extra) - ALLOWED_EXTRA)
+        extra_ms = sum(extra.values()) / 1000
+        ok = not unexpected and extra_ms <= budget_ms
+        failed |= not ok
+        print(json.dumps({"payload": name, "extra_imports": unexpected, "extra_ms": extra_ms, "ok": ok}))
+
+    missing = check_markers()
+    if missing:
+        failed = True
+        print(json.dumps({"check": "front_end_markers", "missing": missing, "ok": False}))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Check that bd_command.parse_bd_command feeds the hook rules what the per-rule
+regexes it replaced did.
+
+For every command in CORPUS, extracts the values the rules decide on (verb
+matches, issue IDs, status, reason, comment, labels, parent, delete flags,
+--blocks target) twice: with the regex helpers bash_hooks.py used before the
+parser (copied below unchanged) and with the parser. Differences must be
+exactly the intended ones listed in CHANGES; anything else, or a listed
+change that no longer shows up, fails the check. VERDICTS then runs the
+current rules on a small FakeBd project for the commands whose verdict the
+parser deliberately changed.
+
+Exit code 0 when everything matches, 1 otherwise.
+
+Usage:
+  python3 benchmarks/check_parse_parity.py [--verbose]
+"""
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "hooks"))
+
+import bash_hooks  # noqa: E402
+import bd_backend  # noqa: E402
+from bd_command import parse_bd_command  # noqa: E402
+from bd_fake import FakeBd  # noqa: E402
+
+CORPUS = [
+    "ls -la", "bd ready", "bd ready --json", "  bd ready", "bd list", "bd show E", "bd --version",
+    "bd delete T1", "bd delete T1 --hard", "bd delete T1 --force", "bd delete T1 --hard --force",
+    "bd delete T0.A0 --hard --force", "bd delete T1 --hard --force --cascade",
+    "bd update T0 --status done", "bd update T0 --status open", "bd update T0 -s in_progress",
+    "bd update T0.A0 --status in_progress", "bd update T0.A1 --status blocked", "bd update T1.A1 --status blocked",
+    "bd update T1.A1 --status open", 'bd update T1.A1 --status open --comment "resolved by X"',
+    "bd update T1.A1 --status open -m 'X done'", 'bd update T1.A1 --status in_progress --message "ok"',
+    'bd update T1 --status open --comment "c"', "bd update T1.A1 --status open --comment fixed",
+    'bd update T0 --title "New title"', "bd update T0 --status pending_approval",
+    "bd close T0.A0", "bd close T0.A0 --reason Done", 'bd close T0.A0 --reason "Done"', "bd close T0.A0 -r 'Fixed'",
+    'bd close T0.A0 --reason "all ACs complete"', 'bd close T0.A0 --reason "Finished"', "bd close T0 --reason Done",
+    "bd close E --reason Done", 'bd close E --reason "Out of scope - later"', 'bd close T2 --reason "Duplicate - of T1"',
+    'bd close T2 --reason "Duplicate"', 'bd close T2 --reason "Wont implement - nah"',
+    'bd create "X"', 'bd create "X" --label "type:epic"', 'bd create "X" --label "type:epic" --type epic',
+    'bd create "X" -l type:epic -t epic', 'bd create "X" --label type:ticket --parent E',
+    'bd create "X" --label type:ticket --parent T0', 'bd create "X" --label type:ticket --parent T0.A0',
+    'bd create "X" --label "type:ac" --parent T0', 'bd create "X" --label "type:ac"',
+    'bd create "X" --label "type:ac" --parent E', 'bd create "X" --label "type:ac" --parent T0.A0',
+    'bd create "X" --labels "foo,type:research"', 'bd create "Fix the ac" --label type:ticket',
+    'bd create "X" --label "type:ac" -p T1', "bd dep X --blocks T0", "bd close T0.A0 --reason Done && echo ok",
+    "bd update T0.A0 --status in_progress; ls",
+    "ffmpeg -i a.mkv -o /tmp/x.mkv", "python -c \"import tempfile; tempfile.mkdtemp(); open('a.mkv')\"", "echo /tmp/x",
+]
+
+# command -> {field: (old value, new value)}: the behaviour changes the parser makes on purpose.
+CHANGES = {
+    # An unquoted comment counts as an explanation; the regexes only saw quoted ones.
+    "bd update T1.A1 --status open --comment fixed": {"update.comment": (None, "fixed")},
+    # Parsing stops at the shell operator; the regexes read the status as "in_progress;".
+    "bd update T0.A0 --status in_progress; ls": {
+        "update.status": ("in_progress;", "in_progress"),
+        "parse_update.status": ("in_progress;", "in_progress"),
+    },
+}
+
+# command -> expected PreToolUse guard verdict ("allow"/"block") with the parser, for the CHANGES commands.
+VERDICTS = {
+    "bd update T1.A1 --status open --comment fixed": "allow",  # The regexes blocked: "Unblocking requires explanation"
+    "bd update T0.A0 --status in_progress; ls": "allow",  # The regexes blocked: 'Invalid status "in_progress;"'
+}
+
+
+# -- the regex helpers bash_hooks.py used before bd_command (unchanged) ------
+
+
+def has_type_label(command: str, type_name: str) -> bool:
+    label_patterns = [
+        rf'(?:--labels?|-l)\s+"[^"]*type:{type_name}[^"]*"',
+        rf"(?:--labels?|-l)\s+'[^']*type:{type_name}[^']*'",
+        rf"(?:--labels?|-l)\s+\S*type:{type_name}\S*",
+    ]
+    for pattern in label_patterns:
+        if re.search(pattern, command, re.IGNORECASE):
+            return True
+    return False
+
+
+def has_any_type_label(command: str):
+    for type_name in ["epic", "ticket", "ac", "research"]:
+        if has_type_label(command, type_name):
+            return type_name
+    return None
+
+
+def has_epic_type(command: str) -> bool:
+    type_patterns = [
+        r'(?:--type|-t)\s+"?epic"?(?:\s|$)',
+        r"(?:--type|-t)\s+'?epic'?(?:\s|$)",
+    ]
+    for pattern in type_patterns:
+        if re.search(pattern, command, re.IGNORECASE):
+            return True
+    return False
+
+
+def has_parent_flag(command: str):
+    parent_patterns = [
+        r'(?:--parent|-p)\s+"([^"]+)"',
+        r"(?:--parent|-p)\s+'([^']+)'",
+        r"(?:--parent|-p)\s+(\S+)",
+    ]
+    for pattern in parent_patterns:
+        match = re.search(pattern, command)
+        if match:
+            return match.group(1)
+    return None
+
+
+def has_comment_flag(command: str):
+    patterns = [
+        r'(?:--comment|-m|--message)\s+"([^"]+)"',
+        r"(?:--comment|-m|--message)\s+'([^']+)'",
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, command)
+        if match:
+            return match.group(1)
+    return None
+
+
+def parse_issue_id_from_command(command: str, verb: str):
+    cmd_clean = re.sub(r'(?:-s|--status)\s+\S+', '', command)
+    cmd_clean = re.sub(r'(?:-r|--reason)\s+(?:"[^"]*"|\'[^\']*\'|\S+)', '', cmd_clean)
+    cmd_clean = re.sub(r'(?:--comment|-m|--message)\s+(?:"[^"]*"|\'[^\']*\'|\S+)', '', cmd_clean)
+    parts = cmd_clean.split()
+    for i, part in enumerate(parts):
+        if i >= 2 and not part.startswith("-"):
+            return part
+    return None
+
+
+def parse_bd_close(command: str):
+    if not re.match(r"^\s*bd\s+close\b", command):
+        return None, None
+    reason_match = re.search(r'(?:-r|--reason)\s+["\']([^"\']+)["\']', command)
+    if not reason_match:
+        reason_match = re.search(r"(?:-r|--reason)\s+(\S+)", command)
+    reason = reason_match.group(1) if reason_match else None
+    cmd_without_reason = re.sub(r'(?:-r|--reason)\s+(?:"[^"]*"|\'[^\']*\'|\S+)', "", command)
+    parts = cmd_without_reason.split()
+    issue_id = None
+    for i, part in enumerate(parts):
+        if i >= 2 and not part.startswith("-"):
+            issue_id = part
+            break
+    return issue_id, reason
+
+
+def parse_bd_update(command: str):
+    if not re.match(r"^\s*bd\s+update\b", command):
+        return None, None
+    status_match = re.search(r"(?:-s|--status)\s+(\S+)", command)
+    if not status_match:
+        return None, None
+    status = status_match.group(1)
+    cmd_without_status = re.sub(r"(?:-s|--status)\s+\S+", "", command)
+    parts = cmd_without_status.split()
+    issue_id = None
+    for i, part in enumerate(parts):
+        if i >= 2 and not part.startswith("-"):
+            issue_id = part
+            break
+    return issue_id, status
+
+
+def parse_bd_dep_blocks(command: str):
+    if not re.match(r"^\s*bd\s+dep\b", command):
+        return None
+    blocks_match = re.search(r'(?:--blocks|-b)\s+(\S+)', command)
+    return blocks_match.group(1) if blocks_match else None
+
+
+def close_reason(command: str):
+    """The reason check_bd_command_guard read (double, then single quotes, then bare)."""
+    reason_match = re.search(r'(?:-r|--reason)\s+"([^"]+)"', command)
+    if not reason_match:
+        reason_match = re.search(r"(?:-r|--reason)\s+'([^']+)'", command)
+    if not reason_match:
+        reason_match = re.search(r"(?:-r|--reason)\s+(\S+)", command)
+    return reason_match.group(1) if reason_match else None
+
+
+# -- the two extractions ------------------------------------------------------
+
+
+def regex_fields(command: str) -> dict:
+    fields = {}
+    if re.match(r"^\s*bd\s+ready\b", command):
+        fields["ready"] = True
+    if re.match(r"^\s*bd\s+delete\b", command):
+        fields["delete.flags"] = ("--hard" in command, "--force" in command, "--cascade" in command)
+        fields["delete.id"] = parse_issue_id_from_command(command, "delete")
+    if re.match(r"^\s*bd\s+update\b", command):
+        status_match = re.search(r"(?:-s|--status)\s+(\S+)", command)
+        if status_match:
+            fields["update.status"] = status_match.group(1).lower()
+            fields["update.id"] = parse_issue_id_from_command(command, "update")
+            fields["update.comment"] = has_comment_flag(command)
+        fields["parse_update.id"], fields["parse_update.status"] = parse_bd_update(command)
+    if re.match(r"^\s*bd\s+close\b", command):
+        fields["close.reason"] = close_reason(command)
+        fields["parse_close.id"], fields["parse_close.reason"] = parse_bd_close(command)
+    if re.match(r"^\s*bd\s+create\b", command):
+        fields["create.epic_misconfigured"] = has_type_label(command, "epic") and not has_epic_type(command)
+        fields["create.type_label"] = has_any_type_label(command)
+        fields["create.parent"] = has_parent_flag(command)
+    if re.match(r"^\s*bd\s+dep\b", command):
+        fields["dep.blocks"] = parse_bd_dep_blocks(command)
+    return fields
+
+
+def parser_fields(command: str) -> dict:
+    fields = {}
+    cmd = parse_bd_command(command)
+    if cmd is None:
+        return fields
+    if cmd.verb == "ready":
+        fields["ready"] = True
+    if cmd.verb == "delete":
+        fields["delete.flags"] = (cmd.has_flag("hard"), cmd.has_flag("force"), cmd.has_flag("cascade"))
+        fields["delete.id"] = cmd.issue_id
+    if cmd.verb == "update":
+        if cmd.status:
+            fields["update.status"] = cmd.status.lower()
+            fields["update.id"] = cmd.issue_id
+            fields["update.comment"] = cmd.comment
+        fields["parse_update.id"], fields["parse_update.status"] = bash_hooks.parse_bd_update(command)
+    if cmd.verb == "close":
+        fields["close.reason"] = cmd.reason
+        fields["parse_close.id"], fields["parse_close.reason"] = bash_hooks.parse_bd_close(command)
+    if cmd.verb == "create":
+        fields["create.epic_misconfigured"] = cmd.has_label("type:epic") and (cmd.issue_type or "").lower() != "epic"
+        fields["create.type_label"] = cmd.type_label()
+        fields["create.parent"] = cmd.parent
+    if cmd.verb == "dep":
+        fields["dep.blocks"] = bash_hooks.parse_bd_dep_blocks(command)
+    return fields
+
+
+def field_differences(command: str) -> dict:
+    old, new = regex_fields(command), parser_fields(command)
+    return {k: (old.get(k), new.get(k)) for k in sorted(set(old) | set(new)) if old.get(k) != new.get(k)}
+
+
+def guard_verdict(command: str) -> str:
+    """The PreToolUse bd guard's verdict on a small project: T1.A1 blocked by X, the rest open."""
+    fake = FakeBd()
+    fake.add("E", issue_type="epic")
+    for t in range(3):
+        fake.add(f"T{t}", issue_type="ticket", parent="E")
+        for a in range(2):
+            fake.add(f"T{t}.A{a}", issue_type="ac", parent=f"T{t}")
+    fake.add("X", issue_type="ticket", parent="E")
+    fake.add("T1.A1", status="blocked", issue_type="ac", parent="T1", blocked_by=("X",))
+    previous = bd_backend.set_backend(fake)
+    try:
+        bash_hooks.reset_hook_state()
+        return "block" if bash_hooks.check_bd_command_guard(command) else "allow"
+    finally:
+        bd_backend.set_backend(previous)
+        bash_hooks.reset_hook_state()
+
+
+def main():
+    verbose = "--verbose" in sys.argv[1:]
+    failures = 0
+    for command in CORPUS:
+        found, expected = field_differences(command), CHANGES.get(command, {})
+        if found != expected:
+            failures += 1
+            print(f"MISMATCH {command!r}: differences {found}, expected {expected}")
+        elif verbose:
+            print(f"ok {command!r}" + (f" (intended: {found})" if found else ""))
+    for command, expected in VERDICTS.items():
+        verdict = guard_verdict(command)
+        if verdict != expected:
+            failures += 1
+            print(f"VERDICT {command!r}: {verdict}, expected {expected}")
+    print(f"checked {len(CORPUS)} commands, {len(VERDICTS)} verdicts: {failures} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
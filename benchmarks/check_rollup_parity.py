@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Check that the rollup counters never change a hook verdict.
+
+Every scenario builds a small Beads database (benchmarks/fake_bd.py schema)
+twice. In one copy the rollup index is built and stamped first, then the
+data changes behind the hooks' back: an import that keeps older updated_at
+values, a write in the same second as the stamp, an issue deleted and
+re-inserted, a child moved to another parent, and a hook write folded while
+another agent wrote too. The other copy gets the same changes with
+BD_HOOKS_ROLLUPS=0. Both then decide the completion close of the epic
+(`bd close E --reason Done`: allow or block) and plan the unblock of a
+blocked AC (`bd update ... --status open`: which ancestors are reopened).
+The two verdicts must match in every scenario.
+
+Exit code 0 when everything matches, 1 otherwise.
+
+Usage:
+  python3 benchmarks/check_rollup_parity.py [--verbose]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "hooks"))
+sys.path.insert(0, BENCH_DIR)
+
+import bash_hooks  # noqa: E402
+from fake_bd import connect, now  # noqa: E402
+
+OLD = "2020-01-01 00:00:00"  # Older than anything the base tree is stamped with
+
+# E: T0 -> T0.A0, T0.A1; T1 -> T1.A0 (all closed). U (blocked) -> V (blocked) -> V.A0 (blocked), V.A1 (open).
+BASE = [
+    ("E", None, "closed"), ("T0", "E", "closed"), ("T0.A0", "T0", "closed"), ("T0.A1", "T0", "closed"),
+    ("T1", "E", "closed"), ("T1.A0", "T1", "closed"), ("O", None, "open"), ("O.A0", "O", "open"),
+    ("U", None, "blocked"), ("V", "U", "blocked"), ("V.A0", "V", "blocked"), ("V.A1", "V", "open"),
+]
+
+
+def reopen_with_old_timestamp(conn):
+    conn.execute("UPDATE issues SET status = 'open', updated_at = ? WHERE id = 'T0.A1'", (OLD,))
+
+
+def block_sibling_with_old_timestamp(conn):
+    conn.execute("UPDATE issues SET status = 'blocked', updated_at = ? WHERE id = 'V.A1'", (OLD,))
+
+
+def reopen_in_the_same_second(conn):
+    (newest,) = conn.execute("SELECT MAX(updated_at) FROM issues").fetchone()
+    conn.execute("UPDATE issues SET status = 'open', updated_at = ? WHERE id = 'T1.A0'", (newest,))
+
+
+def reinsert_open(conn):
+    conn.execute("DELETE FROM issues WHERE id = 'T0.A0'")
+    conn.execute(
+        "INSERT INTO issues (id, title, status, issue_type, updated_at) VALUES ('T0.A0', 'T0.A0', 'open', 'ac', ?)",
+        (OLD,),
+    )
+
+
+def move_open_child_under_epic(conn):
+    conn.execute("DELETE FROM dependencies WHERE issue_id = 'O.A0'")
+    conn.execute("INSERT INTO dependencies VALUES ('O.A0', 'T1', 'parent-child')")
+
+
+def hook_write_beside_foreign_write(conn):
+    """The hook closes O.A0 and folds it in; meanwhile another agent reopened T0.A1 with an old timestamp."""
+    expected = bash_hooks.current_signature()
+    reopen_with_old_timestamp(conn)
+    conn.execute("UPDATE issues SET status = 'closed', updated_at = ? WHERE id = 'O.A0'", (now(),))
+    conn.commit()
+    bash_hooks.note_status_writes(expected, {"O.A0": "closed"})
+
+
+def fresh_status_change(conn):
+    conn.execute("UPDATE issues SET status = 'closed', updated_at = ? WHERE id = 'V.A1'", (now(),))
+
+
+SCENARIOS = {
+    "unchanged": lambda conn: None,
+    "reopen with an older updated_at": reopen_with_old_timestamp,
+    "block a sibling with an older updated_at": block_sibling_with_old_timestamp,
+    "reopen in the stamp's second": reopen_in_the_same_second,
+    "delete and re-insert as open": reinsert_open,
+    "move an open child under the epic": move_open_child_under_epic,
+    "hook write folded beside a foreign write": hook_write_beside_foreign_write,
+    "status change with a new updated_at": fresh_status_change,
+}
+
+
+def build_project(root: str):
+    os.makedirs(os.path.join(root, ".beads"))
+    conn = connect(os.path.join(root, ".beads", "beads.db"))
+    for issue_id, parent, status in BASE:
+        conn.execute(
+            "INSERT INTO issues (id, title, status, issue_type, updated_at) VALUES (?, ?, ?, 'task', ?)",
+            (issue_id, issue_id, status, now()),
+        )
+        if parent:
+            conn.execute("INSERT INTO dependencies VALUES (?, ?, 'parent-child')", (issue_id, parent))
+    conn.commit()
+    return conn
+
+
+def verdicts(root: str, rollups: bool, change) -> tuple:
+    """(close E verdict, unblock plan for V.A0) after `change`, the index stamped beforehand when `rollups`."""
+    bash_hooks.ROLLUPS = rollups
+    bash_hooks.ATTRIBUTE_CACHE = False  # Parents from the database, not a cache one copy filled earlier
+    conn = build_project(root)
+    try:
+        bash_hooks.reset_hook_state()
+        bash_hooks._HOOK_CWD = root
+        if rollups and bash_hooks.get_rollups() is None:
+            raise RuntimeError("rollup index could not be built")
+        change(conn)
+        conn.commit()
+        bash_hooks.reset_hook_state()
+        bash_hooks._HOOK_CWD = root
+        close = "block" if bash_hooks.handle_bd_status_propagation("bd close E --reason Done") else "allow"
+        bash_hooks.reset_hook_state()
+        bash_hooks._HOOK_CWD = root
+        unblock = bash_hooks.propagate_unblock_up_chain("V.A0", bash_hooks.MutationBatch())
+        return close, unblock
+    finally:
+        conn.close()
+        bash_hooks.reset_hook_state()
+
+
+def main():
+    verbose = "--verbose" in sys.argv[1:]
+    failures = 0
+    work = tempfile.mkdtemp(prefix="rollup-parity-")
+    try:
+        for n, (name, change) in enumerate(SCENARIOS.items()):
+            with_rollups = verdicts(os.path.join(work, f"{n}-on"), True, change)
+            without = verdicts(os.path.join(work, f"{n}-off"), False, change)
+            if with_rollups != without:
+                failures += 1
+                print(f"MISMATCH {name}: rollups {with_rollups}, no rollups {without}")
+            elif verbose:
+                print(f"ok {name}: {without}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    print(f"checked {len(SCENARIOS)} scenarios: {failures} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Minimal `bd` stand-in backed by a Beads-schema SQLite database.
+
+Implements just the subcommands the hooks call (show, list --parent, dep list,
+dep --blocks, update, close, create, delete, admin compact, export) with the
+same JSON shapes, so benchmarks can run the hooks end to end without a real bd
+install. The database path comes from FAKE_BD_DB (default .beads/beads.db).
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+
+# Value-taking flag spellings -> canonical name
+VALUE_FLAGS = {
+    "--status": "status", "-s": "status", "--reason": "reason", "-r": "reason",
+    "--comment": "comment", "-m": "comment", "--parent": "parent", "-p": "parent",
+    "--label": "labels", "--labels": "labels", "-l": "labels", "--type": "type", "-t": "type",
+    "--blocks": "blocks", "-b": "blocks", "--title": "title",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    id TEXT PRIMARY KEY, title TEXT NOT NULL, description TEXT DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'open', priority INTEGER NOT NULL DEFAULT 2,
+    issue_type TEXT NOT NULL DEFAULT 'task', assignee TEXT,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS dependencies (
+    issue_id TEXT NOT NULL, depends_on_id TEXT NOT NULL, type TEXT NOT NULL DEFAULT 'blocks',
+    PRIMARY KEY (issue_id, depends_on_id)
+);
+CREATE INDEX IF NOT EXISTS idx_dependencies_issue ON dependencies(issue_id);
+CREATE INDEX IF NOT EXISTS idx_dependencies_depends_on ON dependencies(depends_on_id);
+CREATE TABLE IF NOT EXISTS labels (issue_id TEXT NOT NULL, label TEXT NOT NULL, PRIMARY KEY (issue_id, label));
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")  # bd uses WAL; hook snapshots must not block writes
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def now() -> str:
+    """updated_at for a write: CURRENT_TIMESTAMP's format, with nanoseconds so writes stay ordered."""
+    ns = time.time_ns()
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ns // 10**9)) + f".{ns % 10**9:09d}"
+
+
+def parse_args(args: list):
+    positionals, flags = [], {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        i += 1
+        if not arg.startswith("-"):
+            positionals.append(arg)
+        elif arg in VALUE_FLAGS and i < len(args):
+            flags.setdefault(VALUE_FLAGS[arg], []).append(args[i])
+            i += 1
+        else:
+            flags[arg.lstrip("-")] = [True]
+    return positionals, flags
+
+
+def issue_dict(conn: sqlite3.Connection, issue_id: str):
+    row = conn.execute(
+        "SELECT id, title, status, priority, issue_type FROM issues WHERE id = ?", (issue_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    deps = conn.execute(
+        "SELECT depends_on_id, type FROM dependencies WHERE issue_id = ? ORDER BY depends_on_id", (issue_id,)
+    ).fetchall()
+    labels = [r[0] for r in conn.execute("SELECT label FROM labels WHERE issue_id = ? ORDER BY label", (issue_id,))]
+    parent = next((d for d, t in deps if t == "parent-child"), None)
+    return {
+        "id": row[0], "title": row[1], "status": row[2], "priority": row[3], "issue_type": row[4],
+        "labels": labels, "parent": parent,
+        "dependencies": [{"issue_id": row[0], "depends_on_id": d, "type": t} for d, t in deps],
+    }
+
+
+def children_ids(conn: sqlite3.Connection, issue_id: str) -> list:
+    return [r[0] for r in conn.execute(
+        "SELECT issue_id FROM dependencies WHERE depends_on_id = ? AND type = 'parent-child' ORDER BY issue_id",
+        (issue_id,),
+    )]
+
+
+def visible(conn: sqlite3.Connection, ids: list) -> list:
+    issues = [issue_dict(conn, i) for i in ids]
+    return [i for i in issues if i and i["status"] != "tombstone"]
+
+
+def set_status(conn: sqlite3.Connection, ids: list, status: str) -> int:
+    missing = [i for i in ids if issue_dict(conn, i) is None]
+    if missing:
+        print(f"Error: issue not found: {missing[0]}", file=sys.stderr)
+        return 1
+    conn.executemany("UPDATE issues SET status = ?, updated_at = ? WHERE id = ?", [(status, now(), i) for i in ids])
+    conn.commit()
+    print(json.dumps(visible(conn, ids)))
+    return 0
+
+
+def run(conn: sqlite3.Connection, args: list) -> int:
+    if not args:
+        return 1
+    verb, (positionals, flags) = args[0], parse_args(args[1:])
+
+    if verb == "show":
+        issues = visible(conn, positionals)
+        if not issues:
+            print(f"Error: issue not found: {positionals[0] if positionals else ''}", file=sys.stderr)
+            return 1
+        print(json.dumps(issues))
+    elif verb == "list":
+        parent = flags.get("parent", [None])[0]
+        ids = children_ids(conn, parent) if parent else [r[0] for r in conn.execute("SELECT id FROM issues")]
+        print(json.dumps(visible(conn, ids)))
+    elif verb == "dep" and positionals[:1] == ["list"]:
+        rows = conn.execute(
+            "SELECT depends_on_id, type FROM dependencies WHERE issue_id = ? AND type = 'blocks' ORDER BY depends_on_id",
+            (positionals[1],),
+        )
+        print(json.dumps([{"id": d, "type": t} for d, t in rows]))
+    elif verb == "dep" and "blocks" in flags:
+        conn.execute("INSERT OR IGNORE INTO dependencies VALUES (?, ?, 'blocks')", (flags["blocks"][0], positionals[0]))
+        conn.commit()
+    elif verb == "update":
+        return set_status(conn, positionals, flags["status"][0]) if "status" in flags else 0
+    elif verb == "close":
+        return set_status(conn, positionals, "closed")
+    elif verb == "create":
+        count = conn.execute("SELECT COUNT(*) FROM issues").fetchone()[0]
+        issue_id = f"bd-new{count}"
+        conn.execute(
+            "INSERT INTO issues (id, title, updated_at) VALUES (?, ?, ?)",
+            (issue_id, positionals[0] if positionals else "", now()),
+        )
+        for label in flags.get("labels", []):
+            conn.executemany("INSERT INTO labels VALUES (?, ?)", [(issue_id, l) for l in label.split(",")])
+        if "parent" in flags:
+            conn.execute("INSERT INTO dependencies VALUES (?, ?, 'parent-child')", (issue_id, flags["parent"][0]))
+        conn.commit()
+        print(json.dumps(issue_dict(conn, issue_id)))
+    elif verb == "delete":
+        ids, frontier = [], list(positionals)
+        while frontier:
+            ids.extend(frontier)
+            frontier = [c for i in frontier for c in children_ids(conn, i)] if "cascade" in flags else []
+        conn.executemany("UPDATE issues SET status = 'tombstone', updated_at = ? WHERE id = ?", [(now(), i) for i in ids])
+        conn.commit()
+    elif verb == "admin":
+        dead = [r[0] for r in conn.execute("SELECT id FROM issues WHERE status = 'tombstone'")]
+        for table, column in (("labels", "issue_id"), ("dependencies", "issue_id"), ("issues", "id")):
+            conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", [(i,) for i in dead])
+        conn.commit()
+    elif verb == "export":
+        for (issue_id,) in conn.execute("SELECT id FROM issues ORDER BY id").fetchall():
+            print(json.dumps(issue_dict(conn, issue_id)))
+    else:
+        print("[]")
+    return 0
+
+
+def main():
+    conn = connect(os.environ.get("FAKE_BD_DB", os.path.join(".beads", "beads.db")))
+    try:
+        sys.exit(run(conn, sys.argv[1:]))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
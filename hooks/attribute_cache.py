@@ -0,0 +1,119 @@
+"""
+Cache of issue attributes that hardly ever change, kept between hook runs.
+
+An issue's type label (`type:epic/ticket/ac/research`) and its parent are set
+at creation and almost never touched afterwards, yet the create checks look
+them up on every run. This cache keeps them per project in
+.beads/hooks/attributes.db (SQLite, ignored by git), so a run that only needs
+"what type is the parent?" does no bd call at all. IDs that turned out not to
+exist are remembered too, for a short time only (MISSING_TTL seconds), since
+they may be created at any moment.
+
+Entries are dropped when the hooks see the commands that change these fields
+(`bd delete`, `bd update --parent`, `bd label ...`) and, under hook_server,
+when the file watcher reports the issue changed. The whole cache is dropped
+when beads.db itself is replaced (a different inode: re-init, clone, restore).
+Edits made outside the hooks' view, such as another agent re-parenting an
+issue, can leave an entry stale until one of those happens.
+"""
+
+import os
+import sqlite3
+import time
+from typing import Iterable, Optional
+
+import beads_db
+
+CACHE_FILE = "attributes.db"
+MISSING_TTL = float(os.environ.get("BD_HOOKS_MISSING_TTL", "30"))  # Seconds to remember a missing ID
+MISSING = "missing"  # lookup() result for an ID known not to exist
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS attrs (id TEXT PRIMARY KEY, type TEXT, parent TEXT);
+CREATE INDEX IF NOT EXISTS idx_attrs_parent ON attrs(parent);
+CREATE TABLE IF NOT EXISTS missing (id TEXT PRIMARY KEY, until REAL NOT NULL);
+"""
+
+
+def cache_path(project_root: str) -> str:
+    return os.path.join(project_root, beads_db.HOOKS_DIRNAME, CACHE_FILE)
+
+
+def database_identity(project_root: str) -> str:
+    """Which beads.db file the project has (device and inode); "-" without one."""
+    try:
+        st = os.stat(beads_db.database_path(project_root))
+    except OSError:
+        return "-"
+    return f"{st.st_dev}:{st.st_ino}"
+
+
+class AttributeCache:
+    """(type label, parent) per issue ID, plus short-lived entries for missing IDs."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    @classmethod
+    def open(cls, project_root: str) -> Optional["AttributeCache"]:
+        """The project's cache, emptied first if beads.db was replaced; None if it can't be opened."""
+        try:
+            beads_db.hooks_dir(project_root)
+            conn = sqlite3.connect(cache_path(project_root), timeout=2.0, isolation_level=None)
+            conn.executescript(SCHEMA)
+            identity = database_identity(project_root)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'database'").fetchone()
+            if row is None or row[0] != identity:
+                conn.executescript("DELETE FROM attrs; DELETE FROM missing;")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('database', ?)", (identity,))
+        except (OSError, sqlite3.Error):
+            return None
+        return cls(conn)
+
+    def close(self):
+        self._conn.close()
+
+    def lookup(self, issue_id: str):
+        """(type label or None, parent or None) if cached, MISSING if known absent, else None."""
+        try:
+            row = self._conn.execute("SELECT type, parent FROM attrs WHERE id = ?", (issue_id,)).fetchone()
+            if row is not None:
+                return row
+            row = self._conn.execute("SELECT until FROM missing WHERE id = ?", (issue_id,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return MISSING if row is not None and row[0] > time.time() else None
+
+    def put(self, issue_id: str, type_label: Optional[str], parent: Optional[str]):
+        self._write(
+            ("INSERT OR REPLACE INTO attrs VALUES (?, ?, ?)", (issue_id, type_label, parent)),
+            ("DELETE FROM missing WHERE id = ?", (issue_id,)),
+        )
+
+    def put_missing(self, issue_id: str, ttl: float = MISSING_TTL):
+        if ttl > 0:
+            self._write(("INSERT OR REPLACE INTO missing VALUES (?, ?)", (issue_id, time.time() + ttl)))
+
+    def forget(self, issue_ids: Iterable[str], descendants: bool = False):
+        """Drop entries for these IDs (and, with descendants, for everything cached below them)."""
+        for issue_id in issue_ids:
+            if descendants:
+                self._write((
+                    "WITH RECURSIVE sub(id) AS (SELECT ? UNION SELECT a.id FROM attrs a JOIN sub ON a.parent = sub.id) "
+                    "DELETE FROM attrs WHERE id IN sub", (issue_id,),
+                ))
+            else:
+                self._write(("DELETE FROM attrs WHERE id = ?", (issue_id,)))
+
+    def forget_missing(self):
+        """Drop every negative entry (after a create, which may have made one of them exist)."""
+        self._write(("DELETE FROM missing", ()))
+
+    def _write(self, *statements):
+        """Run (sql, params) statements; a locked or broken cache just stays as it was."""
+        try:
+            for sql, params in statements:
+                self._conn.execute(sql, params)
+        except sqlite3.Error:
+            pass
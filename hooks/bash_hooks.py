@@ -12,22 +12,163 @@ Exit codes:
   2 = Block (command rejected with error message on stderr)
 """
 
-import json
 import os
-import re
-import subprocess
 import sys
-from pathlib import Path
-from typing import Optional, Tuple
+
+# =============================================================================
+# FRONT END (runs before the heavy imports below)
+# =============================================================================
+
+# Unix socket of the long-lived hook server (see hook_server.py)
+HOOK_SERVER_SOCKET = os.environ.get("BD_HOOKS_SOCKET") or os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or os.path.expanduser("~/.claude"), "bash_hooks.sock"
+)
+HOOK_BUDGET = float(os.environ.get("BD_HOOKS_BUDGET", "20"))  # Seconds of bd time per hook run (0 = no limit)
+# Just above the budget, so a run the server has started normally answers
+# before the client gives up and evaluates (with side effects) a second time
+HOOK_SERVER_TIMEOUT = float(
+    os.environ.get("BD_HOOKS_SERVER_TIMEOUT") or (HOOK_BUDGET + 5 if HOOK_BUDGET > 0 else 120)
+)
+
+# Raw-payload markers for the non-bd rules. Must cover temp_patterns.VIDEO_TOOLS
+# and the tempfile calls in temp_patterns.PYTHON_TEMP_PATTERNS
+# (benchmarks/bench_startup.py checks this).
+FRONT_END_MARKERS = (
+    b"ffmpeg", b"mkvmerge", b"mkvextract", b"dovi_tool", b"x265", b"hevc_nvenc", b"tempfile",
+)
+_JSON_SPACE = (b" ", b"\\n", b"\\t", b"\\r")  # Whitespace inside a JSON string, literal or escaped
+
+_STDIN_DATA = None  # Raw payload, read once by front_end()
+
+
+def command_starts_with_bd(raw: bytes) -> bool:
+    """Check whether the payload's tool_input.command starts with `bd`, without parsing JSON.
+
+    Errs towards True: anything that doesn't look like the expected payload
+    shape goes to the full evaluation.
+    """
+    key = raw.find(b'"command"')
+    if key < 0:
+        return True
+    colon = raw.find(b":", key + 9)
+    quote = raw.find(b'"', colon + 1)
+    if colon < 0 or quote < 0 or raw[colon + 1:quote].strip():
+        return True
+    rest = raw[quote + 1:quote + 257]
+    stripped = True
+    while stripped:
+        stripped = False
+        for space in _JSON_SPACE:
+            if rest.startswith(space):
+                rest = rest[len(space):]
+                stripped = True
+    return rest.startswith(b"bd") and rest[2:3] in (b" ", b"\\", b"\t")
+
+
+def needs_evaluation(raw: bytes) -> bool:
+    """False when no rule can fire for this payload: not a bd command, no temp-rule markers."""
+    return any(marker in raw for marker in FRONT_END_MARKERS) or command_starts_with_bd(raw)
+
+
+def forward_to_server(stdin_data: bytes) -> "Optional[int]":
+    """Send the payload to the hook server. Returns its exit code, or None if it is unavailable.
+
+    Protocol: the client writes the raw payload and shuts down its write side;
+    the server answers with the exit code on the first line followed by the
+    stderr bytes to relay verbatim.
+    """
+    import socket
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(HOOK_SERVER_TIMEOUT)
+            sock.connect(HOOK_SERVER_SOCKET)
+            sock.sendall(stdin_data)
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+
+    reply = b"".join(chunks)
+    header, sep, stderr_bytes = reply.partition(b"\n")
+    if not sep or not header.isdigit():
+        return None  # Server went away mid-request (or is restarting)
+    sys.stderr.buffer.write(stderr_bytes)
+    sys.stderr.flush()
+    return int(header)
+
+
+def front_end():
+    """Read the payload; exit without loading the hook rules if nothing can fire or the server answers."""
+    global _STDIN_DATA
+    _STDIN_DATA = sys.stdin.buffer.read()
+    if not needs_evaluation(_STDIN_DATA):
+        sys.exit(0)
+    code = forward_to_server(_STDIN_DATA)
+    if code is not None:
+        sys.exit(code)
+
+
+if __name__ == "__main__" and sys.argv[1:2] not in (["--drain-queue"], ["--rebuild-rollups"]):
+    front_end()
+
+# Everything below loads only when a rule may fire and no server answered.
+import json  # noqa: E402
+import re  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
+from typing import Optional, Tuple  # noqa: E402
+
+import bd_backend  # noqa: E402
+import beads_db  # noqa: E402
+import beads_jsonl  # noqa: E402
+import beads_watch  # noqa: E402
+import hook_log  # noqa: E402
+import hook_trace  # noqa: E402
+import propagation_queue  # noqa: E402
+from attribute_cache import MISSING, AttributeCache  # noqa: E402
+from blocks_graph import BlocksGraph  # noqa: E402
+from rollup_index import RollupIndex  # noqa: E402
+from bd_command import parse_bd_command  # noqa: E402
+from beads_hierarchy import HierarchyIndex, IssueRecord, parse_jsonl  # noqa: E402
+from temp_patterns import check_python_temp_usage, check_video_tool_output  # noqa: E402
 
 
 _HOOK_CWD = None  # Store cwd from stdin for bd commands
 _PROJECT_ROOT = None  # Cached project root (parent of .beads)
+_ROOT_RESOLVED = False  # True once _PROJECT_ROOT has been looked up for this run
+_ROLLUPS = None  # RollupIndex handle for this run (see rollup_handle())
+_ROLLUPS_RESOLVED = False
+_ATTRIBUTES = None  # AttributeCache handle for this run (see attribute_cache())
+_ATTRIBUTES_RESOLVED = False
+_DEADLINE = None  # time.perf_counter() by which this run's bd calls must finish (None = no limit)
 _HOOK_EVENT = None  # PreToolUse or PostToolUse
+_PROJECT_ROOTS = {}  # cwd -> [root, resolved cwd], for the life of the process
+
+HOOK_STATS = os.environ.get("BD_HOOKS_STATS") == "1"  # Report bd call savings on stderr
+DIRECT_READS = os.environ.get("BD_HOOKS_DIRECT_READS", "1") != "0"  # Read beads.db without bd
+HOOK_CONCURRENCY = max(1, int(os.environ.get("BD_HOOKS_CONCURRENCY", "8")))  # Parallel bd reads
+ASYNC_PROPAGATION = os.environ.get("BD_HOOKS_ASYNC", "1") != "0"  # Propagate in a background worker
+ROLLUPS = os.environ.get("BD_HOOKS_ROLLUPS", "1") != "0"  # Keep .beads/hooks/rollups.db counters
+ATTRIBUTE_CACHE = os.environ.get("BD_HOOKS_ATTR_CACHE", "1") != "0"  # Keep .beads/hooks/attributes.db
+
+# On-disk cwd -> project root cache shared by every hook process
+ROOT_CACHE_PATH = os.environ.get("BD_HOOKS_ROOT_CACHE") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "bd_hooks", "project_roots.json"
+)
+ROOT_CACHE_MAX_ENTRIES = 512
+ROLLUP_CATCH_UP_LIMIT = 1000  # Updated issues past which a stale rollup index is recomputed in full
 
 
 def find_project_root(start_path: str) -> Optional[str]:
     """Search upward from start_path to find directory containing .beads with a database."""
+    from pathlib import Path
+
     current = Path(start_path).resolve()
     while current != current.parent:
         beads_dir = current / ".beads"
@@ -46,23 +187,131 @@ def find_project_root(start_path: str) -> Optional[str]:
     return None
 
 
+def has_beads_data(directory: str) -> bool:
+    """True if directory/.beads holds a database or JSONL export (what find_project_root looks for)."""
+    beads_dir = os.path.join(directory, ".beads")
+    return os.path.isfile(os.path.join(beads_dir, "beads.db")) or os.path.isfile(
+        os.path.join(beads_dir, "issues.jsonl")
+    )
+
+
+def _load_root_cache() -> dict:
+    try:
+        with open(ROOT_CACHE_PATH, encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_root_cache(cache: dict):
+    """Write the cache atomically; losing a write only costs a future walk."""
+    if len(cache) > ROOT_CACHE_MAX_ENTRIES:
+        for cwd in list(cache)[:len(cache) - ROOT_CACHE_MAX_ENTRIES]:
+            del cache[cwd]
+    tmp_path = f"{ROOT_CACHE_PATH}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(ROOT_CACHE_PATH), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, ROOT_CACHE_PATH)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _valid_root_entry(entry) -> Optional[str]:
+    """The cached root if it still is the nearest project above the cached (resolved) cwd.
+
+    That needs the root's .beads to still hold data and no directory between
+    cwd and the root to have gained a .beads (e.g. `bd init` in a subproject).
+    """
+    if not (isinstance(entry, list) and len(entry) == 2 and all(isinstance(p, str) for p in entry)):
+        return None
+    root, directory = entry
+    if not has_beads_data(root):
+        return None
+    while directory != root:
+        if os.path.isdir(os.path.join(directory, ".beads")):
+            return None  # Possibly a nearer project: walk again
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None  # Root is not above cwd after all
+        directory = parent
+    return root
+
+
+def find_project_root_cached(cwd: str) -> Optional[str]:
+    """find_project_root backed by the in-process and on-disk caches.
+
+    Cached entries are validated with one stat per directory between cwd and
+    the root, plus the root's own data files; that skips resolving symlinks
+    and probing for beads.db/issues.jsonl at every level. Misses (no .beads
+    found) are not cached, so a later `bd init` is picked up immediately.
+    """
+    root = _valid_root_entry(_PROJECT_ROOTS.get(cwd))
+    if root:
+        return root
+
+    cache = _load_root_cache()
+    root = _valid_root_entry(cache.get(cwd))
+    if root is None:
+        root = find_project_root(cwd)
+        if root is None:
+            return None
+        cache.pop(cwd, None)  # Re-insert at the end: oldest entries are evicted first
+        cache[cwd] = [root, os.path.realpath(cwd)]
+        _save_root_cache(cache)
+    _PROJECT_ROOTS[cwd] = cache[cwd]
+    return root
+
+
 def get_project_root() -> Optional[str]:
     """Get the project root (directory containing .beads)."""
-    global _PROJECT_ROOT
-    if _PROJECT_ROOT is not None:
+    global _PROJECT_ROOT, _ROOT_RESOLVED
+    if _ROOT_RESOLVED:
         return _PROJECT_ROOT
 
     if _HOOK_CWD:
-        _PROJECT_ROOT = find_project_root(_HOOK_CWD)
+        _PROJECT_ROOT = find_project_root_cached(_HOOK_CWD)
+        _ROOT_RESOLVED = True  # Also remember "no project" instead of rescanning per bd call
 
     return _PROJECT_ROOT
 
 
-def get_command() -> str:
+def reset_hook_state():
+    """Clear per-invocation state so one process can serve many hook runs."""
+    global _HOOK_CWD, _PROJECT_ROOT, _ROOT_RESOLVED, _HOOK_EVENT, _ISSUE_STORE, _ROLLUPS, _ROLLUPS_RESOLVED, _DEADLINE
+    global _ATTRIBUTES, _ATTRIBUTES_RESOLVED
+    _HOOK_CWD = None
+    _PROJECT_ROOT = None
+    _ROOT_RESOLVED = False
+    if _ROLLUPS is not None:
+        _ROLLUPS.close()
+    _ROLLUPS = None
+    _ROLLUPS_RESOLVED = False
+    if _ATTRIBUTES is not None:
+        _ATTRIBUTES.close()
+    _ATTRIBUTES = None
+    _ATTRIBUTES_RESOLVED = False
+    _HOOK_EVENT = None
+    _DEADLINE = None
+    if _ISSUE_STORE is not None:
+        if any(warm and warm.store is _ISSUE_STORE for warm in _WARM_STORES.values()):
+            _ISSUE_STORE.release()
+        else:
+            _ISSUE_STORE.close()
+    _ISSUE_STORE = None
+
+
+def get_command(stdin_data: Optional[str] = None) -> str:
     """Extract the command from stdin JSON (Claude Code hook format)."""
     global _HOOK_CWD, _HOOK_EVENT
     try:
-        stdin_data = sys.stdin.read()
+        if stdin_data is None:
+            stdin_data = sys.stdin.read()
         if not stdin_data:
             return ""
         data = json.loads(stdin_data)
@@ -78,71 +327,6 @@ def get_command() -> str:
 # =============================================================================
 
 
-def has_type_label(command: str, type_name: str) -> bool:
-    """Check if command has a label containing 'type:<type_name>'."""
-    label_patterns = [
-        rf'(?:--labels?|-l)\s+"[^"]*type:{type_name}[^"]*"',
-        rf"(?:--labels?|-l)\s+'[^']*type:{type_name}[^']*'",
-        rf"(?:--labels?|-l)\s+\S*type:{type_name}\S*",
-    ]
-    for pattern in label_patterns:
-        if re.search(pattern, command, re.IGNORECASE):
-            return True
-    return False
-
-
-def has_any_type_label(command: str) -> Optional[str]:
-    """Check if command has any type label. Returns the type if found, None otherwise."""
-    for type_name in ["epic", "ticket", "ac", "research"]:
-        if has_type_label(command, type_name):
-            return type_name
-    return None
-
-
-def has_epic_label(command: str) -> bool:
-    """Check if command has a label containing 'type:epic'."""
-    return has_type_label(command, "epic")
-
-
-def has_epic_type(command: str) -> bool:
-    """Check if command has --type epic or -t epic."""
-    type_patterns = [
-        r'(?:--type|-t)\s+"?epic"?(?:\s|$)',
-        r"(?:--type|-t)\s+'?epic'?(?:\s|$)",
-    ]
-    for pattern in type_patterns:
-        if re.search(pattern, command, re.IGNORECASE):
-            return True
-    return False
-
-
-def has_parent_flag(command: str) -> Optional[str]:
-    """Check if command has --parent flag. Returns parent ID if found, None otherwise."""
-    parent_patterns = [
-        r'(?:--parent|-p)\s+"([^"]+)"',
-        r"(?:--parent|-p)\s+'([^']+)'",
-        r"(?:--parent|-p)\s+(\S+)",
-    ]
-    for pattern in parent_patterns:
-        match = re.search(pattern, command)
-        if match:
-            return match.group(1)
-    return None
-
-
-def has_comment_flag(command: str) -> Optional[str]:
-    """Check if command has a comment/message flag. Returns comment text if found."""
-    patterns = [
-        r'(?:--comment|-m|--message)\s+"([^"]+)"',
-        r"(?:--comment|-m|--message)\s+'([^']+)'",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, command)
-        if match:
-            return match.group(1)
-    return None
-
-
 def get_issue_status(issue_id: str) -> Optional[str]:
     """Get current status of an issue."""
     issue = get_issue_json(issue_id)
@@ -151,37 +335,24 @@ def get_issue_status(issue_id: str) -> Optional[str]:
 
 def has_blocking_dependencies(issue_id: str) -> bool:
     """Check if issue has any blocking dependencies (something that blocks it)."""
-    code, stdout, _ = run_bd_command(["dep", "list", issue_id, "--type", "blocks", "--json"])
-    if code != 0 or not stdout.strip():
-        return False
-    try:
-        deps = json.loads(stdout)
-        return len(deps) > 0
-    except:
-        return False
-
-
+    return get_issue_store().blocks_graph().has_blockers(issue_id)
 
 
 def parse_issue_id_from_command(command: str, verb: str) -> Optional[str]:
     """Parse issue ID from a bd command like 'bd update ID ...' or 'bd close ID ...'."""
-    # Remove the status/reason flags to find the bare issue ID
-    cmd_clean = re.sub(r'(?:-s|--status)\s+\S+', '', command)
-    cmd_clean = re.sub(r'(?:-r|--reason)\s+(?:"[^"]*"|\'[^\']*\'|\S+)', '', cmd_clean)
-    cmd_clean = re.sub(r'(?:--comment|-m|--message)\s+(?:"[^"]*"|\'[^\']*\'|\S+)', '', cmd_clean)
-    parts = cmd_clean.split()
-    # Pattern: bd <verb> <issue_id> [other flags]
-    for i, part in enumerate(parts):
-        if i >= 2 and not part.startswith("-"):
-            return part
-    return None
+    cmd = parse_bd_command(command)
+    if cmd is None or cmd.verb != verb:
+        return None
+    return cmd.issue_id
 
 
 def get_issue_type_label(issue_id: str) -> Optional[str]:
     """Get the type label of an issue (epic, ticket, ac, research)."""
-    issue = get_issue_json(issue_id)
-    if not issue:
-        return None
+    attributes = get_issue_attributes(issue_id)
+    return attributes[0] if attributes else None
+
+
+def type_label_of(issue: dict) -> Optional[str]:
     labels = issue.get("labels", [])
     for label in labels:
         if label.startswith("type:"):
@@ -189,6 +360,41 @@ def get_issue_type_label(issue_id: str) -> Optional[str]:
     return None
 
 
+def attribute_cache() -> Optional[AttributeCache]:
+    """The project's persistent type/parent cache, or None if it is off or can't be opened."""
+    global _ATTRIBUTES, _ATTRIBUTES_RESOLVED
+    if not _ATTRIBUTES_RESOLVED:
+        _ATTRIBUTES_RESOLVED = True
+        project_root = get_project_root()
+        if ATTRIBUTE_CACHE and project_root and getattr(bd_backend.get_backend(), "shares_project_files", False):
+            _ATTRIBUTES = AttributeCache.open(project_root)
+    return _ATTRIBUTES
+
+
+def get_issue_attributes(issue_id: str) -> Optional[tuple]:
+    """(type label, parent ID) of an issue, or None if it doesn't exist.
+
+    Answered from the persistent attribute cache when it knows the issue;
+    otherwise read once and recorded there. An ID is recorded as missing only
+    when the lookup showed it does not exist; a bd failure or timeout records
+    nothing, so the next run asks again.
+    """
+    cache = attribute_cache()
+    cached = cache.lookup(issue_id) if cache is not None else None
+    if cached == MISSING:
+        return None
+    if cached is not None:
+        return tuple(cached)
+    issue = get_issue_json(issue_id)
+    attributes = (type_label_of(issue), issue.get("parent")) if issue else None
+    if cache is not None:
+        if attributes:
+            cache.put(issue_id, *attributes)
+        elif get_issue_store().known_missing(issue_id):
+            cache.put_missing(issue_id)
+    return attributes
+
+
 VALID_STATUSES = ["open", "in_progress", "blocked", "pending_approval"]
 
 # Canonical close reason patterns
@@ -226,15 +432,19 @@ def is_valid_close_reason(reason: str) -> Tuple[bool, str]:
 
 def check_bd_command_guard(command: str) -> Optional[str]:
     """Validate bd commands. Returns error message if blocked, None otherwise."""
+    cmd = parse_bd_command(command)
+    if cmd is None:
+        return None
+
     # Block: bd ready
-    if re.match(r"^\s*bd\s+ready\b", command):
+    if cmd.verb == "ready":
         return "BLOCKED: `bd ready` is not permitted\nOnly humans choose what work to execute next."
 
     # Block: bd delete without --hard --force, and require --cascade if has children
-    if re.match(r"^\s*bd\s+delete\b", command):
-        has_hard = "--hard" in command
-        has_force = "--force" in command
-        has_cascade = "--cascade" in command
+    if cmd.verb == "delete":
+        has_hard = cmd.has_flag("hard")
+        has_force = cmd.has_flag("force")
+        has_cascade = cmd.has_flag("cascade")
 
         # Check required flags
         if not has_hard or not has_force:
@@ -247,7 +457,7 @@ def check_bd_command_guard(command: str) -> Optional[str]:
 
         # Check for children - require --cascade if any exist
         if not has_cascade:
-            issue_id = parse_issue_id_from_command(command, "delete")
+            issue_id = cmd.issue_id
             if issue_id:
                 children = get_issue_children(issue_id)
                 if children:
@@ -257,80 +467,83 @@ def check_bd_command_guard(command: str) -> Optional[str]:
                         f"  bd delete {issue_id} --hard --force --cascade"
                     )
 
+    # Block: bd dep edges that would make issues wait on each other forever
+    edge = parse_blocks_edge(cmd)
+    if edge:
+        blocker, blocked = edge
+        path = get_issue_store().blocks_graph().blocking_path(blocker, blocked)
+        if path is not None:
+            if len(path) == 1:
+                return f"BLOCKED: {blocker} cannot block itself"
+            return (
+                f"BLOCKED: {blocker} --blocks {blocked} would create a dependency cycle\n"
+                f"{blocker} already waits on {blocked}: {' <- '.join(path)}\n"
+                "Remove one of those dependencies first (bd dep remove ISSUE BLOCKER)."
+            )
+
     # Block: bd update --status validations
-    if re.match(r"^\s*bd\s+update\b", command):
-        status_match = re.search(r"(?:-s|--status)\s+(\S+)", command)
-        if status_match:
-            new_status = status_match.group(1).lower()
-            issue_id = parse_issue_id_from_command(command, "update")
-
-            # Check 1: Valid status values only
-            if new_status not in VALID_STATUSES:
+    if cmd.verb == "update" and cmd.status:
+        new_status = cmd.status.lower()
+        issue_id = cmd.issue_id
+
+        # Check 1: Valid status values only
+        if new_status not in VALID_STATUSES:
+            return (
+                f'BLOCKED: Invalid status "{new_status}"\n'
+                f'Valid statuses: {", ".join(VALID_STATUSES)}'
+            )
+
+        # Check 2: Can't block closed items
+        if new_status == "blocked" and issue_id:
+            current_status = get_issue_status(issue_id)
+            if current_status == "closed":
                 return (
-                    f'BLOCKED: Invalid status "{new_status}"\n'
-                    f'Valid statuses: {", ".join(VALID_STATUSES)}'
+                    f"BLOCKED: Cannot block closed issue {issue_id}\n"
+                    "Reopen the issue first if work needs to resume."
                 )
 
-            # Check 2: Can't block closed items
-            if new_status == "blocked" and issue_id:
-                current_status = get_issue_status(issue_id)
-                if current_status == "closed":
-                    return (
-                        f"BLOCKED: Cannot block closed issue {issue_id}\n"
-                        "Reopen the issue first if work needs to resume."
-                    )
-
-            # Check 3: Blocking requires a blocking dependency
-            if new_status == "blocked" and issue_id:
-                has_deps = has_blocking_dependencies(issue_id)
-                if not has_deps:
-                    return (
-                        "BLOCKED: Setting status to blocked requires a blocking dependency\n"
-                        f'First add the blocker: bd dep BLOCKER_ID --blocks {issue_id}\n'
-                        f'Then: bd update {issue_id} --status blocked'
-                    )
+        # Check 3: Blocking requires a blocking dependency
+        if new_status == "blocked" and issue_id:
+            has_deps = has_blocking_dependencies(issue_id)
+            if not has_deps:
+                return (
+                    "BLOCKED: Setting status to blocked requires a blocking dependency\n"
+                    f'First add the blocker: bd dep BLOCKER_ID --blocks {issue_id}\n'
+                    f'Then: bd update {issue_id} --status blocked'
+                )
 
-            # Check 4: Unblocking requires explanation
-            if new_status in ("open", "in_progress") and issue_id:
-                current_status = get_issue_status(issue_id)
-                if current_status == "blocked":
-                    has_comment = has_comment_flag(command)
-                    if not has_comment:
-                        return (
-                            "BLOCKED: Unblocking requires explanation\n"
-                            'Add --comment "how block was resolved" to the command\n'
-                            'Example: bd update ID --status open --comment "ticket-123 completed"'
-                        )
+        # Check 4: Unblocking requires explanation
+        if new_status in ("open", "in_progress") and issue_id:
+            current_status = get_issue_status(issue_id)
+            if current_status == "blocked" and not cmd.comment:
+                return (
+                    "BLOCKED: Unblocking requires explanation\n"
+                    'Add --comment "how block was resolved" to the command\n'
+                    'Example: bd update ID --status open --comment "ticket-123 completed"'
+                )
 
     # Block: bd close without --reason or with invalid reason
-    if re.match(r"^\s*bd\s+close\b", command):
-        # Try double-quoted reason first, then single-quoted, then unquoted
-        reason_match = re.search(r'(?:-r|--reason)\s+"([^"]+)"', command)
-        if not reason_match:
-            reason_match = re.search(r"(?:-r|--reason)\s+'([^']+)'", command)
-        if not reason_match:
-            reason_match = re.search(r"(?:-r|--reason)\s+(\S+)", command)
-
-        if not reason_match:
+    if cmd.verb == "close":
+        reason = cmd.reason
+        if not reason:
             return (
                 'BLOCKED: `bd close` requires --reason\n'
                 'Usage: bd close ISSUE_ID --reason "Done"\n'
                 'Valid reasons: Done, Fixed, All ACs complete, Won\'t implement - [why], Duplicate - [of], Out of scope - [why]'
             )
 
-        reason = reason_match.group(1)
         is_valid, suggestion = is_valid_close_reason(reason)
         if not is_valid:
             return f'BLOCKED: Invalid close reason "{reason}"\n{suggestion}'
 
     # Block: bd create validations
-    if re.match(r"^\s*bd\s+create\b", command):
+    if cmd.verb == "create":
         # Check 1: Epic label requires --type epic
-        if has_epic_label(command) and not has_epic_type(command):
+        if cmd.has_label("type:epic") and (cmd.issue_type or "").lower() != "epic":
             return 'BLOCKED: Epic creation misconfigured\nYou specified --label \'type:epic\' but did not set --type epic.\nUsage: bd create "Title" --label "type:epic" --type epic'
 
         # Check 2: Require type label (epic, ticket, ac, or research)
-        type_label = has_any_type_label(command)
+        type_label = cmd.type_label()
         if not type_label:
             return (
                 'BLOCKED: `bd create` requires a type label\n'
@@ -340,7 +553,7 @@ def check_bd_command_guard(command: str) -> Optional[str]:
 
         # Check 3: AC must have --parent
         if type_label == "ac":
-            parent_id = has_parent_flag(command)
+            parent_id = cmd.parent
             if not parent_id:
                 return (
                     'BLOCKED: AC (type:ac) must have a parent ticket\n'
@@ -366,7 +579,7 @@ def check_bd_command_guard(command: str) -> Optional[str]:
 
         # Check 6: Ticket parent (if specified) must be epic, not AC
         if type_label == "ticket":
-            parent_id = has_parent_flag(command)
+            parent_id = cmd.parent
             if parent_id:
                 parent_type = get_issue_type_label(parent_id)
                 if parent_type == "ac":
@@ -385,6 +598,304 @@ def check_bd_command_guard(command: str) -> Optional[str]:
     return None
 
 
+# =============================================================================
+# ROLLUP COUNTERS
+# =============================================================================
+
+
+def rollup_handle() -> Optional[RollupIndex]:
+    """The project's rollup index as stored (no freshness check), or None if there is none."""
+    global _ROLLUPS, _ROLLUPS_RESOLVED
+    if not _ROLLUPS_RESOLVED:
+        _ROLLUPS_RESOLVED = True
+        project_root = get_project_root()
+        if ROLLUPS and project_root and reads_project_files():
+            _ROLLUPS = RollupIndex.open(project_root, create=True)
+    return _ROLLUPS
+
+
+def get_rollups() -> Optional[RollupIndex]:
+    """The rollup index if it describes the current Beads data (rebuilt without bd if stale), else None."""
+    index = rollup_handle()
+    if index is None:
+        return None
+    try:
+        signature = beads_db.source_signature(get_project_root())
+        if signature is None:
+            return None  # No content signature to check the counters against
+        if index.signature == signature or catch_up_rollups(index, signature):
+            return index
+        issues = get_issue_store().hierarchy()
+        if issues is None:
+            return None
+        index.rebuild(issues, signature)  # Stamped with the pre-read signature: a racing write re-stales it
+        return index
+    except Exception:
+        return None  # Locked or corrupt: fall back to walking the tree
+
+
+def catch_up_rollups(index: RollupIndex, signature: str) -> bool:
+    """Bring a stale index forward by re-reading just the issues updated since it was stamped.
+
+    The newest updated_at only says where to look: the catch-up counts only if
+    those issues' status changes account for both checksum sums exactly
+    (accounts_for()), so a write with an older timestamp, or one in the same
+    second, forces a full rebuild. False when the index needs one.
+    """
+    stamped = index.signature
+    old = beads_db.parse_signature(stamped)
+    if old is None or beads_db.parse_signature(signature) is None:
+        return False
+    changed = beads_db.issues_updated_since(get_project_root(), old["updated_at"])
+    if changed is None or len(changed) > ROLLUP_CATCH_UP_LIMIT:
+        return False
+    with index.transaction():
+        if index.signature != stamped or not accounts_for(index, stamped, signature, changed):
+            return False  # Someone else moved it meanwhile, or the updated issues don't explain the sums
+        if not apply_status_changes(index, statuses_of(changed)):
+            return False  # More than statuses changed
+        index.stamp(signature)
+    return True
+
+
+def accounts_for(index: RollupIndex, before: str, after: str, rows: dict) -> bool:
+    """True if `rows` ({id: IssueRow} read after a write) explain every move between two signatures.
+
+    Each row the index knows swaps its old status term for the one read back;
+    one it doesn't know is new, with its parent link. The predicted counts and
+    checksum sums must equal `after`'s, so any other write in between (another
+    issue, an unlinked or relinked parent) shows. Call before updating the
+    index, which still holds the old statuses.
+    """
+    old, new = beads_db.parse_signature(before), beads_db.parse_signature(after)
+    if old is None or new is None or old["database"] != new["database"]:
+        return False
+    issues, issue_sum, links, link_sum = old["issues"], old["issue_sum"], old["links"], old["link_sum"]
+    for issue_id, row in rows.items():
+        status = index.status(issue_id)
+        if status is None:
+            issues += 1
+            if row.link_rowid is not None:
+                links += 1
+                link_sum += beads_db.link_checksum(row.link_rowid, row.parent_rowid)
+        else:
+            issue_sum -= beads_db.issue_checksum(row.rowid, status)
+        issue_sum += beads_db.issue_checksum(row.rowid, row.status)
+    return (issues, issue_sum, links, link_sum) == (new["issues"], new["issue_sum"], new["links"], new["link_sum"])
+
+
+def statuses_of(rows: dict) -> dict:
+    """{id: (status, parent)} from beads_db.issue_rows()."""
+    return {issue_id: (row.status, row.parent) for issue_id, row in rows.items()}
+
+
+def apply_status_changes(index: RollupIndex, changed: dict) -> bool:
+    """Set the statuses of {id: (status, parent)} in the index.
+
+    Writes nothing and returns False unless every issue is visible, known to
+    the index and still under the parent the index has for it.
+    """
+    for issue_id, (status, parent) in changed.items():
+        if status in beads_db.HIDDEN_STATUSES or index.status(issue_id) is None or index.parent(issue_id) != parent:
+            return False
+    for issue_id, (status, _) in changed.items():
+        index.set_status(issue_id, status)
+    return True
+
+
+def current_signature() -> Optional[str]:
+    """Source signature to pass to fold_into_rollups() later, if there is an index to maintain."""
+    if rollup_handle() is None:
+        return None
+    return beads_db.source_signature(get_project_root())
+
+
+def fold_into_rollups(expected: Optional[str], update, touched) -> None:
+    """Fold a write into the rollup index, then re-stamp it with the new signature.
+
+    Only when the index was current at `expected` (the signature just before
+    the write) and the write is shown to be the only one since: the issues in
+    `touched`, read back from the database, account for the new signature's
+    counts and checksums (accounts_for()). If anyone else wrote in between
+    (another agent, the propagation worker), the index is invalidated rather
+    than stamped with data the counters don't describe. `update(index,
+    changed)` gets those issues as {id: (status, parent)}, so the counters
+    follow what direct reads see (nothing, for a write not visible yet), and
+    returns False when it cannot express the write, which invalidates the
+    index too.
+    """
+    index = rollup_handle()
+    if index is None or not expected:
+        return
+    try:
+        with index.transaction():
+            if index.signature != expected:
+                return  # Already stale; the next reader catches up
+            after = beads_db.source_signature(get_project_root())
+            rows = beads_db.issue_rows(get_project_root(), touched) if after else None
+            if rows is None or not accounts_for(index, expected, after, rows):
+                index.invalidate()  # Someone else wrote too
+                return
+            if update(index, statuses_of(rows)) is False:
+                index.invalidate()  # Not expressible in the counters
+                return
+            index.stamp(after)
+    except Exception:
+        pass
+
+
+def invalidate_rollups():
+    """Mark the rollup index stale after writes whose outcome the hook cannot know."""
+    index = rollup_handle()
+    if index is not None:
+        try:
+            index.invalidate()
+        except Exception:
+            pass
+
+
+def note_status_writes(expected: Optional[str], statuses: dict):
+    """Fold the hook's own successful status writes ({issue_id: status}) into the rollups."""
+    if statuses:
+        fold_into_rollups(expected, apply_status_changes, statuses)
+
+
+def rebuild_rollups(project_root: str) -> int:
+    """Rebuild a project's rollup index from scratch (the --rebuild-rollups command). Returns an exit code."""
+    global _HOOK_CWD
+    _HOOK_CWD = project_root
+    try:
+        index = RollupIndex.open(project_root, create=True)
+        if index is None:
+            print(f"ERROR: cannot open {project_root}/.beads/hooks/rollups.db", file=sys.stderr)
+            return 1
+        try:
+            signature = beads_db.source_signature(project_root)
+            if signature is None:
+                print("ERROR: cannot read the issue data's signature (no updated_at column?)", file=sys.stderr)
+                return 1
+            issues = get_issue_store().hierarchy() or load_all_issues()
+            if issues is None:
+                print("ERROR: could not read issues", file=sys.stderr)
+                return 1
+            index.rebuild(issues, signature)
+        finally:
+            index.close()
+        print(f"Rebuilt rollups for {len(issues)} issues", file=sys.stderr)
+        return 0
+    finally:
+        reset_hook_state()
+
+
+# Verbs that never change an issue's status or parent.
+ROLLUP_NEUTRAL_VERBS = {
+    "show", "list", "ready", "blocked", "search", "stats", "export", "label", "comment", "comments", "info",
+}
+
+
+def remember_pre_command_signature(command: str):
+    """PreToolUse, command allowed: note the signature so PostToolUse can fold the command in."""
+    cmd = parse_bd_command(command)
+    if cmd is None or cmd.verb in ROLLUP_NEUTRAL_VERBS:
+        return
+    index = rollup_handle()
+    if index is None:
+        return
+    try:
+        signature = beads_db.source_signature(get_project_root())
+        if signature and index.signature == signature:
+            index.set_meta("before_command", signature)
+    except Exception:
+        pass
+
+
+def fold_command_into_rollups(command: str):
+    """PostToolUse: fold what a bd command changed into the rollups, reading back the real statuses."""
+    cmd = parse_bd_command(command)
+    index = rollup_handle()
+    if cmd is None or index is None:
+        return
+    try:
+        expected = index.get_meta("before_command")
+        index.set_meta("before_command", "")
+    except Exception:
+        return
+    if cmd.verb in ("update", "close", "reopen") and not cmd.parent:
+        fold_into_rollups(expected, apply_status_changes, cmd.positionals)
+    elif cmd.verb == "dep" and cmd.blocks:
+        fold_into_rollups(expected, apply_status_changes, [*cmd.positionals, cmd.blocks])
+    elif cmd.verb == "create" and isinstance(cmd.flags.get("id"), str):
+        issue_id = cmd.flags["id"]
+
+        def add(index: RollupIndex, changed: dict) -> bool:
+            status, parent = changed.pop(issue_id, (None, None))
+            return status is not None and index.add(issue_id, parent, status) and apply_status_changes(index, changed)
+
+        fold_into_rollups(expected, add, [issue_id, cmd.parent])
+    else:
+        # Unknown effect on the hierarchy, or a delete (the links bd drops with
+        # an issue leave no rows to account for the link sum with)
+        fold_into_rollups(expected, lambda index, changed: False, [])
+
+
+# =============================================================================
+# TIME BUDGET
+# =============================================================================
+
+FAIL_OPEN, FAIL_CLOSED = "fail_open", "fail_closed"
+
+# What a rule's verdict becomes when the run's budget runs out before it has
+# finished its bd calls. Validation that could let a bad command through fails
+# closed (the agent can retry); best-effort work fails open.
+RULE_BUDGET_POLICY = {
+    "bd_command_guard": FAIL_CLOSED,  # Parent/type checks: an unverified create must not slip through
+    "status_propagation": FAIL_CLOSED,  # Open-descendant and unblock checks; the writes themselves fail open
+    "post_tool_use": FAIL_OPEN,  # The command already ran; auto-block/purge are conveniences
+    "system_temp": FAIL_OPEN,  # Makes no bd calls, so the budget never cuts it short
+}
+
+
+class BudgetExhausted(Exception):
+    """The hook run's time budget ran out before a bd call could finish."""
+
+
+def start_budget(seconds: float = HOOK_BUDGET):
+    """Give this run `seconds` for all its bd calls (<= 0: no limit)."""
+    global _DEADLINE
+    _DEADLINE = time.perf_counter() + seconds if seconds > 0 else None
+
+
+def budget_remaining() -> Optional[float]:
+    """Seconds left in this run's budget, or None without a limit."""
+    return None if _DEADLINE is None else _DEADLINE - time.perf_counter()
+
+
+def run_rule(name: str, check, *args) -> Optional[str]:
+    """Run one rule under the run's budget. Returns its block message, or None to allow.
+
+    A rule whose bd calls the budget cuts short (or finds no time left for)
+    gets the verdict RULE_BUDGET_POLICY assigns it, and is reported on stderr.
+    Rules that need no bd call always run to completion.
+    """
+    with hook_trace.rule(name):
+        try:
+            return check(*args)
+        except BudgetExhausted:
+            return budget_verdict(name, RULE_BUDGET_POLICY.get(name, FAIL_CLOSED))
+
+
+def budget_verdict(name: str, policy: str) -> Optional[str]:
+    hook_trace.record_skip(name, policy)
+    hook_log.log("warning", "bash_hooks", "budget exhausted", rule=name, policy=policy, budget_s=HOOK_BUDGET)
+    if policy == FAIL_OPEN:
+        print(f"BUDGET: skipped {name} ({HOOK_BUDGET:g}s hook budget used up); command allowed", file=sys.stderr)
+        return None
+    return (
+        f"BLOCKED: {name} could not finish within the {HOOK_BUDGET:g}s hook budget (bd is slow or hung)\n"
+        "Retry the command, or raise BD_HOOKS_BUDGET"
+    )
+
+
 # =============================================================================
 # BEADS STATUS PROPAGATION
 # =============================================================================
@@ -395,61 +906,58 @@ NON_COMPLETION_PATTERNS = ["won't implement", "wont implement", "duplicate", "ou
 
 def parse_bd_close(command: str) -> Tuple[Optional[str], Optional[str]]:
     """Parse bd close command. Returns (issue_id, reason) or (None, None)."""
-    if not re.match(r"^\s*bd\s+close\b", command):
+    cmd = parse_bd_command(command)
+    if cmd is None or cmd.verb != "close":
         return None, None
-    reason_match = re.search(r'(?:-r|--reason)\s+["\']([^"\']+)["\']', command)
-    if not reason_match:
-        reason_match = re.search(r"(?:-r|--reason)\s+(\S+)", command)
-    reason = reason_match.group(1) if reason_match else None
-    cmd_without_reason = re.sub(r'(?:-r|--reason)\s+(?:"[^"]*"|\'[^\']*\'|\S+)', "", command)
-    parts = cmd_without_reason.split()
-    issue_id = None
-    for i, part in enumerate(parts):
-        if i >= 2 and not part.startswith("-"):
-            issue_id = part
-            break
-    return issue_id, reason
+    return cmd.issue_id, cmd.reason
 
 
 def parse_bd_update(command: str) -> Tuple[Optional[str], Optional[str]]:
     """Parse bd update command. Returns (issue_id, status) or (None, None)."""
-    if not re.match(r"^\s*bd\s+update\b", command):
-        return None, None
-    status_match = re.search(r"(?:-s|--status)\s+(\S+)", command)
-    if not status_match:
+    cmd = parse_bd_command(command)
+    if cmd is None or cmd.verb != "update" or not cmd.status:
         return None, None
-    status = status_match.group(1)
-    cmd_without_status = re.sub(r"(?:-s|--status)\s+\S+", "", command)
-    parts = cmd_without_status.split()
-    issue_id = None
-    for i, part in enumerate(parts):
-        if i >= 2 and not part.startswith("-"):
-            issue_id = part
-            break
-    return issue_id, status
+    return cmd.issue_id, cmd.status
 
 
 def run_bd_command(args: list) -> Tuple[int, str, str]:
-    """Run a bd command and return (returncode, stdout, stderr)."""
+    """Run a bd command through the current backend and return (returncode, stdout, stderr).
+
+    Raises BudgetExhausted once the run's time budget is used up (see run_rule).
+    """
+    started = time.perf_counter()
+    remaining = budget_remaining()
+    if remaining is not None and remaining <= 0:
+        raise BudgetExhausted(f"bd {' '.join(args)} not started: hook budget used up")
     try:
         # Run from project root so bd finds .beads naturally
-        project_root = get_project_root()
-        result = subprocess.run(
-            ["bd"] + args,
-            capture_output=True,
-            text=True,
-            timeout=10,
-            cwd=project_root,
-        )
-        return result.returncode, result.stdout, result.stderr
+        code, stdout, stderr = bd_backend.get_backend().run(args, cwd=get_project_root(), timeout=remaining)
+        hook_trace.record_bd_call(args, code, started, len(stdout), False)
+        return code, stdout, stderr
+    except bd_backend.BdTimeout as e:
+        hook_trace.record_bd_call(args, 1, started, 0, True)
+        if remaining is not None and budget_remaining() <= 0:
+            raise BudgetExhausted(str(e)) from e  # Cut short by the budget, not by bd's own limit
+        return 1, "", str(e)
     except Exception as e:
+        hook_trace.record_bd_call(args, 1, started, 0, False)
         return 1, "", str(e)
 
 
-def get_issue_json(issue_id: str) -> Optional[dict]:
-    """Get issue data as dict."""
-    code, stdout, _ = run_bd_command(["show", issue_id, "--json"])
+# How bd reports an ID that doesn't exist (as opposed to failing to look it up)
+BD_NOT_FOUND = re.compile(r"not found|no issues? found", re.IGNORECASE)
+
+
+def fetch_issue_json(issue_id: str, missing: Optional[set] = None) -> Optional[dict]:
+    """Get issue data as dict straight from bd (uncached).
+
+    Adds issue_id to `missing` only when bd says the issue does not exist; a
+    failed or timed-out call returns None without claiming anything.
+    """
+    code, stdout, stderr = run_bd_command(["show", issue_id, "--json"])
     if code != 0 or not stdout.strip():
+        if missing is not None and code != 0 and BD_NOT_FOUND.search(stderr or ""):
+            missing.add(issue_id)
         return None
     try:
         data = json.loads(stdout)
@@ -458,8 +966,8 @@ def get_issue_json(issue_id: str) -> Optional[dict]:
         return None
 
 
-def get_issue_children(issue_id: str) -> list:
-    """Get direct children of an issue."""
+def fetch_issue_children(issue_id: str) -> list:
+    """Get direct children of an issue straight from bd (uncached)."""
     code, stdout, _ = run_bd_command(["list", "--parent", issue_id, "--json"])
     if code != 0 or not stdout.strip():
         return []
@@ -469,47 +977,575 @@ def get_issue_children(issue_id: str) -> list:
         return []
 
 
+def fetch_blockers(issue_id: str) -> list:
+    """Get the issues blocking an issue straight from bd (uncached)."""
+    code, stdout, _ = run_bd_command(["dep", "list", issue_id, "--type", "blocks", "--json"])
+    if code != 0 or not stdout.strip():
+        return []
+    try:
+        return json.loads(stdout)
+    except:
+        return []
+
+
+def read_export_file() -> Optional[list]:
+    """Every issue from the JSONL export as IssueRecords, if it is the freshest copy of the data (no bd call)."""
+    project_root = get_project_root() if reads_project_files() else None
+    if project_root and beads_db.is_export_current(project_root):
+        try:
+            with open(beads_db.export_path(project_root), encoding="utf-8") as f:
+                return parse_jsonl(f, compact=True)
+        except OSError:
+            pass
+    return None
+
+
+def load_all_issues() -> Optional[list]:
+    """Load every issue (as IssueRecords) in one pass: the JSONL export when it is current, else `bd export`."""
+    issues = read_export_file()
+    if issues is not None:
+        return issues
+    code, stdout, _ = run_bd_command(["export"])
+    if code != 0 or not stdout.strip():
+        return None
+    return parse_jsonl(stdout.splitlines(), compact=True)
+
+
+class IssueStore:
+    """Memoizes issue reads for one hook run.
+
+    Each issue, children list and blocker list is fetched at most once. Reads
+    come from a direct beads.db snapshot when one is available, else from bd.
+    Writes made by the hook itself must call invalidate() so later reads see
+    the new state.
+    """
+
+    def __init__(self, reader: Optional[beads_db.BeadsReader] = None):
+        self._reader = reader
+        self._issues = {}  # issue_id -> dict or None
+        self._children = {}  # parent_id -> list of child dicts
+        self._blockers = {}  # issue_id -> list of blocking deps
+        self._blocks_graph = None  # BlocksGraph over blockers(), created on first use
+        self._subtrees = {}  # root_id -> HierarchyIndex
+        self._ancestors = {}  # issue_id -> [parent, grandparent, ...]
+        self._export = None  # beads_jsonl.JsonlIndex, opened on first use without a reader
+        self._export_checked = False
+        self._missing = set()  # IDs a lookup showed not to exist (not merely failed to find)
+        self._lock = threading.Lock()  # Guards the caches and counters under fan_out()
+        self.fetches = 0
+        self.direct_fetches = 0
+        self.hits = 0
+
+    @property
+    def direct(self) -> bool:
+        """True while reads are served from the database (single-threaded, no bd spawns)."""
+        return self._reader is not None
+
+    def _fetch(self, cache: dict, issue_id: str, direct_name: str, fallback):
+        with self._lock:
+            if issue_id in cache:
+                self.hits += 1
+                return cache[issue_id]
+            self.fetches += 1
+        if self._reader is not None:
+            try:
+                cache[issue_id] = getattr(self._reader, direct_name)(issue_id)
+                self.direct_fetches += 1
+                if cache is self._issues and cache[issue_id] is None:
+                    self._missing.add(issue_id)
+                return cache[issue_id]
+            except Exception:
+                self._drop_reader()  # Locked or changed under us: use bd from here on
+        value = fallback(issue_id)  # bd call runs outside the lock so fan_out() overlaps them
+        with self._lock:
+            cache[issue_id] = value
+        return value
+
+    def issue(self, issue_id: str) -> Optional[dict]:
+        return self._fetch(self._issues, issue_id, "issue", self._issue_without_reader)
+
+    def known_missing(self, issue_id: str) -> bool:
+        """True if issue() returned None because the issue does not exist, not because the lookup failed."""
+        return issue_id in self._missing and self._issues.get(issue_id, False) is None
+
+    def export_index(self) -> Optional[beads_jsonl.JsonlIndex]:
+        """ID index over issues.jsonl while the export is the freshest copy of the data, else None."""
+        if not self._export_checked:
+            self._export_checked = True
+            project_root = get_project_root() if reads_project_files() else None
+            if project_root and beads_db.is_export_current(project_root):
+                self._export = beads_jsonl.open_export_index(project_root)
+        if self._export is not None and not beads_db.is_export_current(get_project_root()):
+            self._export.close()  # The database has caught up since: bd knows better
+            self._export = None
+        return self._export
+
+    def _issue_without_reader(self, issue_id: str) -> Optional[dict]:
+        """One issue from the export's ID index (one line decoded), else `bd show`."""
+        index = self.export_index()
+        if index is not None:
+            try:
+                issue = index.get(issue_id)
+                with self._lock:
+                    self.direct_fetches += 1
+                    if not issue or issue.get("status") in beads_db.HIDDEN_STATUSES:
+                        self._missing.add(issue_id)
+                        return None
+                return issue
+            except (OSError, ValueError):
+                pass
+        return fetch_issue_json(issue_id, self._missing)
+
+    def children(self, issue_id: str) -> list:
+        return self._fetch(self._children, issue_id, "children", fetch_issue_children)
+
+    def blockers(self, issue_id: str) -> list:
+        return self._fetch(self._blockers, issue_id, "blockers", fetch_blockers)
+
+    def blocks_graph(self) -> BlocksGraph:
+        """The `blocks` edges seen so far; lives as long as the store (across runs when warm)."""
+        if self._blocks_graph is None:
+            self._blocks_graph = BlocksGraph(self._blocker_ids)
+        return self._blocks_graph
+
+    def _blocker_ids(self, issue_id: str) -> list:
+        """IDs from blockers(); `bd dep list` entries name the blocker as id or depends_on_id."""
+        found = (d.get("id") or d.get("depends_on_id") for d in self.blockers(issue_id) if isinstance(d, dict))
+        return [blocker for blocker in found if blocker]
+
+    def loaded_blocks_graph(self) -> Optional[BlocksGraph]:
+        """The blocks graph if something has used it, else None."""
+        return self._blocks_graph
+
+    def subtree(self, issue_id: str) -> HierarchyIndex:
+        """Index of an issue's whole subtree, loaded in one pass where possible.
+
+        Tries one recursive query on the direct database, then one read of the
+        JSONL export (or `bd export`), and only walks `bd list --parent` level
+        by level when neither is available. Primes the children cache.
+        """
+        if issue_id in self._subtrees:
+            self.hits += 1
+            return self._subtrees[issue_id]
+        self.fetches += 1
+        index = None
+        if self._reader is not None:
+            try:
+                index = HierarchyIndex(IssueRecord.from_issue(i) for i in self._reader.subtree(issue_id))
+                self.direct_fetches += 1
+            except Exception:
+                self._drop_reader()
+        if index is None:
+            issues = load_all_issues()
+            if issues:
+                index = HierarchyIndex(issues)
+                if issue_id not in index.issues:
+                    index = None  # Export predates the issue; don't trust it
+        if index is None:
+            issues, seen, frontier = [], {issue_id}, [issue_id]
+            while frontier:
+                next_frontier = []
+                for parent_id, children in zip(frontier, fan_out(self.children, frontier)):
+                    for child in children:
+                        if child["id"] not in seen:
+                            seen.add(child["id"])
+                            if not isinstance(child, IssueRecord):  # Primed by an earlier subtree, else bd JSON
+                                child = IssueRecord.from_issue({**child, "parent": parent_id})
+                            issues.append(child)
+                            next_frontier.append(child["id"])
+                frontier = next_frontier
+            index = HierarchyIndex(issues)
+        for node_id in [issue_id] + [d["id"] for d in index.descendants(issue_id)]:
+            self._children.setdefault(node_id, index.children(node_id))
+        self._subtrees[issue_id] = index
+        return index
+
+    def ancestors(self, issue_id: str) -> list:
+        """An issue's parent chain up to the root, nearest first, each with its status.
+
+        One recursive query on the direct database, else one ID lookup per
+        level in the current JSONL export's index (or one parse of the export
+        when it has none); only without either does it climb with one cached
+        `bd show` per level. Primes the issue cache with every ancestor.
+        """
+        if issue_id in self._ancestors:
+            self.hits += 1
+            return self._ancestors[issue_id]
+        chain = None
+        if self._reader is not None:
+            try:
+                chain = self._reader.ancestors(issue_id)
+                self.fetches += 1
+                self.direct_fetches += 1
+            except Exception:
+                self._drop_reader()
+        if chain is None and self.export_index() is None:
+            issues = read_export_file()
+            index = HierarchyIndex(issues) if issues else None
+            if index is not None and issue_id in index.issues:
+                chain = index.ancestors(issue_id)
+        if chain is None:
+            chain, seen = [], {issue_id}
+            issue = self.issue(issue_id)
+            while issue and issue.get("parent") and issue["parent"] not in seen:
+                seen.add(issue["parent"])
+                issue = self.issue(issue["parent"])
+                if issue:
+                    chain.append(issue)
+        for ancestor in chain:
+            self._issues.setdefault(ancestor["id"], ancestor)
+        self._ancestors[issue_id] = chain
+        return chain
+
+    def hierarchy(self) -> Optional[list]:
+        """Every issue's id, status and parent without calling bd (database, else current export)."""
+        if self._reader is not None:
+            try:
+                return self._reader.hierarchy()
+            except Exception:
+                self._drop_reader()
+        return read_export_file()
+
+    def invalidate(self, issue_id: str):
+        """Forget an issue and every cached children list or subtree that mentions it."""
+        self._issues.pop(issue_id, None)
+        self._missing.discard(issue_id)
+        self._children.pop(issue_id, None)
+        self._blockers.pop(issue_id, None)
+        if self._blocks_graph is not None:
+            self._blocks_graph.forget(issue_id)
+        for root_id in [r for r, index in self._subtrees.items() if issue_id in index]:
+            del self._subtrees[root_id]
+        for start_id in [i for i, chain in self._ancestors.items() if i == issue_id or any(a["id"] == issue_id for a in chain)]:
+            del self._ancestors[start_id]
+        for parent_id in [p for p, kids in self._children.items() if any(c.get("id") == issue_id for c in kids)]:
+            del self._children[parent_id]
+        if self._reader is not None:
+            self._reader.refresh()  # Our write landed after the snapshot began
+
+    def _drop_reader(self):
+        try:
+            self._reader.close()
+        except Exception:
+            pass
+        self._reader = None
+
+    def release(self):
+        """End the database snapshot between runs (a long-open read blocks WAL checkpoints)."""
+        if self._reader is not None:
+            self._reader.refresh()
+
+    def close(self):
+        if self._reader is not None:
+            self._drop_reader()
+        if self._export is not None:
+            self._export.close()
+
+    def stats(self) -> str:
+        bd_reads = self.fetches - self.direct_fetches
+        return f"STATS: {bd_reads} bd reads, {self.direct_fetches} direct db reads, {self.hits} saved by cache"
+
+
+_ISSUE_STORE = None  # Request-scoped IssueStore, reset by reset_hook_state()
+
+
+def reads_project_files() -> bool:
+    """True if reads may bypass bd and go to .beads/ on disk (direct reads on, backend agrees)."""
+    return DIRECT_READS and getattr(bd_backend.get_backend(), "shares_project_files", False)
+
+
+def get_issue_store() -> IssueStore:
+    """Get the issue store for the current hook run (the project's warm store under hook_server)."""
+    global _ISSUE_STORE
+    if _ISSUE_STORE is None:
+        warm = get_warm_store(get_project_root())
+        _ISSUE_STORE = warm.checkout() if warm is not None else new_issue_store()
+    return _ISSUE_STORE
+
+
+def new_issue_store(store_class=IssueStore) -> IssueStore:
+    """A fresh store for the current project, reading beads.db directly when allowed."""
+    reader = beads_db.open_reader(get_project_root()) if reads_project_files() else None
+    return store_class(reader)
+
+
+def begin_planning_run(cwd: str, store_class) -> IssueStore:
+    """Start a run that only plans (bd_batch.py): PreToolUse rules read from a new
+    `store_class` store, and propagations go to PROPAGATION_PLANNER instead of bd.
+    """
+    global _HOOK_CWD, _HOOK_EVENT, _ISSUE_STORE, _ROLLUPS_RESOLVED, _ATTRIBUTES_RESOLVED
+    reset_hook_state()
+    _HOOK_CWD, _HOOK_EVENT = cwd, "PreToolUse"
+    _ROLLUPS_RESOLVED = True  # The counters describe the database, not the planned state
+    _ATTRIBUTES_RESOLVED = True  # Likewise, and planned issues must not be cached as real
+    _ISSUE_STORE = new_issue_store(store_class)
+    return _ISSUE_STORE
+
+
+WARM_STORES = False  # Set by hook_server: keep each project's IssueStore across runs
+_WARM_STORES = {}  # project_root -> WarmStore, for the life of the process
+
+
+class WarmStore:
+    """A project's IssueStore kept across hook runs while its Beads data stays unchanged.
+
+    Before each run, if the watcher saw beads.db, its WAL or the JSONL export
+    change and their files_identity() moved too (a reader creating an empty
+    WAL does not count), the whole cache is dropped and the run starts cold.
+    Working out which issues changed would mean diffing every issue,
+    dependency and label (over a second at 100k issues), while a cold run only
+    pays for the indexed reads it makes.
+    """
+
+    def __init__(self, project_root: str, watcher):
+        self.project_root = project_root
+        self.watcher = watcher
+        self.store = None
+        self.identity = None
+
+    def checkout(self) -> IssueStore:
+        """The store for the next run: the warm one, or a new one if the Beads data changed."""
+        if self.watcher.changed() and beads_db.files_identity(self.project_root) != self.identity:
+            self.drop()
+        if self.store is None:
+            self.identity = beads_db.files_identity(self.project_root)
+            self.store = IssueStore(beads_db.open_reader(self.project_root) if DIRECT_READS else None)
+        self.store.fetches = self.store.direct_fetches = self.store.hits = 0
+        return self.store
+
+    def drop(self):
+        if self.store is not None:
+            self.store.close()
+        self.store = None
+
+
+def get_warm_store(project_root: Optional[str]) -> Optional[WarmStore]:
+    """The project's WarmStore when running under hook_server with a file-sharing backend, else None."""
+    if not WARM_STORES or not project_root or not getattr(bd_backend.get_backend(), "shares_project_files", False):
+        return None
+    if project_root not in _WARM_STORES:
+        db_path = beads_db.database_path(project_root)
+        watcher = beads_watch.open_watcher([db_path, db_path + "-wal", beads_db.export_path(project_root)])
+        _WARM_STORES[project_root] = WarmStore(project_root, watcher) if watcher is not None else None
+    return _WARM_STORES[project_root]
+
+
+def fan_out(fn, items: list, stop=None) -> list:
+    """Run fn over independent items on a bounded thread pool, results in input order.
+
+    If stop(result) is true for some result, work queued after it is cancelled
+    and only the results up to and including it are returned. Calls already
+    running are waited for (each is bounded by the run's budget), so none
+    outlives the run and touches the next one's state. Runs inline when
+    reads come from the direct database (fast, and its connection is not
+    shareable across threads) or when there is only one item.
+    """
+    items = list(items)
+    if len(items) <= 1 or HOOK_CONCURRENCY <= 1 or get_issue_store().direct:
+        results = []
+        for item in items:
+            results.append(fn(item))
+            if stop is not None and stop(results[-1]):
+                break
+        return results
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=min(HOOK_CONCURRENCY, len(items)))
+    try:
+        futures = [executor.submit(fn, item) for item in items]
+        results = []
+        for future in futures:
+            results.append(future.result())
+            if stop is not None and stop(results[-1]):
+                break
+        return results
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def get_issue_json(issue_id: str) -> Optional[dict]:
+    """Get issue data as dict."""
+    return get_issue_store().issue(issue_id)
+
+
+def get_issue_children(issue_id: str) -> list:
+    """Get direct children of an issue."""
+    return get_issue_store().children(issue_id)
+
+
+def get_issue_ancestors(issue_id: str) -> list:
+    """Get an issue's ancestors, nearest first (parent, grandparent, ..., root)."""
+    return get_issue_store().ancestors(issue_id)
+
+
 def get_issue_parent(issue_id: str) -> Optional[dict]:
     """Get the parent of an issue, if any."""
-    issue = get_issue_json(issue_id)
-    if not issue or not issue.get("parent"):
-        return None
-    return get_issue_json(issue["parent"])
+    parent_id = get_issue_parent_id(issue_id)
+    return get_issue_json(parent_id) if parent_id else None
+
+
+def get_issue_parent_id(issue_id: str) -> Optional[str]:
+    """Get the ID of an issue's parent, if any (from the attribute cache when it knows it)."""
+    attributes = get_issue_attributes(issue_id)
+    return attributes[1] if attributes else None
 
 
 def update_issue_status(issue_id: str, status: str) -> bool:
     """Update an issue's status."""
+    before = current_signature()
     code, _, _ = run_bd_command(["update", issue_id, "--status", status])
+    get_issue_store().invalidate(issue_id)
+    if code == 0:
+        note_status_writes(before, {issue_id: status})
     return code == 0
 
 
 def close_issue(issue_id: str, reason: str) -> bool:
     """Close a single issue with the given reason."""
+    before = current_signature()
     code, _, _ = run_bd_command(["close", issue_id, "--reason", reason])
+    get_issue_store().invalidate(issue_id)
+    if code == 0:
+        note_status_writes(before, {issue_id: "closed"})
     return code == 0
 
 
+MUTATION_CHUNK = 100  # IDs per bd invocation, well below ARG_MAX
+
+
+def _changed_ids(stdout: str) -> Optional[set]:
+    """IDs reported by a `--json` mutation, or None if the output can't be read."""
+    try:
+        data = json.loads(stdout)
+    except ValueError:
+        return None
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        return None
+    return {item.get("id") for item in data if isinstance(item, dict)}
+
+
+class MutationBatch:
+    """Collects the status changes a hook run decides on and applies them together.
+
+    Changes are deduplicated per issue (the last decision wins) and grouped so
+    that every issue moving to the same status, or closing with the same
+    reason, is written by one bd invocation. If a grouped call fails, its IDs
+    are retried one at a time so each issue gets its own result.
+    """
+
+    def __init__(self):
+        self._changes = {}  # issue_id -> ("update", status) or ("close", reason)
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def __contains__(self, issue_id: str) -> bool:
+        return issue_id in self._changes
+
+    def set_status(self, issue_id: str, status: str):
+        self._changes[issue_id] = ("update", status)
+
+    def close(self, issue_id: str, reason: str):
+        self._changes[issue_id] = ("close", reason)
+
+    def discard(self, issue_id: str):
+        self._changes.pop(issue_id, None)
+
+    def _args(self, verb: str, ids: list, value: str) -> list:
+        flag = "--status" if verb == "update" else "--reason"
+        return [verb] + ids + [flag, value, "--json"]
+
+    def apply(self) -> dict:
+        """Write every pending change. Returns {issue_id: succeeded}."""
+        groups = {}
+        for issue_id, change in self._changes.items():
+            groups.setdefault(change, []).append(issue_id)
+        results, statuses = {}, {}
+        before = current_signature()
+        in_flight = []  # IDs of the bd call under way, whose writes are unknown if it is cut short
+        try:
+            for (verb, value), ids in groups.items():
+                for start in range(0, len(ids), MUTATION_CHUNK):
+                    chunk = in_flight = ids[start:start + MUTATION_CHUNK]
+                    code, stdout, _ = run_bd_command(self._args(verb, chunk, value))
+                    changed = _changed_ids(stdout) if code == 0 else None
+                    if code == 0 and (changed is None or changed >= set(chunk)):
+                        results.update((issue_id, True) for issue_id in chunk)
+                        continue
+                    for issue_id in chunk:
+                        if changed is not None and issue_id in changed:
+                            results[issue_id] = True
+                        else:
+                            in_flight = [issue_id]
+                            code, _, _ = run_bd_command(self._args(verb, [issue_id], value))
+                            results[issue_id] = code == 0
+                in_flight = []
+                for issue_id in ids:
+                    if results.get(issue_id):
+                        statuses[issue_id] = value if verb == "update" else "closed"
+        except BudgetExhausted:
+            self._abandon(results, in_flight)
+            raise
+        store = get_issue_store()
+        for issue_id in results:
+            store.invalidate(issue_id)
+        note_status_writes(before, statuses)
+        self._changes.clear()
+        return results
+
+    def _abandon(self, results: dict, in_flight: list):
+        """The budget ran out mid-apply: forget what may have changed and report what was not done.
+
+        Writes before the cut-off happened; the call that was cut short may
+        have written some of its IDs. Cached issues and the rollup counters
+        can no longer be trusted for any of them.
+        """
+        store = get_issue_store()
+        for issue_id in list(results) + in_flight:
+            store.invalidate(issue_id)
+        invalidate_rollups()
+        undone = [issue_id for issue_id in self._changes if not results.get(issue_id)]
+        self._changes.clear()
+        if undone:
+            hook_log.log("warning", "bash_hooks", "budget exhausted mid-batch", undone=undone, unknown=in_flight)
+            print(f"BUDGET: {len(undone)} status changes not applied ({HOOK_BUDGET:g}s hook budget used up):",
+                  file=sys.stderr)
+            for issue_id in undone:
+                note = " (may be partly written)" if issue_id in in_flight else ""
+                print(f"  ✗ {issue_id}{note}", file=sys.stderr)
+
+
+def _apply_planned(batch: MutationBatch, planned: list) -> list:
+    """Apply a batch built by a propagation step; return the planned IDs that succeeded."""
+    results = batch.apply()
+    return [issue_id for issue_id in planned if results.get(issue_id)]
+
+
 def get_all_open_descendants(issue_id: str) -> list:
-    """Get all open descendants of an issue (recursive)."""
-    open_descendants = []
-    for child in get_issue_children(issue_id):
-        if child.get("status") != "closed":
-            open_descendants.append(child)
-        open_descendants.extend(get_all_open_descendants(child["id"]))
-    return open_descendants
+    """Get all open descendants of an issue (whole subtree, parents before children)."""
+    return get_issue_store().subtree(issue_id).open_descendants(issue_id)
 
 
 def get_siblings(issue_id: str) -> list:
     """Get siblings of an issue (other children of same parent)."""
-    parent = get_issue_parent(issue_id)
-    if not parent:
+    parent_id = get_issue_parent_id(issue_id)
+    if not parent_id:
         return []
-    children = get_issue_children(parent.get("id"))
+    children = get_issue_children(parent_id)
     return [c for c in children if c.get("id") != issue_id]
 
 
 def any_sibling_blocked(issue_id: str) -> bool:
     """Check if any sibling of the issue is blocked."""
+    rollups = get_rollups()
+    parent_id = get_issue_parent_id(issue_id) if rollups is not None else None
+    if parent_id:
+        count = rollups.blocked_siblings(issue_id, parent_id)
+        if count is not None:
+            return count > 0
     return any(s.get("status") == "blocked" for s in get_siblings(issue_id))
 
 
@@ -520,104 +1556,239 @@ def is_non_completion_reason(reason: str) -> bool:
     return any(p in reason_lower for p in NON_COMPLETION_PATTERNS)
 
 
-def propagate_in_progress_up_chain(issue_id: str) -> list:
-    """Propagate in_progress status up the parent chain."""
-    updated = []
-    current_id = issue_id
-    while True:
-        parent = get_issue_parent(current_id)
-        if not parent:
-            break
-        parent_id = parent.get("id")
+def propagate_in_progress_up_chain(issue_id: str, batch: Optional[MutationBatch] = None) -> list:
+    """Propagate in_progress status up the parent chain.
+
+    With a batch, the changes are only planned there and the planned IDs are
+    returned; without one they are applied and the IDs that succeeded returned.
+    """
+    planned = []
+    pending = batch if batch is not None else MutationBatch()
+    for parent in get_issue_ancestors(issue_id):
         parent_status = parent.get("status")
         if parent_status in ("blocked", "closed"):
             break
         if parent_status == "open":
-            if update_issue_status(parent_id, "in_progress"):
-                updated.append(parent_id)
-        current_id = parent_id
-    return updated
-
-
-def propagate_blocked_up_chain(issue_id: str) -> list:
-    """Propagate blocked status up the parent chain."""
-    updated = []
-    current_id = issue_id
-    while True:
-        parent = get_issue_parent(current_id)
-        if not parent:
-            break
-        parent_id = parent.get("id")
+            pending.set_status(parent.get("id"), "in_progress")
+            planned.append(parent.get("id"))
+    return planned if batch is not None else _apply_planned(pending, planned)
+
+
+def propagate_blocked_up_chain(issue_id: str, batch: Optional[MutationBatch] = None) -> list:
+    """Propagate blocked status up the parent chain (see propagate_in_progress_up_chain for batch)."""
+    planned = []
+    pending = batch if batch is not None else MutationBatch()
+    for parent in get_issue_ancestors(issue_id):
+        if parent.get("status") != "blocked":
+            pending.set_status(parent.get("id"), "blocked")
+            planned.append(parent.get("id"))
+    return planned if batch is not None else _apply_planned(pending, planned)
+
+
+def propagate_unblock_up_chain(issue_id: str, batch: Optional[MutationBatch] = None) -> list:
+    """Propagate unblock up the chain if no siblings are blocked (see propagate_in_progress_up_chain for batch)."""
+    # Climb while the parent is blocked; those are the only ancestors we may unblock.
+    levels = []  # (child_id, parent dict)
+    child_id = issue_id
+    for parent in get_issue_ancestors(issue_id):
         if parent.get("status") != "blocked":
-            if update_issue_status(parent_id, "blocked"):
-                updated.append(parent_id)
-        current_id = parent_id
-    return updated
-
-
-def propagate_unblock_up_chain(issue_id: str) -> list:
-    """Propagate unblock up the chain if no siblings are blocked."""
-    updated = []
-    current_id = issue_id
-    while True:
-        if any_sibling_blocked(current_id):
-            break
-        parent = get_issue_parent(current_id)
-        if not parent:
             break
-        parent_id = parent.get("id")
-        if parent.get("status") == "blocked":
-            if update_issue_status(parent_id, "open"):
-                updated.append(parent_id)
-                current_id = parent_id
-            else:
-                break
-        else:
+        levels.append((child_id, parent))
+        child_id = parent.get("id")
+
+    # Sibling lookups per level are independent: fetch them together, stopping
+    # at the first level that still has a blocked sibling.
+    def sibling_blocked(level: tuple) -> bool:
+        child_id, parent = level
+        return any(
+            c.get("status") == "blocked" and c.get("id") != child_id
+            for c in get_issue_children(parent.get("id"))
+        )
+
+    # The rollup counters answer every level without listing children.
+    rollups = get_rollups() if levels else None
+    counts = [rollups.blocked_siblings(c, p.get("id")) for c, p in levels] if rollups is not None else [None]
+    flags = [n > 0 for n in counts] if None not in counts else fan_out(sibling_blocked, levels, stop=bool)
+
+    planned = []
+    pending = batch if batch is not None else MutationBatch()
+    for (_, parent), blocked in zip(levels, flags):
+        if blocked:
             break
-    return updated
+        pending.set_status(parent.get("id"), "open")
+        planned.append(parent.get("id"))
+    return planned if batch is not None else _apply_planned(pending, planned)
+
+
+def cascade_close_descendants(issue_id: str, reason: str, batch: Optional[MutationBatch] = None) -> list:
+    """Close all open descendants with the same reason (see propagate_in_progress_up_chain for batch)."""
+    planned = []
+    pending = batch if batch is not None else MutationBatch()
+    for descendant in get_issue_store().subtree(issue_id).descendants_bottom_up(issue_id):
+        if descendant.get("status") != "closed":
+            pending.close(descendant["id"], reason)
+            planned.append(descendant["id"])
+    return planned if batch is not None else _apply_planned(pending, planned)
+
+
+def report_mutations(summary: str, marker: str, planned: list, results: dict):
+    """Print the outcome of an applied batch, one line per issue."""
+    done = [issue_id for issue_id in planned if results.get(issue_id)]
+    failed = [issue_id for issue_id in planned if not results.get(issue_id)]
+    if done:
+        print(summary.format(len(done)), file=sys.stderr)
+        for issue_id in done:
+            print(f"  {marker} {issue_id}", file=sys.stderr)
+    for issue_id in failed:
+        print(f"  ✗ {issue_id} (bd write failed)", file=sys.stderr)
+
+
+def apply_propagation(kind: str, issue_id: str, reason: Optional[str] = None, since: Optional[float] = None) -> dict:
+    """Plan and apply one propagation, report it on stderr. Returns {issue_id: applied}.
+
+    With `since` (a replayed job's queue time), issues changed after that
+    moment are left alone: someone may have moved them on purpose since.
+    """
+    batch = MutationBatch()
+    if kind == "in_progress":
+        planned = propagate_in_progress_up_chain(issue_id, batch)
+        summary, marker = "PROPAGATE: Set {} ancestors to in_progress", "↑"
+    elif kind == "blocked":
+        planned = propagate_blocked_up_chain(issue_id, batch)
+        summary, marker = "PROPAGATE: Set {} ancestors to blocked", "↑"
+    elif kind == "unblock":
+        planned = propagate_unblock_up_chain(issue_id, batch)
+        summary, marker = "PROPAGATE: Unblocked {} ancestors", "↑"
+    else:  # cascade
+        planned = cascade_close_descendants(issue_id, reason, batch)
+        summary, marker = f"CASCADE: Closed {{}} descendants with reason: {reason}", "✓"
+    if since is not None:
+        for target, changed in zip(planned, fan_out(lambda i: changed_since(i, since), planned)):
+            if changed:
+                batch.discard(target)
+                print(f"  - {target} (changed since the job was queued; left as is)", file=sys.stderr)
+        planned = [target for target in planned if target in batch]
+    results = batch.apply()
+    report_mutations(summary, marker, planned, results)
+    return results
+
+
+def parse_timestamp(text) -> Optional[float]:
+    """Seconds since the epoch for a bd timestamp (RFC 3339, possibly with nanoseconds), else None."""
+    if not isinstance(text, str):
+        return None
+    import datetime
+
+    text = re.sub(r"(\.\d{6})\d+", r"\1", text.strip()).replace("Z", "+00:00")
+    try:
+        return datetime.datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        return None
+
+
+def changed_since(issue_id: str, since: float) -> bool:
+    """True unless bd shows the issue unchanged since `since` (an unknown age counts as changed)."""
+    issue = fetch_issue_json(issue_id)
+    updated = parse_timestamp(issue.get("updated_at")) if issue else None
+    return updated is None or updated > since
 
 
-def cascade_close_descendants(issue_id: str, reason: str) -> list:
-    """Close all open descendants with the same reason (depth-first)."""
-    closed = []
-    for child in get_issue_children(issue_id):
-        closed.extend(cascade_close_descendants(child["id"], reason))
-        if child.get("status") != "closed":
-            if close_issue(child["id"], reason):
-                closed.append(child["id"])
-    return closed
+PROPAGATION_PLANNER = None  # Set by bd_batch: called as (kind, issue_id, reason) instead of propagating
+
+
+def schedule_propagation(kind: str, issue_id: str, reason: Optional[str] = None):
+    """Hand a propagation to the background worker, or apply it now if that is not possible.
+
+    If no worker can be started, only this job is taken back and applied here,
+    under this run's budget; jobs already queued wait for the next worker.
+    """
+    if PROPAGATION_PLANNER is not None:
+        PROPAGATION_PLANNER(kind, issue_id, reason)
+        return
+    project_root = get_project_root()
+    if ASYNC_PROPAGATION and project_root and getattr(bd_backend.get_backend(), "shares_project_files", False):
+        job = propagation_queue.enqueue(project_root, {"kind": kind, "issue": issue_id, "reason": reason})
+        if job is not None:
+            if propagation_queue.spawn_worker(project_root, os.path.abspath(__file__)) is not None:
+                return
+            if not propagation_queue.withdraw(project_root, job):
+                return  # A worker that was already running has claimed it
+    try:
+        apply_propagation(kind, issue_id, reason)
+    except BudgetExhausted:
+        budget_verdict(f"{kind} propagation for {issue_id}", FAIL_OPEN)
+
+
+# Status the triggering issue has once the command that queued a job has run
+JOB_TRIGGER_STATUS = {"in_progress": "in_progress", "blocked": "blocked", "unblock": "open", "cascade": "closed"}
+
+
+def run_propagation_job(job: dict):
+    """Apply one queued job in the worker, as its own traced run under the hook budget.
+
+    A job replayed after a worker crash is only applied if its triggering
+    issue still has the status the command gave it, and then only to issues
+    nobody changed since it was queued; anything else may undo a later edit
+    (e.g. re-close an issue someone reopened).
+    """
+    global _HOOK_CWD
+    project_root = _HOOK_CWD
+    reset_hook_state()
+    _HOOK_CWD = project_root
+    start_budget()
+    hook_trace.begin_run()
+    code = 1
+    try:
+        waited = time.time() - job.get("queued_at", time.time())
+        replay = " replayed" if job.get("replayed") else ""
+        print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {job['kind']} {job['issue']} (queued {waited:.1f}s{replay})",
+              file=sys.stderr)
+        with hook_trace.rule("status_propagation"):
+            since = None
+            if job.get("replayed"):
+                trigger = fetch_issue_json(job["issue"])
+                status = trigger.get("status") if trigger else None
+                if status != JOB_TRIGGER_STATUS.get(job["kind"]):
+                    print(f"  skipped: {job['issue']} is now {status or 'gone'}", file=sys.stderr)
+                    code = 0
+                    return
+                since = job.get("queued_at", 0)
+            results = apply_propagation(job["kind"], job["issue"], job.get("reason"), since)
+        code = 0 if all(results.values()) else 1
+    except BudgetExhausted:
+        budget_verdict(f"{job['kind']} propagation for {job['issue']}", FAIL_OPEN)
+    finally:
+        hook_trace.end_run("AsyncPropagation", job.get("kind"), code)
+        sys.stderr.flush()
+
+
+def drain_propagation_queue(project_root: str) -> int:
+    """Apply every queued job for a project in order (the --drain-queue worker)."""
+    global _HOOK_CWD
+    _HOOK_CWD = project_root
+    try:
+        return propagation_queue.drain(project_root, run_propagation_job)
+    finally:
+        reset_hook_state()
 
 
 def handle_bd_status_propagation(command: str) -> Optional[str]:
-    """Handle status propagation for bd update and bd close commands. Returns block message or None."""
+    """Handle status propagation for bd update and bd close commands. Returns block message or None.
+
+    Only the checks that can block run here; the ancestor/descendant writes
+    themselves go through schedule_propagation().
+    """
     # Handle bd update --status
     update_id, new_status = parse_bd_update(command)
     if update_id and new_status:
-        issue = get_issue_json(update_id)
-        current_status = issue.get("status") if issue else None
-
-        if new_status == "in_progress":
-            updated = propagate_in_progress_up_chain(update_id)
-            if updated:
-                print(f"PROPAGATE: Set {len(updated)} ancestors to in_progress", file=sys.stderr)
-                for pid in updated:
-                    print(f"  ↑ {pid}", file=sys.stderr)
-            return None
-
-        if new_status == "blocked":
-            updated = propagate_blocked_up_chain(update_id)
-            if updated:
-                print(f"PROPAGATE: Set {len(updated)} ancestors to blocked", file=sys.stderr)
-                for pid in updated:
-                    print(f"  ↑ {pid}", file=sys.stderr)
+        if new_status in ("in_progress", "blocked"):
+            schedule_propagation(new_status, update_id)
             return None
 
-        if current_status == "blocked" and new_status in ("open", "in_progress"):
-            updated = propagate_unblock_up_chain(update_id)
-            if updated:
-                print(f"PROPAGATE: Unblocked {len(updated)} ancestors", file=sys.stderr)
-                for pid in updated:
-                    print(f"  ↑ {pid}", file=sys.stderr)
+        issue = get_issue_json(update_id)
+        current_status = issue.get("status") if issue else None
+        if current_status == "blocked" and new_status == "open":
+            schedule_propagation("unblock", update_id)
             return None
 
     # Handle bd close
@@ -625,20 +1796,19 @@ def handle_bd_status_propagation(command: str) -> Optional[str]:
     if issue_id is None:
         return None
 
-    open_descendants = get_all_open_descendants(issue_id)
-    if not open_descendants:
-        return None
-
-    # Non-completion reason → cascade down
+    # Non-completion reason → cascade down (the worker finds the open descendants)
     if reason and is_non_completion_reason(reason):
-        closed = cascade_close_descendants(issue_id, reason)
-        if closed:
-            print(f"CASCADE: Closed {len(closed)} descendants with reason: {reason}", file=sys.stderr)
-            for cid in closed:
-                print(f"  ✓ {cid}", file=sys.stderr)
+        schedule_propagation("cascade", issue_id, reason)
         return None
 
     # Completion close with open descendants → BLOCK
+    rollups = get_rollups()
+    if rollups is not None and rollups.open_descendants(issue_id) == 0:
+        return None  # Counters say the subtree is all closed: no need to enumerate it
+    open_descendants = get_all_open_descendants(issue_id)
+    if not open_descendants:
+        return None
+
     child_list = ", ".join(c["id"] for c in open_descendants[:5])
     if len(open_descendants) > 5:
         child_list += f" (+{len(open_descendants) - 5} more)"
@@ -650,73 +1820,6 @@ def handle_bd_status_propagation(command: str) -> Optional[str]:
 # SYSTEM TEMP POLLUTION CHECK
 # =============================================================================
 
-SYSTEM_TEMP_PATTERNS = [
-    r"/tmp(?:/|$)",
-    r"/private/tmp(?:/|$)",
-    r"/var(?:/|$)",
-    r"/private/var(?:/|$)",
-    r"/var/tmp(?:/|$)",
-    r"/private/var/tmp(?:/|$)",
-    r"/var/folders(?:/|$)",
-    r"/private/var/folders(?:/|$)",
-]
-
-VIDEO_TOOLS = ["ffmpeg", "mkvmerge", "mkvextract", "dovi_tool", "x265", "hevc_nvenc"]
-OUTPUT_FLAGS = ["-o", "--output", "-y"]
-
-PYTHON_TEMP_PATTERNS = [
-    r"tempfile\.mkdtemp\s*\(\s*\)",
-    r"tempfile\.mkstemp\s*\(\s*\)",
-    r"tempfile\.gettempdir\s*\(\s*\)",
-    r"tempfile\.NamedTemporaryFile\s*\(\s*\)",
-]
-
-SAFEVISION_FILE_PATTERNS = [
-    r"safevision", r"\.hevc", r"\.mkv", r"\.mp4", r"\.m4a",
-    r"\.eac3", r"\.ac3", r"\.wav", r"dv_retime", r"clip_\d+",
-    r"segment_\d+", r"frame_\d+",
-]
-
-
-def is_system_temp_path(path: str) -> bool:
-    """Check if a path is in a system temp directory."""
-    return any(re.search(p, path) for p in SYSTEM_TEMP_PATTERNS)
-
-
-def is_safevision_related(command: str) -> bool:
-    """Check if a command is SafeVision-related."""
-    command_lower = command.lower()
-    return any(re.search(p, command_lower) for p in SAFEVISION_FILE_PATTERNS)
-
-
-def check_video_tool_output(command: str) -> Optional[str]:
-    """Check if a video tool command writes to system temp."""
-    if not any(tool in command for tool in VIDEO_TOOLS):
-        return None
-
-    words = command.split()
-    for i, word in enumerate(words):
-        if word in OUTPUT_FLAGS and i + 1 < len(words):
-            next_word = words[i + 1]
-            if is_system_temp_path(next_word):
-                return next_word
-        if is_system_temp_path(word) and word.endswith(('.mkv', '.mp4', '.hevc', '.m4a', '.eac3', '.ac3', '.wav')):
-            return word
-    return None
-
-
-def check_python_temp_usage(command: str) -> Optional[str]:
-    """Check if Python uses tempfile without dir parameter."""
-    if "python" not in command and "tempfile" not in command:
-        return None
-
-    for pattern in PYTHON_TEMP_PATTERNS:
-        match = re.search(pattern, command)
-        if match and is_safevision_related(command):
-            return match.group(0)
-    return None
-
-
 def check_system_temp(command: str) -> Optional[str]:
     """Check command for system temp violations. Returns error message or None."""
     if not command or not command.strip():
@@ -746,18 +1849,71 @@ def check_system_temp(command: str) -> Optional[str]:
 
 def parse_bd_dep_blocks(command: str) -> Optional[str]:
     """Parse 'bd dep X --blocks Y' command. Returns blocked issue ID (Y) or None."""
-    if not re.match(r"^\s*bd\s+dep\b", command):
+    cmd = parse_bd_command(command)
+    if cmd is None or cmd.verb != "dep":
         return None
-    # Match --blocks or -b flag
-    blocks_match = re.search(r'(?:--blocks|-b)\s+(\S+)', command)
-    if blocks_match:
-        return blocks_match.group(1)
+    return cmd.blocks
+
+
+def parse_blocks_edge(cmd) -> Optional[Tuple[str, str]]:
+    """(blocker, blocked) for a bd command adding a blocks dependency, else None.
+
+    Covers `bd dep X --blocks Y` and `bd dep add ISSUE DEPENDS_ON` (whose type
+    defaults to blocks).
+    """
+    if cmd is None or cmd.verb != "dep":
+        return None
+    if cmd.blocks and cmd.issue_id:
+        return cmd.issue_id, cmd.blocks
+    args = cmd.positionals
+    if len(args) >= 3 and args[0] == "add" and (cmd.issue_type or beads_db.BLOCKS_DEP_TYPE) == beads_db.BLOCKS_DEP_TYPE:
+        return args[2], args[1]
     return None
 
 
+def fold_command_into_blocks_graph(command: str):
+    """Apply a finished bd dep/delete command to the store's blocks graph, if one is loaded."""
+    store = get_issue_store() if WARM_STORES else _ISSUE_STORE  # A fresh store has nothing to update
+    cmd = parse_bd_command(command)
+    graph = store.loaded_blocks_graph() if store is not None and cmd is not None else None
+    if graph is None:
+        return
+    edge = parse_blocks_edge(cmd)
+    args = cmd.positionals
+    if edge:
+        graph.add_edge(*edge)
+    elif cmd.verb == "dep" and len(args) >= 3 and args[0] in ("remove", "rm"):
+        graph.remove_edge(args[2], args[1])
+    elif cmd.verb == "delete" and cmd.issue_id:
+        graph.remove_issue(cmd.issue_id)
+
+
+def forget_attributes(issue_ids, descendants: bool = False):
+    """Drop issues from the persistent attribute cache (no-op without one)."""
+    cache = attribute_cache()
+    if cache is not None and issue_ids:
+        cache.forget(issue_ids, descendants)
+
+
+def fold_command_into_attribute_cache(command: str):
+    """PostToolUse: drop cached types/parents the bd command may have changed."""
+    cmd = parse_bd_command(command)
+    if cmd is None or (cmd.verb in ROLLUP_NEUTRAL_VERBS and cmd.verb != "label"):
+        return
+    if cmd.verb == "delete":
+        forget_attributes(cmd.positionals, descendants=cmd.has_flag("cascade"))
+    elif cmd.verb == "label" or (cmd.verb == "update" and (cmd.parent or any("label" in f for f in cmd.flags))):
+        forget_attributes(cmd.positionals)  # Subcommand words are never cached IDs
+    elif cmd.verb == "create":
+        cache = attribute_cache()
+        if cache is not None:
+            cache.forget_missing()
+
+
 def is_delete_command(command: str) -> bool:
     """Check if command is 'bd delete'."""
-    return bool(re.match(r"^\s*bd\s+delete\b", command))
+    cmd = parse_bd_command(command)
+    return cmd is not None and cmd.verb == "delete"
 
 
 def run_purge_cleanup():
@@ -769,6 +1925,11 @@ def run_purge_cleanup():
 
 def handle_post_tool_use(command: str):
     """Handle PostToolUse events - auto-actions after commands complete."""
+    # Bring the rollup counters up to date with what the command changed
+    fold_command_into_rollups(command)
+    fold_command_into_blocks_graph(command)
+    fold_command_into_attribute_cache(command)
+
     # Auto-block when dependency created with --blocks
     blocked_id = parse_bd_dep_blocks(command)
     if blocked_id:
@@ -789,39 +1950,76 @@ def handle_post_tool_use(command: str):
 # =============================================================================
 
 
-def main():
-    command = get_command()
+def evaluate(stdin_data: str) -> int:
+    """Run the hook for one raw stdin payload. Returns the exit code; messages go to stderr."""
+    reset_hook_state()
+    start_budget()
+    hook_trace.begin_run()
+    command, code = None, None
+    try:
+        command = get_command(stdin_data)
+        code = evaluate_command(command)
+        return code
+    finally:
+        if HOOK_STATS and _ISSUE_STORE is not None:
+            print(_ISSUE_STORE.stats(), file=sys.stderr)
+        if hook_trace.enabled():
+            cmd = parse_bd_command(command) if command else None
+            hook_trace.end_run(_HOOK_EVENT, cmd.verb if cmd else None, code)
+        if code == 2 and hook_log.enabled("info"):
+            hook_log.log("info", "bash_hooks", "blocked", event=_HOOK_EVENT, command=command)
+        elif hook_log.enabled("debug"):
+            hook_log.log("debug", "bash_hooks", "evaluated", event=_HOOK_EVENT, command=command, verdict=code)
+        hook_log.set_cwd(_HOOK_CWD)
+        hook_log.flush()  # One write per run, also when serving many runs from hook_server
+        reset_hook_state()  # Don't hold database snapshots open between hook_server runs
+
+
+def evaluate_command(command: str) -> int:
+    """Run the PreToolUse/PostToolUse rules for one command. Returns the exit code."""
     if not command:
-        sys.exit(0)
+        return 0
 
     # PostToolUse: handle auto-actions after command completes
     if _HOOK_EVENT == "PostToolUse":
-        if re.match(r"^\s*bd\s+", command):
-            handle_post_tool_use(command)
-        sys.exit(0)
+        if parse_bd_command(command):
+            run_rule("post_tool_use", handle_post_tool_use, command)
+        return 0
 
     # PreToolUse: validation and guards
     # Check beads commands
-    if re.match(r"^\s*bd\s+", command):
+    if parse_bd_command(command):
         # Command guard
-        error = check_bd_command_guard(command)
+        error = run_rule("bd_command_guard", check_bd_command_guard, command)
         if error:
             print(error, file=sys.stderr)
-            sys.exit(2)
+            return 2
 
         # Status propagation (may print info to stderr, may block)
-        error = handle_bd_status_propagation(command)
+        error = run_rule("status_propagation", handle_bd_status_propagation, command)
         if error:
             print(error, file=sys.stderr)
-            sys.exit(2)
+            return 2
 
     # Check system temp pollution
-    error = check_system_temp(command)
+    error = run_rule("system_temp", check_system_temp, command)
     if error:
         print(error, file=sys.stderr)
-        sys.exit(2)
+        return 2
+
+    remember_pre_command_signature(command)
+    return 0
 
-    sys.exit(0)
+
+def main():
+    if sys.argv[1:2] == ["--drain-queue"] and len(sys.argv) == 3:
+        drain_propagation_queue(sys.argv[2])
+        return
+    if sys.argv[1:2] == ["--rebuild-rollups"] and len(sys.argv) == 3:
+        sys.exit(rebuild_rollups(sys.argv[2]))
+    if _STDIN_DATA is None:
+        front_end()  # Exits if nothing can fire or the server answered
+    sys.exit(evaluate(_STDIN_DATA.decode("utf-8", errors="replace")))
 
 
 if __name__ == "__main__":
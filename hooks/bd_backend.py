@@ -0,0 +1,287 @@
+"""
+Pluggable backend for the bd calls the hooks make.
+
+run_bd_command() in bash_hooks.py and bd_hooks.py hands its arguments to the
+current backend instead of spawning bd itself. The default SubprocessBackend
+runs the real bd CLI. With BD_HOOKS_DAEMON=on, DaemonBackend sends the calls it
+can to the project's bd daemon instead and runs the CLI otherwise; tests and
+benchmarks can install another object with the same run() method (e.g.
+bd_fake.FakeBd) via set_backend().
+
+Daemon protocol: one JSON object per line each way over `.beads/bd.sock`, in
+the daemon's request/response envelope with its typed operations. Of the calls
+the hooks make, `show ID --json`, `update ID --status S` and `close ID --reason
+R` map onto the daemon's show, update and close:
+
+  -> {"operation": "show", "args": {"id": "bd-1"}, "cwd": "/project"}
+  <- {"success": true, "data": {"id": "bd-1", "status": "open", ...}}
+
+The rest (`list --parent`, `dep list`, `admin compact`, `export`) have no
+operation whose output matches the CLI's, so they run on the CLI, as does a
+typed call the daemon reports as an unknown operation (an older daemon).
+bd_fake.FakeDaemon is a stand-in daemon for tests and benchmarks.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Optional, Tuple
+
+BD_TIMEOUT = 10  # Seconds before a bd call is abandoned
+DAEMON_MODE = os.environ.get("BD_HOOKS_DAEMON", "off")  # on: use the daemon when it is up; off: always the CLI
+DAEMON_SOCKET = "bd.sock"  # In .beads/
+_NO_DAEMON = re.compile(r"^\s*no-daemon\s*:\s*(true|yes|on|1)\s*(#.*)?$", re.MULTILINE | re.IGNORECASE)
+_UNKNOWN_OPERATION = re.compile(r"unknown operation", re.IGNORECASE)
+
+
+class BdTimeout(Exception):
+    """A bd call did not finish within its timeout."""
+
+
+class SubprocessBackend:
+    """Runs the real bd binary."""
+
+    # Direct reads of .beads/ (beads.db, issues.jsonl) describe the same data
+    # this backend serves, so the hooks may use them instead of calling bd.
+    shares_project_files = True
+
+    def __init__(self, executable: str = "bd", timeout: float = BD_TIMEOUT):
+        self.executable = executable
+        self.timeout = timeout
+
+    def run(self, args: list, cwd: Optional[str] = None, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+        """Run `bd ARGS` and return (returncode, stdout, stderr).
+
+        `timeout` shortens this call's limit (e.g. to what is left of a hook
+        run's budget). Raises BdTimeout or OSError; callers report those as
+        failures.
+        """
+        limit = self.timeout if timeout is None else min(self.timeout, timeout)
+        import subprocess  # Deferred: most hook runs never reach bd
+
+        try:
+            result = subprocess.run(
+                [self.executable] + list(args),
+                capture_output=True,
+                text=True,
+                timeout=limit,
+                cwd=cwd,
+            )
+        except subprocess.TimeoutExpired as e:
+            raise BdTimeout(f"bd {' '.join(args)} timed out after {limit:g}s") from e
+        return result.returncode, result.stdout, result.stderr
+
+
+class DaemonError(Exception):
+    """The daemon connection failed or sent something that is not a reply to our request."""
+
+
+class _DaemonConnection:
+    """One open connection to a daemon socket, used by one call at a time."""
+
+    def __init__(self, path: str, timeout: float):
+        import socket  # Deferred like subprocess: most hook runs never reach bd
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(timeout)
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.replies = self.sock.makefile("rb")
+
+    def alive(self) -> bool:
+        """False if the daemon has closed this idle connection (e.g. it restarted)."""
+        import socket
+
+        try:
+            self.sock.setblocking(False)
+            self.sock.recv(1, socket.MSG_PEEK)
+            return False  # End of stream, or bytes nobody asked for: either way not reusable
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+
+    def send(self, request: bytes, timeout: float):
+        self.sock.settimeout(timeout)
+        self.sock.sendall(request)
+
+    def receive(self) -> dict:
+        line = self.replies.readline()
+        if not line:
+            raise DaemonError("daemon closed the connection")
+        try:
+            reply = json.loads(line)
+        except ValueError as e:
+            raise DaemonError("unreadable daemon reply") from e
+        if not isinstance(reply, dict):
+            raise DaemonError("unreadable daemon reply")
+        return reply
+
+    def close(self):
+        self.replies.close()
+        self.sock.close()
+
+
+def daemon_request(args: list) -> Optional[Tuple[str, dict]]:
+    """(operation, args) for a bd argument list the daemon has a typed operation for, else None."""
+    args = list(args)
+    if len(args) == 3 and args[0] == "show" and args[2] == "--json":
+        return "show", {"id": args[1]}
+    if len(args) == 4 and args[0] == "update" and args[2] in ("--status", "-s"):
+        return "update", {"id": args[1], "status": args[3]}
+    if len(args) == 4 and args[0] == "close" and args[2] in ("--reason", "-r"):
+        return "close", {"id": args[1], "reason": args[3]}
+    return None
+
+
+class DaemonBackend:
+    """Sends the bd calls the daemon has operations for to the project's bd daemon, the rest to the CLI.
+
+    Connections are kept open and reused for every later call (one per
+    concurrent caller, since fan_out() issues reads from several threads).
+    The CLI is used for calls without a typed operation (daemon_request()),
+    when the daemon is absent or disabled (`no-daemon: true` in
+    .beads/config.yaml, BEADS_NO_DAEMON, mode "off"), when it does not know
+    the operation, and when a connection fails before the request was sent.
+    A connection lost after sending reports the call as failed rather than
+    running it again, since the daemon may already have applied it.
+    """
+
+    shares_project_files = True
+
+    def __init__(self, fallback=None, timeout: float = BD_TIMEOUT, mode: str = "on"):
+        self.fallback = fallback or SubprocessBackend(timeout=timeout)
+        self.timeout = timeout
+        self.mode = mode
+        self._idle = {}  # socket path -> [_DaemonConnection, ...]
+        self._unknown = set()  # (socket path, operation) the daemon answered "unknown operation" to
+        self._sockets = {}  # cwd -> socket path, or None if the project opts out of the daemon
+        self._lock = threading.Lock()
+        self.daemon_calls = self.cli_calls = 0
+
+    def socket_path(self, cwd: Optional[str]) -> Optional[str]:
+        """The daemon socket for the project containing cwd, or None if the daemon must not be used."""
+        if self.mode == "off" or os.environ.get("BEADS_NO_DAEMON", "").lower() in ("1", "true", "yes"):
+            return None
+        cwd = os.path.abspath(cwd or os.getcwd())
+        if cwd not in self._sockets:
+            path, directory = None, cwd
+            while True:
+                beads_dir = os.path.join(directory, ".beads")
+                if os.path.isdir(beads_dir):
+                    path = None if _config_disables_daemon(beads_dir) else os.path.join(beads_dir, DAEMON_SOCKET)
+                    break
+                parent = os.path.dirname(directory)
+                if parent == directory:
+                    break
+                directory = parent
+            self._sockets[cwd] = path
+        return self._sockets[cwd]
+
+    def run(self, args: list, cwd: Optional[str] = None, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+        """Run `bd ARGS` through the daemon when possible, else the CLI (see SubprocessBackend.run)."""
+        limit = self.timeout if timeout is None else min(self.timeout, timeout)
+        typed = daemon_request(args)
+        path = self.socket_path(cwd) if typed is not None else None
+        if path is not None and (path, typed[0]) not in self._unknown and os.path.exists(path):
+            operation, operation_args = typed
+            request = json.dumps({"operation": operation, "args": operation_args, "cwd": cwd}).encode() + b"\n"
+            result = self._call(path, request, args, limit)
+            if result is not None:
+                with self._lock:
+                    self.daemon_calls += 1
+                return result
+        with self._lock:
+            self.cli_calls += 1
+        return self.fallback.run(args, cwd=cwd, timeout=timeout)
+
+    def _call(self, path: str, request: bytes, args: list, limit: float) -> Optional[Tuple[int, str, str]]:
+        """One request over a pooled connection; None means "use the CLI" (nothing was applied)."""
+        import socket
+
+        for _ in range(2):  # A pooled connection may have gone stale: retry once on a fresh one
+            conn = self._checkout(path, limit)
+            if conn is None:
+                return None
+            try:
+                conn.send(request, limit)
+            except OSError:
+                conn.close()
+                continue
+            try:
+                reply = conn.receive()
+            except socket.timeout as e:
+                conn.close()
+                raise BdTimeout(f"bd {' '.join(args)} timed out after {limit:g}s (daemon)") from e
+            except (OSError, DaemonError) as e:
+                conn.close()
+                return 1, "", f"Error: bd daemon connection lost during bd {' '.join(args)}: {e}"
+            self._checkin(path, conn)
+            return self._result(path, args, reply)
+        return None
+
+    def _result(self, path: str, args: list, reply: dict) -> Optional[Tuple[int, str, str]]:
+        """(returncode, stdout, stderr) as the CLI would give them for a daemon reply; None to use the CLI."""
+        if not reply.get("success"):
+            error = str(reply.get("error") or "bd daemon call failed")
+            if _UNKNOWN_OPERATION.search(error):
+                self._unknown.add((path, args[0]))  # An older daemon: the CLI handles this call
+                return None
+            return 1, "", f"Error: {error}\n"
+        if args[0] != "show":
+            return 0, "", ""  # The hooks only look at the exit code of a write
+        data = reply.get("data")
+        if not isinstance(data, dict):
+            return 1, "", f"Error: unreadable bd daemon reply to bd {' '.join(args)}\n"
+        return 0, json.dumps([data]) + "\n", ""  # `bd show --json` prints a list
+
+    def _checkout(self, path: str, limit: float) -> Optional[_DaemonConnection]:
+        with self._lock:
+            idle = self._idle.get(path, [])
+            while idle:
+                conn = idle.pop()
+                if conn.alive():
+                    return conn
+                conn.close()
+        try:
+            return _DaemonConnection(path, limit)
+        except OSError:
+            return None  # Stale socket file or daemon not accepting: the CLI will do
+
+    def _checkin(self, path: str, conn: _DaemonConnection):
+        with self._lock:
+            self._idle.setdefault(path, []).append(conn)
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+def _config_disables_daemon(beads_dir: str) -> bool:
+    try:
+        with open(os.path.join(beads_dir, "config.yaml"), encoding="utf-8") as f:
+            return _NO_DAEMON.search(f.read()) is not None
+    except OSError:
+        return False
+
+
+_backend = DaemonBackend() if DAEMON_MODE == "on" else SubprocessBackend()
+
+
+def get_backend():
+    return _backend
+
+
+def set_backend(backend) -> object:
+    """Install a backend for all subsequent bd calls. Returns the previous one."""
+    global _backend
+    previous, _backend = _backend, backend
+    return previous
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Validate a whole script of bd commands at once, without running any of them.
+
+Reads a file (or stdin) of commands, one per line, and puts each through the
+same PreToolUse rules bash_hooks.py applies. Every line is checked against one
+shared snapshot of the project plus the planned effects of the lines before it,
+so an issue created on line 1 is known by line 5. The planned effects are the
+command's own, the status propagation it would trigger and the PostToolUse
+auto-block. Nothing is written: bd is only asked for reads, each issue at most
+once.
+
+Issues created without `--id` can be referred to later through a shell
+variable, as scripts do:
+
+  EPIC=$(bd create "Epic" --label type:epic --type epic --silent)
+  bd create "Ticket" --label type:ticket --parent "$EPIC"
+
+Blank lines, `#` comments and trailing-backslash continuations are handled like
+the shell would. A blocked line's effects are not applied, and checking goes on,
+so one run reports every violation. Exit code: 0 if every line would be
+allowed, 2 if any would be blocked, 1 if the script cannot be read.
+
+Usage:
+  python3 bd_batch.py [--cwd DIR] FILE|-
+"""
+
+import os
+import re
+import sys
+from typing import Optional
+
+import bash_hooks
+import beads_db
+from bd_command import parse_bd_command
+from beads_hierarchy import HierarchyIndex, IssueRecord
+
+_ASSIGNMENT = re.compile(r"^(\w+)=\$\((.*)\)$")  # VAR=$(bd create ...)
+_BRACED_VAR = re.compile(r"\$\{(\w+)\}")
+
+# Status each propagation kind moves the issues it plans to
+PLANNED_STATUS = {"in_progress": "in_progress", "blocked": "blocked", "unblock": "open", "cascade": "closed"}
+
+
+def read_commands(lines) -> list:
+    """(line number, command, assigned variable or None) for each command in a script."""
+    commands, pending, start = [], "", 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\n")
+        if not pending:
+            start = number
+        if line.endswith("\\"):
+            pending += line[:-1] + " "
+            continue
+        text, pending = (pending + line).strip(), ""
+        if not text or text.startswith("#"):
+            continue
+        text = _BRACED_VAR.sub(r"$\1", text)
+        match = _ASSIGNMENT.match(text)
+        if match:
+            commands.append((start, match.group(2).strip(), "$" + match.group(1)))
+        else:
+            commands.append((start, text, None))
+    if pending.strip():
+        commands.append((start, _BRACED_VAR.sub(r"$\1", pending.strip()), None))
+    return commands
+
+
+class PlanStore(bash_hooks.IssueStore):
+    """An IssueStore that layers the batch's planned changes over the project's snapshot."""
+
+    def __init__(self, reader: Optional[beads_db.BeadsReader] = None):
+        super().__init__(reader)
+        self.created = {}  # issue_id -> IssueRecord for issues the batch creates
+        self.statuses = {}  # issue_id -> planned status
+        self.deleted = set()
+        self.added_edges = set()  # (blocker, blocked)
+        self.removed_edges = set()
+
+    def _with_plan(self, issue):
+        status = self.statuses.get(issue["id"])
+        if status is None or status == issue.get("status"):
+            return issue
+        if isinstance(issue, IssueRecord):
+            return IssueRecord(issue.id, issue.parent, status, issue.type, issue.blocked_by)
+        return {**issue, "status": status}
+
+    def issue(self, issue_id: str) -> Optional[dict]:
+        if issue_id in self.deleted:
+            return None
+        issue = self.created.get(issue_id) or super().issue(issue_id)
+        return self._with_plan(issue) if issue else None
+
+    def children(self, issue_id: str) -> list:
+        base = [] if issue_id in self.created else super().children(issue_id)
+        planned = [c for c in self.created.values() if c.parent == issue_id]
+        return [self._with_plan(c) for c in base + planned if c["id"] not in self.deleted]
+
+    def ancestors(self, issue_id: str) -> list:
+        if issue_id not in self.created:
+            return [self._with_plan(a) for a in super().ancestors(issue_id)]
+        parent = self.issue(self.created[issue_id].parent) if self.created[issue_id].parent else None
+        return [parent] + self.ancestors(parent["id"]) if parent else []
+
+    def subtree(self, issue_id: str) -> HierarchyIndex:
+        if issue_id not in self.created:
+            super().subtree(issue_id)  # One read of the real subtree primes the children cache
+        records, frontier = [], [issue_id]
+        while frontier:
+            next_frontier = []
+            for parent_id in frontier:
+                for child in self.children(parent_id):
+                    if not isinstance(child, IssueRecord):
+                        child = IssueRecord.from_issue({**child, "parent": parent_id})
+                    records.append(child)
+                    next_frontier.append(child.id)
+            frontier = next_frontier
+        return HierarchyIndex(records)
+
+    def blockers(self, issue_id: str) -> list:
+        base = [] if issue_id in self.created else [d["id"] for d in super().blockers(issue_id)]
+        found = [b for b in base if (b, issue_id) not in self.removed_edges]
+        found += sorted(b for b, blocked in self.added_edges if blocked == issue_id and b not in found)
+        return [{"id": b, "type": beads_db.BLOCKS_DEP_TYPE} for b in found if b not in self.deleted]
+
+    # -- planned effects -------------------------------------------------------
+
+    def set_status(self, issue_id: str, status: str):
+        self.statuses[issue_id] = status
+
+    def add_edge(self, blocker: str, blocked: str):
+        self.removed_edges.discard((blocker, blocked))
+        self.added_edges.add((blocker, blocked))
+        self.blocks_graph().forget(blocked)
+
+    def remove_edge(self, blocker: str, blocked: str):
+        self.added_edges.discard((blocker, blocked))
+        self.removed_edges.add((blocker, blocked))
+        self.blocks_graph().forget(blocked)
+
+    def delete(self, issue_id: str, cascade: bool):
+        doomed = [issue_id] + ([d["id"] for d in self.subtree(issue_id).descendants(issue_id)] if cascade else [])
+        self.deleted.update(doomed)
+        for gone in doomed:
+            self.blocks_graph().remove_issue(gone)
+
+
+class BatchCheck:
+    """Checks a script's commands in order against a PlanStore, collecting each line's report."""
+
+    def __init__(self, store: PlanStore):
+        self.store = store
+        self.notes = []  # Planned effects of the current line, for its report
+        self.violations = 0
+
+    def plan_propagation(self, kind: str, issue_id: str, reason: Optional[str] = None):
+        """bash_hooks.PROPAGATION_PLANNER: plan the propagation into the store instead of running it."""
+        batch = bash_hooks.MutationBatch()
+        if kind == "in_progress":
+            planned = bash_hooks.propagate_in_progress_up_chain(issue_id, batch)
+        elif kind == "blocked":
+            planned = bash_hooks.propagate_blocked_up_chain(issue_id, batch)
+        elif kind == "unblock":
+            planned = bash_hooks.propagate_unblock_up_chain(issue_id, batch)
+        else:
+            planned = bash_hooks.cascade_close_descendants(issue_id, reason, batch)
+        status = PLANNED_STATUS[kind]
+        for planned_id in planned:
+            self.store.set_status(planned_id, status)
+        if planned:
+            self.notes.append(f"PLAN: {kind} propagation sets {', '.join(planned)} to {status}")
+
+    def check(self, command: str, variable: Optional[str]) -> Optional[str]:
+        """Run the PreToolUse rules on one command; apply its effects if it would be allowed."""
+        self.notes = []
+        cmd = parse_bd_command(command)
+        if cmd is not None:
+            for name, rule in (
+                ("bd_command_guard", bash_hooks.check_bd_command_guard),
+                ("status_propagation", bash_hooks.handle_bd_status_propagation),
+            ):
+                error = bash_hooks.run_rule(name, rule, command)
+                if error:
+                    return error
+        error = bash_hooks.run_rule("system_temp", bash_hooks.check_system_temp, command)
+        if error:
+            return error
+        if cmd is not None:
+            self.apply(cmd, variable)
+        return None
+
+    def apply(self, cmd, variable: Optional[str]):
+        """Plan what an allowed command does once it has run, including the PostToolUse auto-block."""
+        store = self.store
+        if cmd.verb == "create":
+            issue_id = variable or (cmd.flags["id"] if isinstance(cmd.flags.get("id"), str) else None)
+            if issue_id:
+                store.created[issue_id] = IssueRecord(issue_id, cmd.parent, "open", cmd.type_label())
+                self.notes.append(f"PLAN: creates {issue_id}" + (f" under {cmd.parent}" if cmd.parent else ""))
+            elif cmd.type_label() in ("epic", "ticket"):
+                self.notes.append("NOTE: created issue has no --id or variable; later lines cannot refer to it")
+        elif cmd.verb == "update" and cmd.status:
+            for issue_id in cmd.positionals:
+                store.set_status(issue_id, cmd.status.lower())
+        elif cmd.verb in ("close", "reopen"):
+            for issue_id in cmd.positionals:
+                store.set_status(issue_id, "closed" if cmd.verb == "close" else "open")
+        elif cmd.verb == "delete" and cmd.issue_id:
+            store.delete(cmd.issue_id, cmd.has_flag("cascade"))
+        elif cmd.verb == "dep":
+            edge = bash_hooks.parse_blocks_edge(cmd)
+            args = cmd.positionals
+            if edge:
+                store.add_edge(*edge)
+                blocked = store.issue(edge[1])
+                if blocked and blocked.get("status") not in ("blocked", "closed"):
+                    store.set_status(edge[1], "blocked")
+                    self.notes.append(f"PLAN: auto-block sets {edge[1]} to blocked")
+            elif len(args) >= 3 and args[0] in ("remove", "rm"):
+                store.remove_edge(args[2], args[1])
+
+
+def run_batch(lines, cwd: str) -> int:
+    """Check every command in `lines`, report on stderr. Returns 2 if any would be blocked, else 0."""
+    commands = read_commands(lines)
+    checker = BatchCheck(bash_hooks.begin_planning_run(cwd, PlanStore))
+    bash_hooks.PROPAGATION_PLANNER = checker.plan_propagation
+    try:
+        for number, command, variable in commands:
+            error = checker.check(command, variable)
+            if error:
+                checker.violations += 1
+                first, _, rest = error.partition("\n")
+                print(f"line {number}: {first}", file=sys.stderr)
+                for detail in rest.splitlines():
+                    print(f"    {detail}", file=sys.stderr)
+            for note in checker.notes:
+                print(f"line {number}: {note}", file=sys.stderr)
+        if bash_hooks.HOOK_STATS:
+            print(checker.store.stats(), file=sys.stderr)
+    finally:
+        bash_hooks.PROPAGATION_PLANNER = None
+        bash_hooks.reset_hook_state()
+    print(f"BATCH: {len(commands)} commands checked, {checker.violations} would be blocked", file=sys.stderr)
+    return 2 if checker.violations else 0
+
+
+def main():
+    args = sys.argv[1:]
+    cwd = "."
+    if args[:1] == ["--cwd"] and len(args) >= 2:
+        cwd, args = args[1], args[2:]
+    if len(args) != 1:
+        print("Usage: python3 bd_batch.py [--cwd DIR] FILE|-", file=sys.stderr)
+        sys.exit(1)
+    cwd = os.path.abspath(cwd)
+    if args[0] == "-":
+        sys.exit(run_batch(sys.stdin, cwd))
+    try:
+        with open(args[0], encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    sys.exit(run_batch(lines, cwd))
+
+
+if __name__ == "__main__":
+    main()
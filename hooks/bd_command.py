@@ -0,0 +1,155 @@
+"""
+Single-pass parser for bd command lines.
+
+Tokenizes a shell command once with shell quoting rules and returns a
+BdCommand (verb, positional IDs, flags, labels) that every hook rule reads,
+instead of each rule rescanning the raw string with its own regex. Parsing
+stops at the first shell operator (`&&`, `;`, `|`, ...), so only the leading
+bd invocation is described. Commands with unbalanced quotes (heredocs,
+half-typed strings) fall back to a lenient whitespace/quote tokenizer.
+"""
+
+import re
+import shlex
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+
+# Flag spellings -> canonical name, for flags that take a value.
+VALUE_FLAGS = {
+    "-s": "status", "--status": "status",
+    "-r": "reason", "--reason": "reason",
+    "-m": "comment", "--comment": "comment", "--message": "comment",
+    "-p": "parent", "--parent": "parent",
+    "-l": "labels", "--label": "labels", "--labels": "labels",
+    "-t": "type", "--type": "type",
+    "-b": "blocks", "--blocks": "blocks",
+    "-d": "description", "--description": "description",
+    "-a": "assignee", "--assignee": "assignee",
+    "--title": "title", "--priority": "priority", "--id": "id",
+    "--design": "design", "--notes": "notes", "--acceptance": "acceptance",
+    "--external-ref": "external_ref", "--deps": "deps", "--estimate": "estimate",
+}
+
+# Flags whose values accumulate instead of the last one winning.
+REPEATABLE_FLAGS = {"labels"}
+
+_LENIENT_TOKEN = re.compile(r'"([^"]*)"|\'([^\']*)\'|(\S+)')
+_OPERATOR_CHARS = set("();<>|&")
+
+
+@dataclass(frozen=True)
+class BdCommand:
+    """A parsed `bd <verb> ...` invocation."""
+
+    verb: str
+    positionals: tuple = ()  # Non-flag arguments after the verb (IDs, titles, subcommands)
+    flags: dict = field(default_factory=dict)  # Canonical name -> value (True for bare flags)
+    labels: tuple = ()  # Every label given via -l/--label/--labels, comma lists split
+
+    @property
+    def issue_id(self) -> Optional[str]:
+        return self.positionals[0] if self.positionals else None
+
+    @property
+    def status(self) -> Optional[str]:
+        return self._text("status")
+
+    @property
+    def reason(self) -> Optional[str]:
+        return self._text("reason")
+
+    @property
+    def comment(self) -> Optional[str]:
+        return self._text("comment")
+
+    @property
+    def parent(self) -> Optional[str]:
+        return self._text("parent")
+
+    @property
+    def issue_type(self) -> Optional[str]:
+        return self._text("type")
+
+    @property
+    def blocks(self) -> Optional[str]:
+        return self._text("blocks")
+
+    def has_flag(self, name: str) -> bool:
+        return name in self.flags
+
+    def has_label(self, label: str) -> bool:
+        return label.lower() in (l.lower() for l in self.labels)
+
+    def type_label(self) -> Optional[str]:
+        """The first `type:<name>` label for a known issue type, if any."""
+        for type_name in ("epic", "ticket", "ac", "research"):
+            if self.has_label(f"type:{type_name}"):
+                return type_name
+        return None
+
+    def _text(self, name: str) -> Optional[str]:
+        value = self.flags.get(name)
+        return value if isinstance(value, str) and value else None
+
+
+def tokenize(command: str) -> list:
+    """Split a command with shell quoting, stopping at the first shell operator."""
+    try:
+        lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+        lexer.whitespace_split = True
+        tokens = []
+        for token in lexer:
+            if token and set(token) <= _OPERATOR_CHARS:
+                break
+            tokens.append(token)
+        return tokens
+    except ValueError:
+        # Unbalanced quotes: keep whatever quoted/bare words we can recognize.
+        tokens = []
+        for match in _LENIENT_TOKEN.finditer(command):
+            bare = match.group(3)
+            if bare is not None and set(bare) <= _OPERATOR_CHARS:
+                break
+            tokens.append(next(g for g in match.groups() if g is not None))
+        return tokens
+
+
+@lru_cache(maxsize=256)
+def parse_bd_command(command: str) -> Optional[BdCommand]:
+    """Parse a bd command line. Returns None if the command is not `bd <verb> ...`."""
+    head = command.lstrip()[:3]
+    if head[:2] != "bd" or not head[2:].isspace():
+        return None  # Cheap reject before tokenizing arbitrary (possibly huge) shell input
+    tokens = tokenize(command)
+    if len(tokens) < 2 or tokens[0] != "bd" or tokens[1].startswith("-"):
+        return None
+
+    positionals, flags, labels = [], {}, []
+    rest = tokens[2:]
+    i = 0
+    while i < len(rest):
+        token = rest[i]
+        i += 1
+        if not token.startswith("-") or token == "-":
+            positionals.append(token)
+            continue
+        name, eq, inline = token.partition("=")
+        canonical = VALUE_FLAGS.get(name)
+        if canonical is None:
+            flags[name.lstrip("-")] = inline if eq else True
+            continue
+        if eq:
+            value = inline
+        elif i < len(rest):
+            value = rest[i]
+            i += 1
+        else:
+            value = ""
+        if canonical in REPEATABLE_FLAGS:
+            labels.extend(l.strip() for l in value.split(",") if l.strip())
+            flags[canonical] = ",".join(labels)
+        else:
+            flags[canonical] = value
+
+    return BdCommand(tokens[1], tuple(positionals), flags, tuple(labels))
@@ -0,0 +1,336 @@
+"""
+In-memory bd backend for hermetic hook tests and benchmarks.
+
+FakeBd implements the bd subcommands the hooks use (show, list --parent,
+dep list, dep --blocks, update, close, create, delete, admin compact, export)
+over a dict of issues, with the same JSON output shapes as `bd ... --json`.
+Install it with bd_backend.set_backend(); every call is recorded in `calls`.
+
+Slow or flaky bd can be modelled with `latency` (seconds per call, or a
+callable taking the argument list) and `fail` (a callable returning True for
+calls that should exit 1, or raising BdTimeout to simulate a timeout).
+
+FakeDaemon stands in for the bd daemon: it serves any backend (a FakeBd, or a
+SubprocessBackend around some bd executable) on a Unix socket with the typed
+show, update and close operations bd_backend.DaemonBackend sends.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from typing import Callable, Optional, Tuple, Union
+
+from bd_backend import BdTimeout
+from bd_command import REPEATABLE_FLAGS, VALUE_FLAGS
+
+PARENT_DEP_TYPE = "parent-child"
+BLOCKS_DEP_TYPE = "blocks"
+
+
+class FakeBd:
+    """Dict-backed stand-in for the bd CLI."""
+
+    # Reads of .beads/ on disk would not see this data; the hooks must ask us.
+    shares_project_files = False
+
+    def __init__(
+        self,
+        latency: Union[float, Callable[[list], float]] = 0.0,
+        fail: Optional[Callable[[list], bool]] = None,
+    ):
+        self.issues = {}  # issue_id -> issue dict (id, title, status, labels, parent, blocked_by)
+        self.latency = latency
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()  # Hooks fan reads out over threads
+        self._next_id = 1
+
+    def add(
+        self,
+        issue_id: str,
+        status: str = "open",
+        issue_type: Optional[str] = None,
+        parent: Optional[str] = None,
+        blocked_by: tuple = (),
+        title: Optional[str] = None,
+    ) -> dict:
+        """Add an issue; `issue_type` becomes a `type:<name>` label."""
+        issue = {
+            "id": issue_id,
+            "title": title or issue_id,
+            "status": status,
+            "priority": 2,
+            "issue_type": "epic" if issue_type == "epic" else "task",
+            "labels": [f"type:{issue_type}"] if issue_type else [],
+            "parent": parent,
+            "blocked_by": list(blocked_by),
+            "updated_at": _now(),
+        }
+        self.issues[issue_id] = issue
+        return issue
+
+    def snapshot(self) -> dict:
+        return _copy_issues(self.issues)
+
+    def restore(self, snapshot: dict):
+        """Reset to a snapshot() and forget recorded calls."""
+        self.issues = _copy_issues(snapshot)
+        self.calls = []
+
+    # -------------------------------------------------------------------------
+
+    def run(self, args: list, cwd: Optional[str] = None, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+        args = list(args)
+        latency = self.latency(args) if callable(self.latency) else self.latency
+        if timeout is not None and latency > timeout:
+            time.sleep(max(timeout, 0))
+            with self._lock:
+                self.calls.append(args)
+            raise BdTimeout(f"bd {' '.join(args)} timed out after {timeout:g}s")
+        if latency:
+            time.sleep(latency)
+        with self._lock:
+            self.calls.append(args)
+            if self.fail and self.fail(args):
+                return 1, "", f"Error: injected failure for bd {' '.join(args)}"
+            if not args:
+                return 1, "", "Error: no command"
+            positionals, flags = _parse(args[1:])
+            handler = getattr(self, "_" + args[0], None)
+            if handler is None:
+                return 0, "[]\n", ""
+            return handler(positionals, flags)
+
+    def _visible(self, issue_id: str) -> Optional[dict]:
+        issue = self.issues.get(issue_id)
+        return issue if issue and issue["status"] != "tombstone" else None
+
+    def _public(self, issue: dict) -> dict:
+        """Issue as bd prints it (blocked_by is our own bookkeeping)."""
+        shown = {k: v for k, v in issue.items() if k != "blocked_by"}
+        shown["labels"] = list(issue["labels"])
+        deps = [{"issue_id": issue["id"], "depends_on_id": b, "type": BLOCKS_DEP_TYPE} for b in issue["blocked_by"]]
+        if issue["parent"]:
+            deps.append({"issue_id": issue["id"], "depends_on_id": issue["parent"], "type": PARENT_DEP_TYPE})
+        shown["dependencies"] = deps
+        return shown
+
+    def _json(self, issues: list) -> Tuple[int, str, str]:
+        return 0, json.dumps([self._public(i) for i in issues]) + "\n", ""
+
+    def _missing(self, issue_id: str) -> Tuple[int, str, str]:
+        return 1, "", f"Error: issue not found: {issue_id}"
+
+    def _show(self, positionals: list, flags: dict):
+        issues = []
+        for issue_id in positionals:
+            issue = self._visible(issue_id)
+            if issue is None:
+                return self._missing(issue_id)
+            issues.append(issue)
+        return self._json(issues)
+
+    def _list(self, positionals: list, flags: dict):
+        parent = flags.get("parent")
+        issues = [i for i in self.issues.values() if i["status"] != "tombstone"]
+        if parent:
+            issues = [i for i in issues if i["parent"] == parent]
+        return self._json(sorted(issues, key=lambda i: i["id"]))
+
+    def _dep(self, positionals: list, flags: dict):
+        if positionals[:1] == ["list"] and len(positionals) > 1:
+            issue = self._visible(positionals[1])
+            if issue is None:
+                return self._missing(positionals[1])
+            blockers = [{"id": b, "type": BLOCKS_DEP_TYPE} for b in issue["blocked_by"]]
+            return 0, json.dumps(blockers) + "\n", ""
+        blocked_id = flags.get("blocks")
+        if positionals and isinstance(blocked_id, str):
+            blocked = self._visible(blocked_id)
+            if blocked is None or self._visible(positionals[0]) is None:
+                return self._missing(blocked_id if blocked is None else positionals[0])
+            if positionals[0] not in blocked["blocked_by"]:
+                blocked["blocked_by"].append(positionals[0])
+            return 0, "", ""
+        return 0, "[]\n", ""
+
+    def _set_status(self, ids: list, status: str):
+        for issue_id in ids:
+            if self._visible(issue_id) is None:
+                return self._missing(issue_id)
+        for issue_id in ids:
+            self.issues[issue_id].update(status=status, updated_at=_now())
+        return self._json([self.issues[i] for i in ids])
+
+    def _update(self, positionals: list, flags: dict):
+        status = flags.get("status")
+        if not isinstance(status, str):
+            return self._show(positionals, flags)
+        return self._set_status(positionals, status)
+
+    def _close(self, positionals: list, flags: dict):
+        return self._set_status(positionals, "closed")
+
+    def _create(self, positionals: list, flags: dict):
+        issue_id = flags.get("id") if isinstance(flags.get("id"), str) else f"fake-{self._next_id}"
+        self._next_id += 1
+        issue = self.add(issue_id, parent=flags.get("parent") or None, title=positionals[0] if positionals else None)
+        issue["labels"] = list(flags.get("labels", []))
+        return self._json([issue])
+
+    def _delete(self, positionals: list, flags: dict):
+        ids, frontier = [], list(positionals)
+        while frontier:
+            ids.extend(frontier)
+            if not flags.get("cascade"):
+                break
+            frontier = [i["id"] for i in self.issues.values() if i["parent"] in frontier]
+        for issue_id in ids:
+            if issue_id in self.issues:
+                self.issues[issue_id]["status"] = "tombstone"
+        return 0, "", ""
+
+    def _admin(self, positionals: list, flags: dict):
+        if positionals[:1] == ["compact"] and flags.get("purge-tombstones"):
+            for issue_id in [i for i, issue in self.issues.items() if issue["status"] == "tombstone"]:
+                del self.issues[issue_id]
+        return 0, "", ""
+
+    def _export(self, positionals: list, flags: dict):
+        lines = [json.dumps(self._public(i)) for _, i in sorted(self.issues.items())]
+        return 0, "".join(line + "\n" for line in lines), ""
+
+
+class FakeDaemon:
+    """Serves `backend.run()` over a Unix socket as the daemon's typed operations, one JSON line each way."""
+
+    def __init__(self, backend, socket_path: str):
+        self.backend = backend
+        self.socket_path = socket_path
+        self.connections = 0  # Accepted so far (reuse keeps this low)
+        self.requests = 0
+        self._server = None
+        self._open = set()  # Accepted connections, closed by stop() like a daemon exiting
+
+    def start(self) -> "FakeDaemon":
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        self._server.listen(16)
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for conn in list(self._open):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # Client already gone
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def __enter__(self) -> "FakeDaemon":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _accept(self):
+        while self._server is not None:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return  # Stopped
+            self.connections += 1
+            self._open.add(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        with conn, conn.makefile("rb") as requests:
+            for line in requests:
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    reply = {"success": False, "error": "invalid request"}
+                else:
+                    reply = self._handle(request)
+                try:
+                    conn.sendall(json.dumps(reply).encode() + b"\n")
+                except OSError:
+                    break
+        self._open.discard(conn)
+
+    def _handle(self, request: dict) -> dict:
+        self.requests += 1
+        operation, args = request.get("operation"), request.get("args") or {}
+        if operation == "show":
+            argv = ["show", args.get("id"), "--json"]
+        elif operation == "update":
+            argv = ["update", args.get("id"), "--status", args.get("status")]
+        elif operation == "close":
+            argv = ["close", args.get("id"), "--reason", args.get("reason") or ""]
+        else:
+            return {"success": False, "error": f"unknown operation: {operation}"}
+        try:
+            code, stdout, stderr = self.backend.run(argv, cwd=request.get("cwd"))
+        except Exception as e:  # BdTimeout, OSError: report like a failed CLI run
+            code, stdout, stderr = 1, "", str(e)
+        if code != 0:
+            return {"success": False, "error": stderr.strip().removeprefix("Error: ") or f"{operation} failed"}
+        if operation != "show":
+            return {"success": True}
+        issues = json.loads(stdout)
+        return {"success": True, "data": issues[0] if isinstance(issues, list) else issues}
+
+
+def _now() -> str:
+    """Current time as bd prints updated_at (RFC 3339, UTC)."""
+    ns = time.time_ns()
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(ns // 10**9)) + f".{ns % 10**9:09d}Z"
+
+
+def _copy_issues(issues: dict) -> dict:
+    """Copy issues deep enough for writes (status, labels, blockers) not to leak."""
+    return {
+        issue_id: {**issue, "labels": list(issue["labels"]), "blocked_by": list(issue["blocked_by"])}
+        for issue_id, issue in issues.items()
+    }
+
+
+def _parse(args: list) -> Tuple[list, dict]:
+    """Split bd arguments into positionals and canonical flags (labels as a list)."""
+    positionals, flags = [], {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        i += 1
+        if not arg.startswith("-") or arg == "-":
+            positionals.append(arg)
+            continue
+        name, eq, inline = arg.partition("=")
+        canonical = VALUE_FLAGS.get(name)
+        if canonical is None:
+            flags[name.lstrip("-")] = inline if eq else True
+            continue
+        if eq:
+            value = inline
+        elif i < len(args):
+            value, i = args[i], i + 1
+        else:
+            value = ""
+        if canonical in REPEATABLE_FLAGS:
+            flags.setdefault(canonical, []).extend(v.strip() for v in value.split(",") if v.strip())
+        else:
+            flags[canonical] = value
+    return positionals, flags
+
+
+def timeout(args: list) -> bool:
+    """`fail=` helper that makes every matching call time out."""
+    raise BdTimeout(f"bd {' '.join(args)} timed out")
@@ -14,10 +14,11 @@ Exit codes:
 import json
 import os
 import re
-import subprocess
 import sys
 from typing import Optional
 
+import bd_backend
+
 
 def get_command() -> str:
     """Extract the command from stdin JSON (Claude Code PreToolUse format)."""
@@ -139,10 +140,9 @@ def parse_bd_update(command: str) -> tuple[Optional[str], Optional[str]]:
 
 
 def run_bd_command(args: list[str]) -> tuple[int, str, str]:
-    """Run a bd command and return (returncode, stdout, stderr)."""
+    """Run a bd command through the current backend and return (returncode, stdout, stderr)."""
     try:
-        result = subprocess.run(["bd"] + args, capture_output=True, text=True, timeout=10)
-        return result.returncode, result.stdout, result.stderr
+        return bd_backend.get_backend().run(args)
     except Exception as e:
         return 1, "", str(e)
 
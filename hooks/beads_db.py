@@ -0,0 +1,410 @@
+"""
+Direct read-only access to the Beads SQLite database for the hooks.
+
+Answers the read queries the hooks make (show, children, parent, blocking
+deps) with indexed SQL instead of spawning the bd CLI. All reads made through
+one BeadsReader share a single snapshot transaction until refresh() is
+called. Writes never go through here; they stay on the bd CLI so bd keeps
+its own bookkeeping (dirty tracking, JSONL export, daemon state).
+
+If the database is missing, locked, older than the JSONL export, or has a
+schema this module does not recognize, open_reader() returns None and the
+caller falls back to bd.
+"""
+
+import json
+import os
+import sqlite3
+from typing import Optional
+from urllib.parse import quote
+
+from beads_hierarchy import HierarchyIndex, IssueRecord
+
+# Columns this module reads; anything else in the schema is ignored.
+REQUIRED_COLUMNS = {
+    "issues": {"id", "title", "status", "priority", "issue_type"},
+    "dependencies": {"issue_id", "depends_on_id", "type"},
+    "labels": {"issue_id", "label"},
+}
+
+PARENT_DEP_TYPE = "parent-child"
+BLOCKS_DEP_TYPE = "blocks"
+HIDDEN_STATUSES = ("tombstone",)
+LABEL_BATCH = 500  # Stay well under SQLite's bound-parameter limit
+HOOKS_DIRNAME = os.path.join(".beads", "hooks")
+MAX_DEPTH = 100  # Parent-chain length past which we assume a cycle
+
+
+def _metadata(project_root: str) -> dict:
+    try:
+        with open(os.path.join(project_root, ".beads", "metadata.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def database_path(project_root: str) -> str:
+    """Resolve the database path the same way bd does (BEADS_DB, then metadata.json)."""
+    if os.environ.get("BEADS_DB"):
+        return os.environ["BEADS_DB"]
+    name = _metadata(project_root).get("database") or "beads.db"
+    return os.path.join(project_root, ".beads", name)
+
+
+def export_path(project_root: str) -> str:
+    """Path of the JSONL export named in metadata.json."""
+    name = _metadata(project_root).get("jsonl_export") or "issues.jsonl"
+    return os.path.join(project_root, ".beads", name)
+
+
+def hooks_dir(project_root: str) -> str:
+    """`.beads/hooks/`, where the hooks keep their own (git-ignored) state; created on demand."""
+    path = os.path.join(project_root, HOOKS_DIRNAME)
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, ".gitignore"), "w") as f:
+            f.write("*\n")
+    return path
+
+
+def _connect_read_only(db_path: str) -> Optional[sqlite3.Connection]:
+    try:
+        return sqlite3.connect(
+            f"file:{quote(os.path.abspath(db_path))}?mode=ro",
+            uri=True,
+            timeout=1.0,
+            isolation_level=None,
+        )
+    except sqlite3.Error:
+        return None
+
+
+def _file_identity(path: str) -> Optional[str]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def files_identity(project_root: str) -> tuple:
+    """What changes when bd commits to beads.db or rewrites the export, and not when a reader opens them.
+
+    The database's and export's inode, size and mtime, and for the WAL also
+    its salts (a commit appends frames or, after a checkpoint, restarts the
+    WAL with new salts). An empty or missing WAL counts as none: readers
+    create one, and bd removes it when its last connection closes.
+    """
+    db_path = database_path(project_root)
+    wal = None
+    try:
+        with open(db_path + "-wal", "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_size:
+                wal = (st.st_ino, st.st_size, st.st_mtime_ns, f.read(24)[16:])
+    except OSError:
+        pass
+    return _file_identity(db_path), wal, _file_identity(export_path(project_root))
+
+
+# Per-row checksums summed into source_signature(). An issue's term mixes its
+# rowid with its status (first letter and length tell bd's statuses apart); a
+# parent-child link's term mixes its rowid with its parent's rowid. A write
+# that keeps the counts and timestamps (an import with old updated_at values,
+# two writes within a second, a link re-inserted under a reused rowid) still
+# moves a sum. Modulo a Mersenne prime, every intermediate stays inside
+# SQLite's 64-bit integers.
+CHECKSUM_MODULUS = 2147483647
+
+
+def _term_sql(rowid: str, code: str) -> str:
+    return f"(({rowid} % {CHECKSUM_MODULUS}) * 2654435761 + {code}) % {CHECKSUM_MODULUS} * 48271 % {CHECKSUM_MODULUS}"
+
+
+def _term(rowid: int, code: int) -> int:
+    return (rowid % CHECKSUM_MODULUS * 2654435761 + code) % CHECKSUM_MODULUS * 48271 % CHECKSUM_MODULUS
+
+
+_ISSUE_SUMS = (
+    "SELECT COUNT(*), SUM("
+    + _term_sql("rowid", "coalesce(unicode(status), 0) + 1114112 * coalesce(length(status), 0)")
+    + "), MAX(updated_at) FROM issues"
+)
+_LINK_SUMS = (
+    "SELECT COUNT(*), SUM(" + _term_sql("d.rowid", "coalesce(p.rowid, 0)") + ") FROM dependencies d "
+    "LEFT JOIN issues p ON p.id = d.depends_on_id WHERE d.type = ?"
+)
+
+
+def issue_checksum(rowid: int, status: str) -> int:
+    """An issue row's term in the signature's issue sum (what the SQL adds for it)."""
+    status = status or ""
+    return _term(rowid, (ord(status[0]) if status else 0) + 1114112 * len(status))
+
+
+def link_checksum(rowid: int, parent_rowid: Optional[int]) -> int:
+    """A parent-child link row's term in the signature's link sum (parent_rowid None: a dangling link)."""
+    return _term(rowid, parent_rowid or 0)
+
+
+def source_signature(project_root: str) -> Optional[str]:
+    """Identity of the issue data bd serves; changes when bd writes issues, not when SQLite touches files.
+
+    From the database: its inode, then for issues their count, checksum sum
+    and newest updated_at, and for parent-child links their count and
+    checksum sum ("db:ino|issues|sum|updated_at|links|sum"). A status or
+    parent change moves a sum whatever the timestamps say; updated_at only
+    tells readers where to look first. Opening, checkpointing or reading the
+    database leaves it as it is. Costs one scan of each table (about 0.15 s at
+    100k issues). When the JSONL export is what readers see (no database, or
+    an export newer than it): the export's inode, size and mtime ("jsonl:...").
+    None if neither can be read, or the issues table has no updated_at column.
+    """
+    if is_export_current(project_root):
+        identity = _file_identity(export_path(project_root))
+        return f"jsonl:{identity}" if identity else None
+    db_path = database_path(project_root)
+    conn = _connect_read_only(db_path)
+    if conn is None:
+        return None
+    try:
+        conn.execute("BEGIN")  # One snapshot for both tables
+        issues, issue_sum, updated = conn.execute(_ISSUE_SUMS).fetchone()
+        links, link_sum = conn.execute(_LINK_SUMS, (PARENT_DEP_TYPE,)).fetchone()
+        return f"db:{os.stat(db_path).st_ino}|{issues}|{issue_sum or 0}|{updated or ''}|{links}|{link_sum or 0}"
+    except (OSError, sqlite3.Error):
+        return None
+    finally:
+        conn.close()
+
+
+def parse_signature(signature: Optional[str]) -> Optional[dict]:
+    """The parts of a database source_signature(); None for an export signature or none at all."""
+    if not signature or not signature.startswith("db:"):
+        return None
+    database, issues, issue_sum, updated_at, links, link_sum = signature[3:].split("|")
+    return {
+        "database": database, "issues": int(issues), "issue_sum": int(issue_sum),
+        "updated_at": updated_at, "links": int(links), "link_sum": int(link_sum),
+    }
+
+
+class IssueRow:
+    """What the signature sums cover for one issue: its row, status and parent link (link_rowid None: no parent)."""
+
+    __slots__ = ("rowid", "status", "parent", "link_rowid", "parent_rowid")
+
+    def __init__(self, rowid, status, parent, link_rowid, parent_rowid):
+        self.rowid = rowid
+        self.status = status
+        self.parent = parent
+        self.link_rowid = link_rowid
+        self.parent_rowid = parent_rowid
+
+
+_ISSUE_ROWS = (
+    "SELECT i.id, i.rowid, i.status, d.depends_on_id, d.rowid, p.rowid FROM issues i "
+    "LEFT JOIN dependencies d ON d.issue_id = i.id AND d.type = ? "
+    "LEFT JOIN issues p ON p.id = d.depends_on_id WHERE "
+)
+
+
+def issues_updated_since(project_root: str, updated_at: str) -> Optional[dict]:
+    """{id: IssueRow} for every issue updated after `updated_at`; None if the database can't be read."""
+    return _issue_rows(project_root, [("i.updated_at > ?", (updated_at,))])
+
+
+def issue_rows(project_root: str, issue_ids) -> Optional[dict]:
+    """{id: IssueRow} for those of `issue_ids` the database has; None if it can't be read."""
+    issue_ids = list(dict.fromkeys(i for i in issue_ids if i))
+    batches = [issue_ids[start:start + LABEL_BATCH] for start in range(0, len(issue_ids), LABEL_BATCH)]
+    return _issue_rows(project_root, [(f"i.id IN ({','.join('?' * len(b))})", tuple(b)) for b in batches])
+
+
+def _issue_rows(project_root: str, queries: list) -> Optional[dict]:
+    if not queries:
+        return {}
+    conn = _connect_read_only(database_path(project_root))
+    if conn is None:
+        return None
+    try:
+        conn.execute("BEGIN")
+        rows = {}
+        for where, params in queries:
+            for issue_id, *row in conn.execute(_ISSUE_ROWS + where, (PARENT_DEP_TYPE, *params)):
+                rows[issue_id] = IssueRow(*row)
+        return rows
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+def is_database_current(db_path: str, jsonl_path: str) -> bool:
+    """False when the JSONL export is newer than the database (bd would import it first)."""
+    db_mtime = max(_mtime(db_path), _mtime(db_path + "-wal"))
+    return _mtime(jsonl_path) <= db_mtime
+
+
+def is_export_current(project_root: str) -> bool:
+    """True when the JSONL export is the freshest copy of the data (or the only one)."""
+    db_path = database_path(project_root)
+    jsonl_path = export_path(project_root)
+    if not os.path.isfile(jsonl_path):
+        return False
+    return not os.path.isfile(db_path) or not is_database_current(db_path, jsonl_path)
+
+
+class BeadsReader:
+    """Read-only view of beads.db inside one snapshot transaction."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._in_snapshot = False
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        if not self._in_snapshot:
+            self._conn.execute("BEGIN")
+            self._in_snapshot = True
+        return self._conn.execute(sql, params).fetchall()
+
+    def schema_supported(self) -> bool:
+        for table, columns in REQUIRED_COLUMNS.items():
+            found = {row[1] for row in self._query(f"PRAGMA table_info({table})")}
+            if not columns <= found:
+                return False
+        return True
+
+    def _labels(self, issue_ids: list) -> dict:
+        labels = {issue_id: [] for issue_id in issue_ids}
+        for start in range(0, len(issue_ids), LABEL_BATCH):
+            batch = tuple(issue_ids[start:start + LABEL_BATCH])
+            for issue_id, label in self._query(
+                f"SELECT issue_id, label FROM labels WHERE issue_id IN ({','.join('?' * len(batch))}) ORDER BY label",
+                batch,
+            ):
+                labels[issue_id].append(label)
+        return labels
+
+    def _issues(self, where: str, params: tuple, with_clause: str = "", with_params: tuple = ()) -> list:
+        rows = self._query(
+            f"{with_clause}SELECT i.id, i.title, i.status, i.priority, i.issue_type, d.depends_on_id "
+            "FROM issues i LEFT JOIN dependencies d "
+            "ON d.issue_id = i.id AND d.type = ? "
+            f"WHERE {where} AND i.status NOT IN ({','.join('?' * len(HIDDEN_STATUSES))}) "
+            "ORDER BY i.id",
+            with_params + (PARENT_DEP_TYPE,) + params + HIDDEN_STATUSES,
+        )
+        labels = self._labels([row[0] for row in rows])
+        return [
+            {
+                "id": issue_id,
+                "title": title,
+                "status": status,
+                "priority": priority,
+                "issue_type": issue_type,
+                "labels": labels[issue_id],
+                "parent": parent,
+            }
+            for issue_id, title, status, priority, issue_type, parent in rows
+        ]
+
+    def issue(self, issue_id: str) -> Optional[dict]:
+        """Equivalent of `bd show ID --json` for the fields the hooks use."""
+        found = self._issues("i.id = ?", (issue_id,))
+        return found[0] if found else None
+
+    def children(self, issue_id: str) -> list:
+        """Equivalent of `bd list --parent ID --json`."""
+        return self._issues(
+            "i.id IN (SELECT issue_id FROM dependencies WHERE depends_on_id = ? AND type = ?)",
+            (issue_id, PARENT_DEP_TYPE),
+        )
+
+    def parent(self, issue_id: str) -> Optional[dict]:
+        issue = self.issue(issue_id)
+        if not issue or not issue.get("parent"):
+            return None
+        return self.issue(issue["parent"])
+
+    def subtree(self, issue_id: str) -> list:
+        """Every descendant of an issue, via one recursive query over parent-child deps."""
+        return self._issues(
+            "i.id IN (SELECT id FROM subtree)",
+            (),
+            with_params=(issue_id, PARENT_DEP_TYPE, PARENT_DEP_TYPE),
+            with_clause=(
+                "WITH RECURSIVE subtree(id) AS ("
+                "SELECT issue_id FROM dependencies WHERE depends_on_id = ? AND type = ? "
+                "UNION SELECT d.issue_id FROM dependencies d JOIN subtree s ON d.depends_on_id = s.id "
+                "WHERE d.type = ?) "
+            ),
+        )
+
+    def ancestors(self, issue_id: str) -> list:
+        """Parent, grandparent, ... up to the root, via one recursive query. Empty if none."""
+        found = self._issues(
+            "i.id IN (SELECT id FROM chain)",
+            (),
+            with_params=(issue_id, PARENT_DEP_TYPE),
+            with_clause=(
+                "WITH RECURSIVE chain(id, depth) AS (SELECT ?, 0 "
+                "UNION SELECT d.depends_on_id, c.depth + 1 FROM dependencies d JOIN chain c ON d.issue_id = c.id "
+                f"WHERE d.type = ? AND c.depth < {MAX_DEPTH}) "
+            ),
+        )
+        return HierarchyIndex(found).ancestors(issue_id)
+
+    def hierarchy(self) -> list:
+        """Every visible issue as an IssueRecord with just id, status and parent (for rollup rebuilds)."""
+        rows = self._query(
+            "SELECT i.id, i.status, d.depends_on_id FROM issues i LEFT JOIN dependencies d "
+            "ON d.issue_id = i.id AND d.type = ? "
+            f"WHERE i.status NOT IN ({','.join('?' * len(HIDDEN_STATUSES))})",
+            (PARENT_DEP_TYPE,) + HIDDEN_STATUSES,
+        )
+        return [IssueRecord(issue_id, parent, status) for issue_id, status, parent in rows]
+
+    def blockers(self, issue_id: str) -> list:
+        """Equivalent of `bd dep list ID --type blocks --json`."""
+        rows = self._query(
+            "SELECT depends_on_id FROM dependencies WHERE issue_id = ? AND type = ? ORDER BY depends_on_id",
+            (issue_id, BLOCKS_DEP_TYPE),
+        )
+        return [{"id": row[0], "type": BLOCKS_DEP_TYPE} for row in rows]
+
+    def refresh(self):
+        """End the current snapshot; the next read starts a new one (use after our own writes)."""
+        if self._in_snapshot:
+            self._conn.execute("COMMIT")
+            self._in_snapshot = False
+
+    def close(self):
+        self._conn.close()
+
+
+def open_reader(project_root: Optional[str]) -> Optional[BeadsReader]:
+    """Open a read-only snapshot of the project's beads.db, or None to fall back to bd."""
+    if not project_root:
+        return None
+    db_path = database_path(project_root)
+    if not os.path.isfile(db_path) or not is_database_current(db_path, export_path(project_root)):
+        return None
+    conn = _connect_read_only(db_path)
+    if conn is None:
+        return None
+    reader = BeadsReader(conn)
+    try:
+        if reader.schema_supported():
+            return reader
+    except sqlite3.Error:
+        pass
+    conn.close()
+    return None
@@ -0,0 +1,174 @@
+"""
+In-memory parent -> children index over a Beads issue subtree.
+
+Lets the hooks answer whole-subtree questions (open descendants, cascade
+close order) from one load instead of one `bd list --parent` per node. The
+index can be built from any list of issue dicts that carry `id`, `status` and
+`parent`; helpers here parse the JSONL export format that `bd export` writes
+and `.beads/issues.jsonl` stores.
+
+Whole-graph loads keep each issue as an IssueRecord: just the id, parent,
+status, type label and blockers, with interned strings, instead of the full
+export dict (description, comments, timestamps, ...).
+"""
+
+import json
+import sys
+from typing import Iterable, Optional
+
+PARENT_DEP_TYPE = "parent-child"
+BLOCKS_DEP_TYPE = "blocks"
+TYPE_LABEL_PREFIX = "type:"
+
+
+class IssueRecord:
+    """The fields graph-wide checks read, in a few dozen bytes per issue.
+
+    Supports the read-only dict access the hooks use on bd JSON (`r["id"]`,
+    `r.get("status")`, `r.get("labels", [])`), so records and bd dicts mix.
+    `labels` only holds the type label; `blocked_by` is None when the source
+    did not include dependencies.
+    """
+
+    __slots__ = ("id", "parent", "status", "type", "blocked_by")
+    FIELDS = frozenset(__slots__) | {"labels"}
+
+    def __init__(
+        self,
+        issue_id: str,
+        parent: Optional[str] = None,
+        status: Optional[str] = None,
+        issue_type: Optional[str] = None,
+        blocked_by: Optional[Iterable[str]] = None,
+    ):
+        intern = sys.intern
+        self.id = intern(issue_id)
+        self.parent = intern(parent) if parent else None
+        self.status = intern(status or "open")
+        self.type = intern(issue_type) if issue_type else None
+        self.blocked_by = tuple(intern(b) for b in blocked_by) if blocked_by is not None else None
+
+    @classmethod
+    def from_issue(cls, issue: dict) -> "IssueRecord":
+        """Record for a bd/export issue dict (parent already resolved, e.g. by parse_jsonl_issue)."""
+        issue_type = next(
+            (l[len(TYPE_LABEL_PREFIX):] for l in issue.get("labels") or [] if l.startswith(TYPE_LABEL_PREFIX)), None
+        )
+        deps = issue.get("dependencies")
+        blocked_by = None
+        if isinstance(deps, list):
+            blocked_by = [d.get("depends_on_id") for d in deps if isinstance(d, dict) and d.get("type") == BLOCKS_DEP_TYPE]
+        return cls(issue["id"], issue.get("parent"), issue.get("status"), issue_type, blocked_by)
+
+    @property
+    def labels(self) -> list:
+        return [TYPE_LABEL_PREFIX + self.type] if self.type else []
+
+    def get(self, key: str, default=None):
+        if key not in self.FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IssueRecord):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"IssueRecord({self.id!r}, parent={self.parent!r}, status={self.status!r}, type={self.type!r})"
+
+
+def parse_jsonl_issue(line: str) -> Optional[dict]:
+    """Parse one export line into an issue dict with a resolved `parent` field."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        issue = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(issue, dict) or "id" not in issue:
+        return None
+    if not issue.get("parent"):
+        for dep in issue.get("dependencies") or []:
+            if dep.get("type") == PARENT_DEP_TYPE and dep.get("issue_id", issue["id"]) == issue["id"]:
+                issue["parent"] = dep.get("depends_on_id")
+                break
+    return issue
+
+
+def parse_jsonl(lines: Iterable[str], compact: bool = False) -> list:
+    """Parse export lines, skipping blanks, garbage and tombstones (as IssueRecords if compact)."""
+    issues = []
+    for line in lines:
+        issue = parse_jsonl_issue(line)
+        if issue and issue.get("status") != "tombstone":
+            issues.append(IssueRecord.from_issue(issue) if compact else issue)
+    return issues
+
+
+class HierarchyIndex:
+    """Parent -> children index over a set of issues (dicts or IssueRecords)."""
+
+    def __init__(self, issues: Iterable[dict]):
+        self.issues = {}  # issue_id -> issue dict
+        self._children = {}  # parent_id -> [child_id, ...]
+        for issue in issues:
+            self.issues[issue["id"]] = issue
+        for issue_id in sorted(self.issues):
+            parent_id = self.issues[issue_id].get("parent")
+            if parent_id:
+                self._children.setdefault(parent_id, []).append(issue_id)
+
+    def __contains__(self, issue_id: str) -> bool:
+        return issue_id in self.issues or issue_id in self._children
+
+    def children(self, issue_id: str) -> list:
+        """Direct children of an issue."""
+        return [self.issues[c] for c in self._children.get(issue_id, [])]
+
+    def descendants(self, issue_id: str) -> list:
+        """All descendants, each child before its own descendants (pre-order)."""
+        found = []
+        stack = list(reversed(self._children.get(issue_id, [])))
+        while stack:
+            child_id = stack.pop()
+            found.append(self.issues[child_id])
+            stack.extend(reversed(self._children.get(child_id, [])))
+        return found
+
+    def descendants_bottom_up(self, issue_id: str) -> list:
+        """All descendants, each child after its own descendants (post-order)."""
+        found = []
+        stack = [(c, False) for c in reversed(self._children.get(issue_id, []))]
+        while stack:
+            child_id, expanded = stack.pop()
+            if expanded:
+                found.append(self.issues[child_id])
+                continue
+            stack.append((child_id, True))
+            stack.extend((c, False) for c in reversed(self._children.get(child_id, [])))
+        return found
+
+    def open_descendants(self, issue_id: str) -> list:
+        return [d for d in self.descendants(issue_id) if d.get("status") != "closed"]
+
+    def ancestors(self, issue_id: str) -> list:
+        """Parent, grandparent, ... up to the topmost ancestor in the index (cycle-safe)."""
+        chain, seen = [], {issue_id}
+        issue = self.issues.get(issue_id)
+        while issue and issue.get("parent") and issue["parent"] not in seen:
+            seen.add(issue["parent"])
+            issue = self.issues.get(issue["parent"])
+            if issue:
+                chain.append(issue)
+        return chain
@@ -0,0 +1,238 @@
+"""
+Point lookups into the Beads JSONL export without parsing all of it.
+
+JsonlIndex mmaps `.beads/issues.jsonl` together with a sidecar index,
+`.beads/hooks/issues.jsonl.idx`, of fixed-width entries sorted by a 64-bit
+hash of the issue ID:
+
+  header   8s magic, Q inode, Q indexed size, Q mtime_ns, Q entry count,
+           I crc32 of the last TAIL_BYTES indexed bytes
+  entries  Q id hash, Q line offset, I line length (ascending hash)
+
+A lookup binary-searches the entries and decodes only the matching line. The
+index records which version of the export it covers. When the export has only
+grown since then (same inode, same bytes at the old end), the new lines are
+indexed and merged in. Any other change rebuilds the index. Later lines for the
+same ID replace earlier ones, as in an appended update.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import zlib
+from typing import Optional
+
+import beads_db
+from beads_hierarchy import parse_jsonl_issue
+
+MAGIC = b"BDJSONX1"
+HEADER = struct.Struct("<8sQQQQI")
+ENTRY = struct.Struct("<QQI")
+TAIL_BYTES = 4096
+_ID_PREFIX = re.compile(rb'\{\s*"id"\s*:\s*"([^"\\]*)"')  # Lines start with the ID: no full parse needed
+
+
+def id_hash(issue_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(issue_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def line_id(line: bytes) -> Optional[str]:
+    """The issue ID of one export line (bd writes `{"id":"...` first; anything else is parsed)."""
+    match = _ID_PREFIX.match(line)
+    if match:
+        return match.group(1).decode("utf-8", errors="replace")
+    try:
+        issue = json.loads(line)
+    except ValueError:
+        return None
+    return issue.get("id") if isinstance(issue, dict) and isinstance(issue.get("id"), str) else None
+
+
+def scan_lines(data, start: int, end: int) -> dict:
+    """{id: (offset, length)} for every complete line in data[start:end], later lines winning."""
+    found = {}
+    pos = start
+    while pos < end:
+        stop = data.find(b"\n", pos, end)
+        if stop < 0:
+            break  # Partial last line (export being written): index it once it is complete
+        if stop > pos:
+            issue_id = line_id(data[pos:stop])
+            if issue_id is not None:
+                found[issue_id] = (pos, stop - pos)
+        pos = stop + 1
+    return found
+
+
+def _tail_crc(data, size: int) -> int:
+    return zlib.crc32(data[max(0, size - TAIL_BYTES):size])
+
+
+class JsonlIndex:
+    """Issue lookups by ID over an mmapped JSONL export and its sidecar index."""
+
+    def __init__(self, jsonl_path: str, index_path: str):
+        self.jsonl_path = jsonl_path
+        self.index_path = index_path
+        self._data = self._index = None
+        self._signature = None  # (inode, size, mtime_ns) of the export the maps show
+        self._count = 0
+        self.rebuilds = self.extends = 0
+        self._load()
+
+    @classmethod
+    def open(cls, jsonl_path: str, index_path: str) -> Optional["JsonlIndex"]:
+        """Index for the export (building or extending the sidecar as needed), or None if unreadable."""
+        try:
+            return cls(jsonl_path, index_path)
+        except (OSError, ValueError):
+            return None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, issue_id: str) -> Optional[dict]:
+        """The export's issue dict for an ID (tombstones included), or None if absent."""
+        self._ensure_current()
+        if not self._count:
+            return None
+        wanted = id_hash(issue_id)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[0] < wanted:
+                lo = mid + 1
+            else:
+                hi = mid
+        while lo < self._count:
+            h, offset, length = self._entry(lo)
+            if h != wanted:
+                break
+            issue = parse_jsonl_issue(self._data[offset:offset + length].decode("utf-8", errors="replace"))
+            if issue and issue["id"] == issue_id:
+                return issue
+            lo += 1
+        return None
+
+    def close(self):
+        for m in (self._data, self._index):
+            if m is not None:
+                m.close()
+        self._data = self._index = None
+
+    # -------------------------------------------------------------------------
+
+    def _entry(self, i: int) -> tuple:
+        return ENTRY.unpack_from(self._index, HEADER.size + i * ENTRY.size)
+
+    def _ensure_current(self):
+        st = os.stat(self.jsonl_path)
+        if (st.st_ino, st.st_size, st.st_mtime_ns) != self._signature:
+            self.close()
+            self._load()
+
+    def _load(self):
+        with open(self.jsonl_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b""
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        header = self._read_header()
+        if header is None or header[1] != st.st_ino or header[2] > st.st_size or header[5] != _tail_crc(data, header[2]):
+            self._write(scan_lines(data, 0, st.st_size), signature, data)
+            self.rebuilds += 1
+        elif (header[2], header[3]) != (st.st_size, st.st_mtime_ns):
+            self._extend(header, data, signature)
+            self.extends += 1
+        self._data = data
+        self._signature = signature
+        self._open_index()
+
+    def _read_header(self) -> Optional[tuple]:
+        try:
+            with open(self.index_path, "rb") as f:
+                header = HEADER.unpack(f.read(HEADER.size))
+        except (OSError, struct.error):
+            return None
+        return header if header[0] == MAGIC else None
+
+    def _open_index(self):
+        with open(self.index_path, "rb") as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = HEADER.unpack_from(self._index)[4]
+
+    def _extend(self, header: tuple, data, signature: tuple):
+        """Merge lines appended since the index was written (complete lines only).
+
+        Splices the new entries into the sorted table instead of re-sorting it,
+        dropping entries whose ID an appended line supersedes.
+        """
+        with open(self.index_path, "rb") as f:
+            raw = f.read()
+        count = header[4]
+        hash_at = lambda i: ENTRY.unpack_from(raw, HEADER.size + i * ENTRY.size)[0]  # noqa: E731
+        removed, inserts = set(), []
+        for issue_id, (offset, length) in scan_lines(data, header[2], signature[1]).items():
+            h = id_hash(issue_id)
+            lo, hi = 0, count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if hash_at(mid) < h:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            i = lo
+            while i < count and hash_at(i) == h:
+                _, old_offset, old_length = ENTRY.unpack_from(raw, HEADER.size + i * ENTRY.size)
+                if line_id(data[old_offset:old_offset + old_length]) == issue_id:
+                    removed.add(i)  # Superseded by the appended line
+                i += 1
+            inserts.append((lo, ENTRY.pack(h, offset, length)))
+        parts, pos = [], 0
+        for at, packed in sorted(inserts):
+            parts.append(self._entries_between(raw, pos, at, removed))
+            parts.append(packed)
+            pos = at
+        parts.append(self._entries_between(raw, pos, count, removed))
+        last_complete = data.rfind(b"\n", 0, signature[1]) + 1
+        self._write_table(b"".join(parts), count - len(removed) + len(inserts), (signature[0], last_complete, signature[2]), data)
+
+    @staticmethod
+    def _entries_between(raw: bytes, start: int, stop: int, removed: set) -> bytes:
+        """Packed entries start..stop-1 of an index file, minus the removed ones."""
+        if not any(start <= i < stop for i in removed):
+            return raw[HEADER.size + start * ENTRY.size:HEADER.size + stop * ENTRY.size]
+        return b"".join(
+            raw[HEADER.size + i * ENTRY.size:HEADER.size + (i + 1) * ENTRY.size] for i in range(start, stop) if i not in removed
+        )
+
+    def _write(self, found: dict, signature: tuple, data):
+        entries = sorted((id_hash(issue_id), offset, length) for issue_id, (offset, length) in found.items())
+        last_complete = data.rfind(b"\n", 0, signature[1]) + 1 if signature[1] else 0
+        self._write_entries(entries, (signature[0], last_complete, signature[2]), data)
+
+    def _write_entries(self, entries: list, covered: tuple, data):
+        self._write_table(b"".join(ENTRY.pack(*entry) for entry in entries), len(entries), covered, data)
+
+    def _write_table(self, table: bytes, count: int, covered: tuple, data):
+        """Atomically replace the sidecar; `covered` is (inode, indexed size, mtime_ns)."""
+        inode, size, mtime_ns = covered
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, inode, size, mtime_ns, count, _tail_crc(data, size)))
+            f.write(table)
+        os.replace(tmp, self.index_path)
+
+
+def open_export_index(project_root: str) -> Optional[JsonlIndex]:
+    """JsonlIndex over the project's export, with its sidecar in .beads/hooks/."""
+    jsonl_path = beads_db.export_path(project_root)
+    if not os.path.isfile(jsonl_path):
+        return None
+    try:
+        index_path = os.path.join(beads_db.hooks_dir(project_root), os.path.basename(jsonl_path) + ".idx")
+    except OSError:
+        return None
+    return JsonlIndex.open(jsonl_path, index_path)
@@ -0,0 +1,146 @@
+"""
+Change detection for the Beads files behind cached hook state.
+
+A long-lived process (hook_server.py) keeps issue reads in memory between hook
+runs; before each run it asks a watcher whether beads.db, its WAL or
+issues.jsonl changed (`bd sync`, `git pull`, another agent, our own writes).
+Only then does it drop the cached reads.
+
+On Linux the watcher uses inotify (through ctypes, no extra dependency) on the
+files' directories, so an unchanged project costs one non-blocking read. Where
+inotify is unavailable it compares (inode, size, mtime_ns) of each file.
+BD_HOOKS_WATCH=poll forces polling; =off disables the warm cache entirely.
+"""
+
+import os
+import struct
+import sys
+from typing import Optional
+
+WATCH_MODE = os.environ.get("BD_HOOKS_WATCH", "auto")  # auto, inotify, poll or off
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+FILE_EVENTS = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+SELF_EVENTS = IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED | IN_Q_OVERFLOW
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def file_signature(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class PollingWatcher:
+    """Detects changes by comparing each file's (inode, size, mtime_ns) with the last call."""
+
+    def __init__(self, paths: list):
+        self.paths = list(paths)
+        self._seen = {path: file_signature(path) for path in self.paths}
+
+    def changed(self) -> set:
+        """Paths that changed since the previous call (or since the watcher was created)."""
+        changed = set()
+        for path in self.paths:
+            signature = file_signature(path)
+            if signature != self._seen[path]:
+                self._seen[path] = signature
+                changed.add(path)
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Detects changes from inotify events on the files' directories."""
+
+    def __init__(self, paths: list, libc):
+        self.paths = list(paths)
+        self._libc = libc
+        self._by_dir = {}  # directory -> {basename: path}
+        for path in self.paths:
+            self._by_dir.setdefault(os.path.dirname(path), {})[os.path.basename(path)] = path
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError("inotify_init1 failed")
+        self._watches = {}  # wd -> directory
+        self._lost = False  # A watch went away: report everything until re-added
+        for directory in self._by_dir:
+            self._add(directory)
+
+    def _add(self, directory: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), FILE_EVENTS | SELF_EVENTS)
+        if wd < 0:
+            self._lost = True
+        else:
+            self._watches[wd] = directory
+
+    def changed(self) -> set:
+        changed = set()
+        while True:
+            try:
+                buf = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(buf, offset)
+                name = buf[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += _EVENT_HEADER.size + length
+                if mask & SELF_EVENTS:
+                    self._lost = True  # Directory moved/replaced, or events dropped
+                    if wd in self._watches and not mask & IN_IGNORED:
+                        self._libc.inotify_rm_watch(self._fd, wd)
+                    self._watches.pop(wd, None)  # Re-added by path below
+                    continue
+                path = self._by_dir.get(self._watches.get(wd), {}).get(os.fsdecode(name))
+                if path is not None:
+                    changed.add(path)
+        if self._lost:
+            self._lost = False
+            for directory in set(self._by_dir) - set(self._watches.values()):
+                self._add(directory)
+            return set(self.paths)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def _libc():
+    import ctypes
+    import ctypes.util
+
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    libc.inotify_init1  # AttributeError where there is no inotify
+    return libc
+
+
+def open_watcher(paths: list, mode: str = WATCH_MODE):
+    """A watcher for `paths` (inotify when possible), or None when watching is off."""
+    if mode == "off":
+        return None
+    if mode != "poll" and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths, _libc())
+        except (OSError, AttributeError):
+            if mode == "inotify":
+                raise
+    return PollingWatcher(paths)
@@ -0,0 +1,91 @@
+"""
+Graph of `blocks` dependencies between issues, for the hook's blocking checks.
+
+An edge X -> Y means X blocks Y (`bd dep X --blocks Y`, stored by bd as Y
+depending on X). BlocksGraph keeps, per issue, the set of issues blocking it,
+filled lazily from a fetch function (one direct query or `bd dep list` per
+issue, each at most once). Queries only touch the edges they walk:
+
+  has_blockers(Y)               does anything block Y?
+  transitive_blockers(Y)        everything Y waits on, directly or not
+  would_create_cycle(X, Y)      does X already wait on Y (so X --blocks Y closes a loop)?
+
+PostToolUse folds the bd dep/delete commands it sees into the graph with
+add_edge(), remove_edge() and remove_issue(), so a long-lived store never
+re-reads edges it already knows changed.
+"""
+
+from collections import deque
+from typing import Callable, Iterable, Optional
+
+
+class BlocksGraph:
+    """Lazily loaded `blocks` edges, stored as issue -> set of its direct blockers."""
+
+    def __init__(self, fetch_blockers: Callable[[str], Iterable[str]]):
+        self._fetch = fetch_blockers
+        self._blocked_by = {}  # issue_id -> set of blocker ids (only issues looked up so far)
+
+    def blockers(self, issue_id: str) -> set:
+        """Direct blockers of an issue."""
+        found = self._blocked_by.get(issue_id)
+        if found is None:
+            found = set(self._fetch(issue_id))
+            self._blocked_by[issue_id] = found
+        return found
+
+    def has_blockers(self, issue_id: str) -> bool:
+        return bool(self.blockers(issue_id))
+
+    def transitive_blockers(self, issue_id: str) -> list:
+        """Every issue that blocks this one directly or through others, nearest first."""
+        return [node for node, _ in self._walk(issue_id)]
+
+    def blocking_path(self, source: str, target: str) -> Optional[list]:
+        """[source, ..., target] following blocked-by edges if source waits on target, else None."""
+        if source == target:
+            return [source]
+        via = {}
+        for node, parent in self._walk(source):
+            via[node] = parent
+            if node == target:
+                path = [node]
+                while path[-1] != source:
+                    path.append(via[path[-1]])
+                return list(reversed(path))
+        return None
+
+    def would_create_cycle(self, blocker: str, blocked: str) -> bool:
+        """True if adding `blocker --blocks blocked` would close a loop (including blocker == blocked)."""
+        return self.blocking_path(blocker, blocked) is not None
+
+    def _walk(self, issue_id: str):
+        """Breadth-first (node, reached_from) over blocked-by edges, each node once."""
+        seen = {issue_id}
+        queue = deque([issue_id])
+        while queue:
+            current = queue.popleft()
+            for blocker in sorted(self.blockers(current)):
+                if blocker not in seen:
+                    seen.add(blocker)
+                    queue.append(blocker)
+                    yield blocker, current
+
+    # -- updates from observed commands --------------------------------------
+
+    def add_edge(self, blocker: str, blocked: str):
+        if blocked in self._blocked_by:  # Otherwise the next lookup fetches it, edge included
+            self._blocked_by[blocked].add(blocker)
+
+    def remove_edge(self, blocker: str, blocked: str):
+        self._blocked_by.get(blocked, set()).discard(blocker)
+
+    def remove_issue(self, issue_id: str):
+        """Drop a deleted issue and every edge to or from it."""
+        self._blocked_by.pop(issue_id, None)
+        for blockers in self._blocked_by.values():
+            blockers.discard(issue_id)
+
+    def forget(self, issue_id: str):
+        """Re-fetch this issue's blockers on next use (its data changed in ways we did not see)."""
+        self._blocked_by.pop(issue_id, None)
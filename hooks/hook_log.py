@@ -0,0 +1,147 @@
+"""
+Shared structured log for the hooks.
+
+Records are level-gated (BD_HOOKS_LOG_LEVEL, default "warning"), debug/info
+records can be sampled (BD_HOOKS_LOG_SAMPLE, 0..1), and string fields longer
+than BD_HOOKS_LOG_MAX_FIELD characters are truncated. A run's records are
+buffered in memory and appended in one write when the process exits (or on
+flush()), as ASCII-only compact JSON lines:
+
+  {"ts":1760000000.123,"pid":4242,"level":"info","source":"check_system_temp",
+   "msg":"blocked","command":"ffmpeg -i a.mkv /tmp/x.mkv"}
+
+The file is <project>/.beads/hooks/hooks.jsonl, found from the hook's cwd, or
+BD_HOOKS_LOG_DIR/hooks.jsonl when that is set; outside a Beads project with no
+directory configured, records are dropped. Past BD_HOOKS_LOG_MAX_BYTES the file
+rotates to hooks.jsonl.1 .. hooks.jsonl.3.
+
+Logging must never change a hook verdict: every I/O error is swallowed.
+"""
+
+import atexit
+import json
+import os
+import time
+from typing import Optional
+
+LOG_FILE = "hooks.jsonl"
+BACKUPS = 3
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40, "off": 100}
+
+LEVEL = LEVELS.get(os.environ.get("BD_HOOKS_LOG_LEVEL", "warning").lower(), LEVELS["warning"])
+SAMPLE = float(os.environ.get("BD_HOOKS_LOG_SAMPLE", "1"))  # Fraction of debug/info records kept
+LOG_DIR = os.environ.get("BD_HOOKS_LOG_DIR")
+MAX_BYTES = int(os.environ.get("BD_HOOKS_LOG_MAX_BYTES", str(1024 * 1024)))
+MAX_FIELD = int(os.environ.get("BD_HOOKS_LOG_MAX_FIELD", "512"))
+
+_buffer = []  # Encoded lines waiting for flush()
+_cwd = None  # Where to look for the project's .beads when flushing
+_registered = False
+
+
+def enabled(level: str) -> bool:
+    """Cheap check before building fields for a record."""
+    return LEVELS[level] >= LEVEL
+
+
+def set_cwd(cwd: Optional[str]):
+    """Directory the hook runs in; the log goes to the .beads above it."""
+    global _cwd
+    _cwd = cwd
+
+
+def log(level: str, source: str, msg: str, **fields):
+    """Buffer one record if `level` passes the gate (and the sample, below warning)."""
+    if LEVELS[level] < LEVEL:
+        return
+    if LEVELS[level] < LEVELS["warning"] and SAMPLE < 1:
+        import random
+
+        if random.random() >= SAMPLE:
+            return
+    global _registered
+    record = {"ts": round(time.time(), 3), "pid": os.getpid(), "level": level, "source": source, "msg": msg}
+    for key, value in fields.items():
+        record[key] = truncate(value) if isinstance(value, str) else value
+    _buffer.append(json.dumps(record, separators=(",", ":"), default=str))
+    if not _registered:
+        _registered = True
+        atexit.register(flush)
+
+
+def truncate(text: str, limit: int = MAX_FIELD) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}...[+{len(text) - limit} chars]"
+
+
+def log_path() -> Optional[str]:
+    if LOG_DIR:
+        return os.path.join(LOG_DIR, LOG_FILE)
+    current = os.path.abspath(_cwd or os.getcwd())
+    while True:
+        if os.path.isdir(os.path.join(current, ".beads")):
+            import beads_db
+
+            return os.path.join(beads_db.hooks_dir(current), LOG_FILE)
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def flush():
+    """Append buffered records in one write, rotating the file if it grew past MAX_BYTES."""
+    if not _buffer:
+        return
+    data = ("\n".join(_buffer) + "\n").encode("ascii")  # json.dumps escapes everything else
+    _buffer.clear()
+    try:
+        path = log_path()
+        if path is None:
+            return
+        if LOG_DIR:
+            os.makedirs(LOG_DIR, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            if os.fstat(fd).st_size > MAX_BYTES:
+                _rotate(fd, path)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def rotate_if_full(path: str, max_bytes: int = MAX_BYTES):
+    """Rotate another of the hooks' append-only logs like this one, once it is past max_bytes."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        if os.fstat(fd).st_size > max_bytes:
+            _rotate(fd, path)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _rotate(fd: int, path: str):
+    """Shift path -> path.1 -> ... -> path.BACKUPS, unless another process is already at it."""
+    import fcntl
+
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return
+    try:
+        if os.stat(path).st_ino != os.fstat(fd).st_ino:
+            return  # Rotated by someone else since we opened it
+        for n in range(BACKUPS - 1, 0, -1):
+            if os.path.exists(f"{path}.{n}"):
+                os.replace(f"{path}.{n}", f"{path}.{n + 1}")
+        os.replace(path, f"{path}.1")
+    except OSError:
+        pass
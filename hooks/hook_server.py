@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Long-lived server for bash_hooks.py.
+
+Keeps the hook module imported (compiled rules, cached project roots) in one
+process and answers hook runs over a Unix socket, so each Bash tool call only
+pays for the thin client in bash_hooks.main(). Issue reads also stay cached
+across runs: each project's cache is invalidated per issue when its Beads
+files change (see beads_watch.py). When this server is not running
+the client evaluates the hook in-process, so starting it is purely an
+optimization.
+
+Usage:
+  python3 hook_server.py [--socket PATH]
+
+The socket defaults to $BD_HOOKS_SOCKET, else $XDG_RUNTIME_DIR/bash_hooks.sock,
+else ~/.claude/bash_hooks.sock. A second server refuses to start (exit 1) while
+one answers on that socket. The server exits when any hook source in this
+directory changes on disk; the next hook run falls back to in-process evaluation
+until it is restarted.
+
+Runs for different projects are evaluated concurrently: the accepting process
+reads each payload, finds its project and hands the connection to that
+project's worker process (forked on first use, so it starts with the modules
+already imported). A worker evaluates its project's runs one at a time, which
+is what keeps a project's warm store and rollup counters consistent. A run
+whose client has hung up, or that has waited so long for its worker that the
+client would give up before the run could finish, is dropped unanswered; the
+client then evaluates in-process, and the run is not done twice.
+"""
+
+import contextlib
+import glob
+import io
+import json
+import os
+import select
+import signal
+import socket
+import struct
+import sys
+import tempfile
+import time
+import traceback
+
+import bash_hooks
+
+READ_TIMEOUT = 2.0  # Seconds a client gets to send its payload (it sends it right after connecting)
+HANDOFF = struct.Struct("!d")  # Accept time (time.monotonic()), sent with the connection and payload fds
+
+_WATCHED_SOURCES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py")))
+
+
+def source_mtimes() -> list:
+    """Modification times of the hook sources this process has loaded."""
+    mtimes = []
+    for path in _WATCHED_SOURCES:
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return mtimes
+
+
+def read_request(conn: socket.socket) -> bytes:
+    """Read the client payload until it shuts down its write side."""
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def run_request(stdin_data: bytes) -> bytes:
+    """Evaluate one hook run and encode the reply (exit code line + stderr bytes)."""
+    stderr = io.StringIO()
+    with contextlib.redirect_stderr(stderr):
+        try:
+            code = bash_hooks.evaluate(stdin_data.decode("utf-8", errors="replace"))
+        except Exception:
+            traceback.print_exc()
+            code = 1
+    return f"{code}\n".encode() + stderr.getvalue().encode("utf-8", errors="replace")
+
+
+def project_key(payload: bytes) -> str:
+    """Which worker evaluates this payload: its project root, else its cwd ("" if unreadable)."""
+    try:
+        cwd = json.loads(payload).get("cwd") or ""
+    except (ValueError, AttributeError):
+        return ""
+    if not isinstance(cwd, str) or not cwd:
+        return ""
+    return bash_hooks.find_project_root_cached(cwd) or cwd
+
+
+def client_gone(conn: socket.socket) -> bool:
+    """True if the client closed its end (it timed out and is evaluating on its own)."""
+    poller = select.poll()
+    poller.register(conn, select.POLLHUP)  # Its half-close after sending only sets POLLIN
+    return any(events & (select.POLLHUP | select.POLLERR) for _, events in poller.poll(0))
+
+
+def _recv_exactly(channel: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = channel.recv(size - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+def run_worker(channel: socket.socket):
+    """Body of a project worker: evaluate the runs handed over on `channel`, in order."""
+    bash_hooks.WARM_STORES = True
+    while True:
+        try:
+            head, fds, _, _ = socket.recv_fds(channel, HANDOFF.size, 2)
+            if not head or len(fds) != 2:
+                return  # The server closed the channel
+            (accepted,) = HANDOFF.unpack(head + _recv_exactly(channel, HANDOFF.size - len(head)))
+            with os.fdopen(fds[1], "rb") as spool:
+                payload = spool.read()
+        except (OSError, EOFError):
+            return
+        with socket.socket(fileno=fds[0]) as conn:
+            waited = time.monotonic() - accepted
+            if client_gone(conn) or (
+                bash_hooks.HOOK_BUDGET > 0 and waited + bash_hooks.HOOK_BUDGET > bash_hooks.HOOK_SERVER_TIMEOUT
+            ):
+                continue  # Unanswered: the client evaluates (or already has) in-process
+            conn.settimeout(bash_hooks.HOOK_SERVER_TIMEOUT)
+            reply = run_request(payload)
+            with contextlib.suppress(OSError):
+                conn.sendall(reply)  # A client that gave up meanwhile has its own verdict
+
+
+class Workers:
+    """One forked worker process per project, started on first use and restarted if it died."""
+
+    def __init__(self, server: socket.socket):
+        self.server = server
+        self.workers = {}  # project key -> (pid, channel)
+
+    def hand_off(self, key: str, conn: socket.socket, accepted: float, payload: bytes):
+        """Queue a run with the project's worker.
+
+        The payload travels as an unlinked temp file, so a busy worker never
+        leaves the server blocked on a full channel.
+        """
+        with tempfile.TemporaryFile() as spool:
+            spool.write(payload)
+            spool.flush()
+            spool.seek(0)  # The worker reads through the same file offset
+            for _ in range(2):  # A worker that died is replaced once
+                _, channel = self.workers.get(key) or self.start(key, (conn, spool))
+                try:
+                    socket.send_fds(channel, [HANDOFF.pack(accepted)], [conn.fileno(), spool.fileno()])
+                    return
+                except OSError:
+                    self.stop(key)
+
+    def start(self, key: str, inherited: tuple) -> tuple:
+        """Fork a worker for `key`.
+
+        `inherited` are open files the child must not keep; an extra copy of
+        the client connection would hold off the client's EOF.
+        """
+        parent_end, child_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                for inherited_file in (self.server, parent_end, *inherited):
+                    inherited_file.close()
+                for _, other in self.workers.values():
+                    other.close()
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_IGN)  # On Ctrl-C the server closes our channel instead
+                run_worker(child_end)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        child_end.close()
+        self.workers[key] = (pid, parent_end)
+        return self.workers[key]
+
+    def stop(self, key: str):
+        _, channel = self.workers.pop(key)
+        channel.close()  # The worker exits once it has answered the runs already handed to it
+        self.reap()
+
+    def reap(self):
+        """Collect exited workers so none is left a zombie."""
+        with contextlib.suppress(ChildProcessError):
+            while os.waitpid(-1, os.WNOHANG)[0] > 0:
+                pass
+
+    def close(self):
+        """Let every worker finish the runs it has (killing one mid-run would make its client redo it)."""
+        for key in list(self.workers):
+            self.stop(key)
+
+
+def serve(socket_path: str):
+    """Accept hook runs and hand them to per-project workers until the sources change or we are signalled.
+
+    Returns 1 without serving if another server already answers on the socket.
+    """
+    if socket_answers(socket_path):
+        print(f"hook_server: another server is listening on {socket_path}", file=sys.stderr)
+        return 1
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)  # Stale socket from a previous server
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen(64)
+
+    def shutdown(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    workers = Workers(server)
+    loaded = source_mtimes()
+    try:
+        while True:
+            conn, _ = server.accept()
+            accepted = time.monotonic()
+            with conn:
+                if source_mtimes() != loaded:
+                    # Hook code changed: drop the request unanswered so the
+                    # client evaluates it with the new code, then exit.
+                    print("hook_server: sources changed, exiting", file=sys.stderr)
+                    break
+                conn.settimeout(READ_TIMEOUT)
+                try:
+                    payload = read_request(conn)
+                except OSError:
+                    continue  # Client gave up; it falls back on its own
+                if not payload:
+                    continue  # A probe from socket_answers(), or a client that sent nothing
+                workers.hand_off(project_key(payload), conn, accepted, payload)
+            workers.reap()
+    finally:
+        workers.close()
+        server.close()
+        with contextlib.suppress(OSError):
+            os.unlink(socket_path)
+    return 0
+
+
+def socket_answers(socket_path: str) -> bool:
+    """True if a server accepts connections on the socket (a leftover file from a dead one refuses)."""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    probe.settimeout(READ_TIMEOUT)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+def main():
+    socket_path = bash_hooks.HOOK_SERVER_SOCKET
+    args = sys.argv[1:]
+    if args[:1] == ["--socket"] and len(args) == 2:
+        socket_path = args[1]
+    elif args:
+        print("Usage: hook_server.py [--socket PATH]", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(serve(socket_path))
+
+
+if __name__ == "__main__":
+    main()
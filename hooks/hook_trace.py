@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Opt-in structured tracing for bash_hooks.py runs.
+
+Set BD_HOOKS_TRACE=/path/to/trace.jsonl to append one JSON line per hook run:
+
+  {"ts": ..., "pid": ..., "event": "PreToolUse", "verb": "close", "verdict": 2,
+   "duration_ms": 41.2,
+   "rules": [{"name": "bd_command_guard", "duration_ms": 3.1}, ...],
+   "bd_calls": [{"args": [...], "rule": "status_propagation", "exit_code": 0,
+                 "duration_ms": 12.5, "bytes_out": 812, "timed_out": false}, ...],
+   "skipped": [{"rule": "post_tool_use", "policy": "fail_open"}]}
+
+"skipped" is only present when the run's time budget cut a rule short.
+
+Tracing is off unless the variable is set; the hooks then pay one attribute
+check per span.
+
+Summarize a trace file (p50/p95/p99 latency per event/verb and per rule, bd
+call counts and redundant calls per rule, rules cut short by the budget):
+
+  python3 hook_trace.py summarize /path/to/trace.jsonl
+"""
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+from typing import Optional
+
+TRACE_PATH = os.environ.get("BD_HOOKS_TRACE")
+
+_run = None  # Span dict for the hook run in progress, or None when not tracing
+_rule = None  # Name of the rule currently executing (rules run one at a time)
+_lock = threading.Lock()  # bd calls may be recorded from fan_out() worker threads
+
+
+def enabled() -> bool:
+    return _run is not None
+
+
+def begin_run():
+    """Start the span for one hook run (no-op unless BD_HOOKS_TRACE is set)."""
+    global _run, _rule
+    _rule = None
+    _run = {"start": time.perf_counter(), "rules": [], "bd_calls": []} if TRACE_PATH else None
+
+
+def end_run(event: Optional[str], verb: Optional[str], verdict: Optional[int]):
+    """Close the run span and append it to the trace file."""
+    global _run
+    if _run is None:
+        return
+    run, _run = _run, None
+    record = {
+        "ts": round(time.time(), 3),
+        "pid": os.getpid(),
+        "event": event,
+        "verb": verb,
+        "verdict": verdict,
+        "duration_ms": _ms_since(run.pop("start")),
+        **run,
+    }
+    try:
+        with open(TRACE_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    except OSError:
+        pass  # Tracing must never change a hook verdict
+
+
+class _RuleSpan:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        global _rule
+        self.outer = _rule
+        _rule = self.name
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        global _rule
+        _rule = self.outer
+        if _run is not None:
+            _run["rules"].append({"name": self.name, "duration_ms": _ms_since(self.start)})
+        return False
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def rule(name: str):
+    """Context manager timing one validation/propagation rule."""
+    return _RuleSpan(name) if _run is not None else _NO_SPAN
+
+
+def record_bd_call(args: list, exit_code: int, started: float, bytes_out: int, timed_out: bool):
+    """Record one bd invocation as a child span of the current rule."""
+    if _run is None:
+        return
+    span = {
+        "args": list(args),
+        "rule": _rule,
+        "exit_code": exit_code,
+        "duration_ms": _ms_since(started),
+        "bytes_out": bytes_out,
+        "timed_out": timed_out,
+    }
+    with _lock:
+        _run["bd_calls"].append(span)
+
+
+def record_skip(rule_name: str, policy: str):
+    """Record a rule the time budget cut short, and the verdict policy applied."""
+    if _run is not None:
+        _run.setdefault("skipped", []).append({"rule": rule_name, "policy": policy})
+
+
+def _ms_since(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+# =============================================================================
+# SUMMARIZER
+# =============================================================================
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _latency(values: list) -> dict:
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+    }
+
+
+def summarize(records: list) -> dict:
+    by_run, by_rule, calls, skipped = {}, {}, {}, {}
+    for record in records:
+        key = f"{record.get('event')} {record.get('verb') or '-'}"
+        by_run.setdefault(key, []).append(record.get("duration_ms", 0.0))
+        for span in record.get("rules", []):
+            by_rule.setdefault(span["name"], []).append(span["duration_ms"])
+        for skip in record.get("skipped", []):
+            counts = skipped.setdefault(skip["rule"], {})
+            counts[skip["policy"]] = counts.get(skip["policy"], 0) + 1
+        seen = set()
+        for call in record.get("bd_calls", []):
+            stats = calls.setdefault(call.get("rule") or "-", {"calls": 0, "redundant": 0, "timeouts": 0, "ms": []})
+            stats["calls"] += 1
+            stats["timeouts"] += bool(call.get("timed_out"))
+            stats["ms"].append(call.get("duration_ms", 0.0))
+            args = tuple(call.get("args", []))
+            if args in seen:
+                stats["redundant"] += 1  # Same bd call already made earlier in this run
+            seen.add(args)
+    return {
+        "runs": {key: _latency(v) for key, v in sorted(by_run.items())},
+        "rules": {name: _latency(v) for name, v in sorted(by_rule.items())},
+        "bd_calls": {
+            name: {
+                "calls": s["calls"],
+                "redundant": s["redundant"],
+                "timeouts": s["timeouts"],
+                **{k: v for k, v in _latency(s["ms"]).items() if k != "count"},
+            }
+            for name, s in sorted(calls.items())
+        },
+        "skipped": dict(sorted(skipped.items())),
+    }
+
+
+def load(path: str) -> list:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # Torn line from a concurrent writer
+    return records
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] != "summarize":
+        print("Usage: hook_trace.py summarize TRACE.jsonl", file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps(summarize(load(sys.argv[2])), indent=2))
+
+
+if __name__ == "__main__":
+    main()
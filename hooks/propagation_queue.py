@@ -0,0 +1,185 @@
+"""
+Durable per-project queue of status propagation jobs for bash_hooks.py.
+
+PreToolUse decides the verdict and which propagation a command triggers, then
+appends a job here and starts a detached worker (`bash_hooks.py --drain-queue
+ROOT`). The worker applies jobs strictly in the order they were queued, so
+propagation within an issue tree happens in command order. Only one worker per
+project runs at a time; a worker keeps draining until the queue stays empty.
+If no worker can be started, the hook takes its own job back out (withdraw())
+and applies it inline; jobs already waiting stay for the next worker.
+
+Layout, under <project>/.beads/hooks/ (ignored by git):
+
+  queue.jsonl             jobs waiting for a worker, one JSON object per line
+  queue.processing.jsonl  jobs a worker has claimed (re-run if it crashed)
+  worker.lock             held by the running worker
+  propagation.log         worker output: what each job changed or failed to
+                          (rotated like hooks.jsonl, to propagation.log.1 .. .3)
+
+Jobs left claimed by a worker that crashed are handed to the next worker with
+"replayed": true. They are not blindly re-run: the handler re-checks current
+state first, since a replay could otherwise undo changes made in the meantime.
+"""
+
+import fcntl
+import json
+import os
+import sys
+import time
+from typing import Callable, Optional
+
+import beads_db
+import hook_log
+
+QUEUE_FILE = "queue.jsonl"
+PROCESSING_FILE = "queue.processing.jsonl"
+LOCK_FILE = "worker.lock"
+LOG_FILE = "propagation.log"
+
+
+def queue_dir(project_root: str) -> str:
+    return beads_db.hooks_dir(project_root)
+
+
+def log_path(project_root: str) -> str:
+    return os.path.join(queue_dir(project_root), LOG_FILE)
+
+
+def _locked_queue(project_root: str, mode: str):
+    """Open queue.jsonl exclusively locked, retrying if a worker claims the file meanwhile."""
+    path = os.path.join(queue_dir(project_root), QUEUE_FILE)
+    while True:
+        f = open(path, mode, encoding="utf-8")
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                return f
+        except FileNotFoundError:
+            pass
+        f.close()  # A worker claimed this file between our open and lock
+
+
+def enqueue(project_root: str, job: dict) -> Optional[dict]:
+    """Append a job to the project's queue. Returns the job as stored, or None if it could not be."""
+    job = {**job, "queued_at": round(time.time(), 3)}
+    try:
+        with _locked_queue(project_root, "a") as f:
+            f.write(_line(job))
+            f.flush()
+    except OSError:
+        return None
+    return job
+
+
+def withdraw(project_root: str, job: dict) -> bool:
+    """Take a job enqueue() stored back out of the queue. False if a worker has already claimed it."""
+    try:
+        with _locked_queue(project_root, "a+") as f:
+            f.seek(0)
+            lines = f.readlines()
+            if _line(job) not in lines:
+                return False
+            lines.reverse()
+            lines.remove(_line(job))  # Our own append: the last copy
+            lines.reverse()
+            f.seek(0)
+            f.truncate()
+            f.writelines(lines)
+            f.flush()
+    except OSError:
+        return False
+    return True
+
+
+def _line(job: dict) -> str:
+    return json.dumps(job, separators=(",", ":")) + "\n"
+
+
+def _claim(directory: str) -> list:
+    """Take every queued job (a crashed worker's claimed jobs first, marked "replayed")."""
+    processing = os.path.join(directory, PROCESSING_FILE)
+    replayed = os.path.exists(processing)
+    if not replayed:
+        path = os.path.join(directory, QUEUE_FILE)
+        try:
+            with open(path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)  # Wait out an in-flight append
+                if os.fstat(f.fileno()).st_size == 0:
+                    return []
+                os.rename(path, processing)
+        except FileNotFoundError:
+            return []
+    jobs = []
+    with open(processing, encoding="utf-8") as f:
+        for line in f:
+            try:
+                job = json.loads(line)
+            except ValueError:
+                continue  # Torn line from a killed writer
+            if replayed:
+                job["replayed"] = True
+            jobs.append(job)
+    return jobs
+
+
+def pending(project_root: str) -> bool:
+    directory = os.path.join(project_root, beads_db.HOOKS_DIRNAME)
+    for name in (QUEUE_FILE, PROCESSING_FILE):
+        try:
+            if os.path.getsize(os.path.join(directory, name)) > 0:
+                return True
+        except OSError:
+            pass
+    return False
+
+
+def drain(project_root: str, handle: Callable[[dict], None]) -> int:
+    """Run queued jobs in order until the queue is empty. Returns the number handled.
+
+    Returns immediately if another worker holds the lock; that worker re-checks
+    the queue after releasing it, so no job is stranded.
+    """
+    directory = queue_dir(project_root)
+    handled = 0
+    while True:
+        with open(os.path.join(directory, LOCK_FILE), "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return handled
+            while True:
+                jobs = _claim(directory)
+                if not jobs:
+                    break
+                for job in jobs:
+                    try:
+                        handle(job)
+                    except Exception as e:  # One bad job must not strand the rest
+                        print(f"ERROR: propagation job {job} failed: {e}", file=sys.stderr)
+                    handled += 1
+                os.unlink(os.path.join(directory, PROCESSING_FILE))
+        if not pending(project_root):
+            return handled
+
+
+def spawn_worker(project_root: str, script: str) -> Optional[int]:
+    """Start a detached `script --drain-queue ROOT`. Returns its pid, or None if it could not start."""
+    import subprocess
+
+    try:
+        path = log_path(project_root)
+        hook_log.rotate_if_full(path)
+        with open(path, "a") as log:
+            proc = subprocess.Popen(
+                [sys.executable, script, "--drain-queue", project_root],
+                cwd=project_root,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                start_new_session=True,
+                close_fds=True,
+            )
+    except OSError:
+        return None
+    return proc.pid
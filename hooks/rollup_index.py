@@ -0,0 +1,245 @@
+"""
+Materialized per-issue rollup counters for the hooks.
+
+For every issue, keeps how many of its children and of its descendants are in
+each status, so "does X have open descendants?" and "is any sibling of X
+blocked?" are single indexed lookups instead of a tree walk. The index lives in
+.beads/hooks/rollups.db (SQLite, ignored by git) next to the data it mirrors.
+
+Freshness: the index stores the source_signature() of the Beads data it was
+built from, which follows the issues' content (counts and checksums of every
+issue's status and every parent link) rather than the database files, so reads
+and checkpoints leave it alone. Readers only trust the index while the
+signature still matches; the hooks fold each bd write they make or observe
+(PostToolUse) into the counters and re-stamp the signature when the issues
+they wrote account for the whole change. Writes the hooks never see make the
+signature stale, and the index is brought up to date from beads.db /
+issues.jsonl on next use, rewriting only the rows that changed, or by hand
+with `bash_hooks.py --rebuild-rollups ROOT`.
+"""
+
+import os
+import sqlite3
+from typing import Iterable, Optional
+
+import beads_db
+from beads_hierarchy import HierarchyIndex
+
+INDEX_FILE = "rollups.db"
+CHILD, DESC = "child", "desc"  # Count scopes: direct children, all descendants
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS nodes (id TEXT PRIMARY KEY, parent TEXT, status TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_nodes_parent ON nodes(parent);
+CREATE TABLE IF NOT EXISTS counts (
+    id TEXT NOT NULL, scope TEXT NOT NULL, status TEXT NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (id, scope, status)
+);
+"""
+
+
+def index_path(project_root: str) -> str:
+    return os.path.join(project_root, beads_db.HOOKS_DIRNAME, INDEX_FILE)
+
+
+class RollupIndex:
+    """Status counts per issue for its children and its whole subtree."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    @classmethod
+    def open(cls, project_root: str, create: bool = False) -> Optional["RollupIndex"]:
+        path = index_path(project_root)
+        if not create and not os.path.exists(path):
+            return None
+        try:
+            if create:
+                beads_db.hooks_dir(project_root)
+            conn = sqlite3.connect(path, timeout=2.0, isolation_level=None)
+            conn.executescript(SCHEMA)
+        except sqlite3.Error:
+            return None
+        return cls(conn)
+
+    def close(self):
+        self._conn.close()
+
+    # -- freshness ------------------------------------------------------------
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    @property
+    def signature(self) -> Optional[str]:
+        """Signature of the Beads data the counters describe ("" once invalidated)."""
+        return self.get_meta("signature")
+
+    def stamp(self, signature: str):
+        self.set_meta("signature", signature)
+
+    def invalidate(self):
+        """Mark the counters untrustworthy until the next rebuild."""
+        self.stamp("")
+
+    # -- queries --------------------------------------------------------------
+
+    def status(self, issue_id: str) -> Optional[str]:
+        row = self._conn.execute("SELECT status FROM nodes WHERE id = ?", (issue_id,)).fetchone()
+        return row[0] if row else None
+
+    def parent(self, issue_id: str) -> Optional[str]:
+        row = self._conn.execute("SELECT parent FROM nodes WHERE id = ?", (issue_id,)).fetchone()
+        return row[0] if row else None
+
+    def counts(self, issue_id: str, scope: str) -> Optional[dict]:
+        """{status: n} for an issue's children or descendants; None if the issue is unknown."""
+        if self.status(issue_id) is None:
+            return None
+        rows = self._conn.execute(
+            "SELECT status, n FROM counts WHERE id = ? AND scope = ? AND n > 0", (issue_id, scope)
+        )
+        return dict(rows.fetchall())
+
+    def open_descendants(self, issue_id: str) -> Optional[int]:
+        """Number of descendants that are not closed; None if the issue is unknown."""
+        counts = self.counts(issue_id, DESC)
+        return None if counts is None else sum(n for s, n in counts.items() if s != "closed")
+
+    def blocked_siblings(self, issue_id: str, parent_id: str) -> Optional[int]:
+        """Blocked children of parent_id other than issue_id; None if either is unknown."""
+        counts = self.counts(parent_id, CHILD)
+        own = self.status(issue_id)
+        if counts is None or own is None:
+            return None
+        return counts.get("blocked", 0) - (own == "blocked")
+
+    # -- maintenance ----------------------------------------------------------
+
+    def _ancestors(self, issue_id: str) -> list:
+        chain, seen = [], {issue_id}
+        row = self._conn.execute("SELECT parent FROM nodes WHERE id = ?", (issue_id,)).fetchone()
+        while row and row[0] and row[0] not in seen:
+            seen.add(row[0])
+            chain.append(row[0])
+            row = self._conn.execute("SELECT parent FROM nodes WHERE id = ?", (row[0],)).fetchone()
+        return chain
+
+    def _bump(self, issue_id: str, scope: str, status: str, delta: int):
+        self._conn.execute(
+            "INSERT INTO counts VALUES (?, ?, ?, ?) ON CONFLICT (id, scope, status) DO UPDATE SET n = n + ?",
+            (issue_id, scope, status, delta, delta),
+        )
+
+    def _shift(self, issue_id: str, deltas: dict):
+        """Apply {status: delta} for one issue to its parent's child counts and every ancestor's."""
+        chain = self._ancestors(issue_id)
+        for status, delta in deltas.items():
+            if chain:
+                self._bump(chain[0], CHILD, status, delta)
+            for ancestor in chain:
+                self._bump(ancestor, DESC, status, delta)
+
+    def set_status(self, issue_id: str, status: str) -> bool:
+        """Record a status change. False if the issue is unknown (caller should invalidate)."""
+        old = self.status(issue_id)
+        if old is None:
+            return False
+        if old != status:
+            self._conn.execute("UPDATE nodes SET status = ? WHERE id = ?", (status, issue_id))
+            # Descendant counts of ancestors change by one; child counts only for the parent.
+            self._shift(issue_id, {old: -1, status: 1})
+        return True
+
+    def add(self, issue_id: str, parent_id: Optional[str], status: str = "open") -> bool:
+        if self.status(issue_id) is not None or (parent_id and self.status(parent_id) is None):
+            return False
+        self._conn.execute("INSERT INTO nodes VALUES (?, ?, ?)", (issue_id, parent_id, status))
+        self._shift(issue_id, {status: 1})
+        return True
+
+    def descendants(self, issue_id: str) -> list:
+        """IDs of everything below an issue, level by level."""
+        found, frontier, seen = [], [issue_id], {issue_id}
+        while frontier:
+            marks = ",".join("?" * len(frontier))
+            rows = self._conn.execute(f"SELECT id FROM nodes WHERE parent IN ({marks})", frontier)
+            frontier = [r[0] for r in rows if r[0] not in seen]
+            seen.update(frontier)
+            found += frontier
+        return found
+
+    def rebuild(self, issues: Iterable[dict], signature: str):
+        """Bring every counter in line with a full list of issues ({"id", "status", "parent"}).
+
+        The rows are worked out in memory and compared with what the index
+        holds; only the ones that differ are written, so catching up with a
+        few outside writes touches a few rows instead of the whole table.
+        """
+        index = HierarchyIndex(issues)
+        nodes, children = {}, {}
+        for issue_id, issue in index.issues.items():
+            parent = issue.get("parent") if issue.get("parent") in index.issues else None
+            nodes[issue_id] = (issue_id, parent, issue.get("status") or "open")
+            if parent:
+                children.setdefault(parent, []).append(issue_id)
+        order = [issue_id for issue_id, row in nodes.items() if row[1] is None]
+        for issue_id in order:  # Top-down; the list grows as each level is reached
+            order.extend(children.get(issue_id, ()))
+        counts, below = {}, {}  # below: issue_id -> {status: n} over its descendants
+        for issue_id in reversed(order):  # Children before parents: fold each subtree into its parent
+            _, parent, status = nodes[issue_id]
+            if parent:
+                totals = below.setdefault(parent, {})
+                for s, n in below.get(issue_id, {}).items():
+                    totals[s] = totals.get(s, 0) + n
+                totals[status] = totals.get(status, 0) + 1
+                counts[(parent, CHILD, status)] = counts.get((parent, CHILD, status), 0) + 1
+        for issue_id, totals in below.items():
+            for status, n in totals.items():
+                counts[(issue_id, DESC, status)] = n
+        for issue_id in nodes.keys() - set(order):  # Caught in a parent cycle: walk each chain as far as it goes
+            status, chain = nodes[issue_id][2], index.ancestors(issue_id)
+            if chain:
+                key = (chain[0]["id"], CHILD, status)
+                counts[key] = counts.get(key, 0) + 1
+            for ancestor in chain:
+                key = (ancestor["id"], DESC, status)
+                counts[key] = counts.get(key, 0) + 1
+        with self.transaction():
+            held = {row[0]: row for row in self._conn.execute("SELECT id, parent, status FROM nodes")}
+            self._conn.executemany("DELETE FROM nodes WHERE id = ?", [(i,) for i in held if i not in nodes])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO nodes VALUES (?, ?, ?)", [r for i, r in nodes.items() if held.get(i) != r]
+            )
+            held = {row[:3]: row[3] for row in self._conn.execute("SELECT id, scope, status, n FROM counts")}
+            self._conn.executemany(
+                "DELETE FROM counts WHERE id = ? AND scope = ? AND status = ?", [k for k in held if k not in counts]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO counts VALUES (?, ?, ?, ?)",
+                [k + (n,) for k, n in counts.items() if held.get(k) != n],
+            )
+            self.stamp(signature)
+
+    def transaction(self):
+        """`with index.transaction():` runs a read-modify-write under SQLite's write lock."""
+        return _Transaction(self._conn)
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
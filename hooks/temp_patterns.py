@@ -0,0 +1,97 @@
+"""
+System temp pollution detection shared by bash_hooks.py and check_system_temp.py.
+
+Each regex pattern list is compiled once into a single alternation, so a
+command is scanned once per question (temp path? tempfile call? SafeVision
+file names?) instead of once per pattern. Plain-literal checks (video tool
+names, the temp path prefilter) stay as substring searches, which CPython runs
+far faster than a regex alternation over the same literals; see
+benchmarks/bench_patterns.py for worst-case timings on 1 MB commands.
+"""
+
+import re
+from typing import Optional
+
+# System temp paths that should not be used for SafeVision files
+SYSTEM_TEMP_PATTERNS = [
+    r"/tmp(?:/|$)",
+    r"/private/tmp(?:/|$)",
+    r"/var(?:/|$)",
+    r"/private/var(?:/|$)",
+    r"/var/tmp(?:/|$)",
+    r"/private/var/tmp(?:/|$)",
+    r"/var/folders(?:/|$)",
+    r"/private/var/folders(?:/|$)",
+]
+
+# Video processing tools that create large temp files
+VIDEO_TOOLS = ["ffmpeg", "mkvmerge", "mkvextract", "dovi_tool", "x265", "hevc_nvenc"]
+
+# Output file flags for video tools
+OUTPUT_FLAGS = ["-o", "--output", "-y"]
+
+# Media outputs that count as a temp write even without an output flag
+VIDEO_EXTENSIONS = (".mkv", ".mp4", ".hevc", ".m4a", ".eac3", ".ac3", ".wav")
+
+# Python patterns that might create temp files
+PYTHON_TEMP_PATTERNS = [
+    r"tempfile\.mkdtemp\s*\(\s*\)",
+    r"tempfile\.mkstemp\s*\(\s*\)",
+    r"tempfile\.gettempdir\s*\(\s*\)",
+    r"tempfile\.NamedTemporaryFile\s*\(\s*\)",
+]
+
+# SafeVision-related file patterns
+SAFEVISION_FILE_PATTERNS = [
+    r"safevision", r"\.hevc", r"\.mkv", r"\.mp4", r"\.m4a",
+    r"\.eac3", r"\.ac3", r"\.wav", r"dv_retime", r"clip_\d+",
+    r"segment_\d+", r"frame_\d+",
+]
+
+_SYSTEM_TEMP_RE = re.compile("|".join(SYSTEM_TEMP_PATTERNS))
+_PYTHON_TEMP_RE = re.compile("|".join(PYTHON_TEMP_PATTERNS))
+_SAFEVISION_RE = re.compile("|".join(SAFEVISION_FILE_PATTERNS))  # Matched against lowercased text
+_OUTPUT_FLAGS = frozenset(OUTPUT_FLAGS)
+
+# Every system temp pattern contains one of these; a command without them has no temp path.
+_TEMP_PREFILTER = ("/tmp", "/var")
+
+
+def is_system_temp_path(path: str) -> bool:
+    """Check if a path is in a system temp directory."""
+    return _SYSTEM_TEMP_RE.search(path) is not None
+
+
+def is_safevision_related(command: str) -> bool:
+    """Check if a command is SafeVision-related."""
+    # lower() + a case-sensitive scan is ~10x faster than re.IGNORECASE here
+    return _SAFEVISION_RE.search(command.lower()) is not None
+
+
+def check_video_tool_output(command: str) -> Optional[str]:
+    """Check if a video tool command writes to system temp. Returns the offending path."""
+    if not any(tool in command for tool in VIDEO_TOOLS):
+        return None
+    if not any(marker in command for marker in _TEMP_PREFILTER):
+        return None
+
+    words = command.split()
+    for i, word in enumerate(words):
+        if word in _OUTPUT_FLAGS and i + 1 < len(words):
+            next_word = words[i + 1]
+            if is_system_temp_path(next_word):
+                return next_word
+        if word.endswith(VIDEO_EXTENSIONS) and is_system_temp_path(word):
+            return word
+    return None
+
+
+def check_python_temp_usage(command: str) -> Optional[str]:
+    """Check if Python uses tempfile without dir parameter. Returns the offending call."""
+    if "python" not in command and "tempfile" not in command:
+        return None
+
+    match = _PYTHON_TEMP_RE.search(command)
+    if match and is_safevision_related(command):
+        return match.group(0)
+    return None